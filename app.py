@@ -1,35 +1,42 @@
 # Deployment Timestamp: 2026-03-25T01:00:00Z - Stability Fix V3
-# Optimize NLTK for Vercel (Download to /tmp)
-import nltk
-import os
-NLTK_DATA_PATH = '/tmp/nltk_data'
-os.makedirs(NLTK_DATA_PATH, exist_ok=True)
-if NLTK_DATA_PATH not in nltk.data.path:
-    nltk.data.path.append(NLTK_DATA_PATH)
-
-def download_nltk_capsule():
-    for pkg in ['stopwords', 'punkt', 'punkt_tab', 'averaged_perceptron_tagger_eng']:
-        try:
-            nltk.data.find(f'corpora/{pkg}' if pkg == 'stopwords' else f'tokenizers/{pkg}' if 'punkt' in pkg else f'taggers/{pkg}')
-        except LookupError:
-            nltk.download(pkg, download_dir=NLTK_DATA_PATH)
+# Startup timing (STARTUP_PROFILE=1 or --profile-startup) must be installed before the other imports
+from startup_profiler import StartupProfiler
+STARTUP = StartupProfiler.from_env()
 
-download_nltk_capsule()
+# NLTK data comes from the offline bundle (nltk_resources.py); nothing is downloaded at import
+import os
+import nltk_resources
 
+# Only what every request path needs is imported here; pandas, sklearn, requests,
+# BeautifulSoup and fpdf are imported inside the endpoints that use them
 from flask import Flask, request, jsonify, send_file
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
 from flask_sqlalchemy import SQLAlchemy
 import json
+import copy
 import time
 import re
+import threading
 from datetime import datetime
 from werkzeug.utils import secure_filename
-import requests
-from bs4 import BeautifulSoup
-from models import db, Review, User
+from models import db, Review, User, StyleFingerprint, TrainingJob
 from lie_detector import LieDetector 
 from author_dna import AuthorDNA
+from ensemble import EnsembleEngine, display_label
+from model_artifacts import PIPELINE_FILES, model_fingerprint, source_hashes, load_compiled, is_current
+from model_registry import ModelRegistry
+from nlp_document import AnalyzedDocument
+from prediction_cache import PredictionCache, make_key
+from micro_batcher import MicroBatcher
+from style_index import StyleIndex
+from parallel_training import train_parallel, score_classifier
+from incremental_training import IncrementalTrainer, to_class_code, trainer_lock, saved_version
+from out_of_core_training import train_out_of_core
+from feature_cache import FeatureCache, dataset_hash, feature_key
+from hyperparameter_search import build_models, successive_halving, affordable_rows
+from near_duplicates import NearDuplicateIndex
+from training_jobs import TrainingJobQueue
 
 # Initialize App
 app = Flask(__name__)
@@ -84,34 +91,208 @@ jwt = JWTManager(app)
 
 # Initialize DB
 db.init_app(app)
-with app.app_context():
+with app.app_context(), STARTUP.step('db.create_all + schema fix'):
     db.create_all()
     # Execute raw SQL to alter the existing password_hash column length on Render/Postrgres
     # Since SQLAlchemy create_all() doesn't alter existing tables.
-    try:
-        from sqlalchemy import text
-        db.session.execute(text("ALTER TABLE \"user\" ALTER COLUMN password_hash TYPE VARCHAR(256);"))
-        db.session.commit()
-        print("Successfully ensured password_hash is VARCHAR(256)")
-    except Exception as e:
-        db.session.rollback()
-        print(f"Schema alter skipped or failed: {e}")
+    # Other dialects (local SQLite) do not support this syntax, so skip the failing round trip.
+    if db.engine.dialect.name == 'postgresql':
+        try:
+            from sqlalchemy import text
+            db.session.execute(text("ALTER TABLE \"user\" ALTER COLUMN password_hash TYPE VARCHAR(256);"))
+            db.session.commit()
+            print("Successfully ensured password_hash is VARCHAR(256)")
+        except Exception as e:
+            db.session.rollback()
+            print(f"Schema alter skipped or failed: {e}")
+
+def ensure_columns(table, columns):
+    """Add nullable columns that create_all() cannot add to an existing table"""
+    from sqlalchemy import inspect, text
+    existing = {c['name'] for c in inspect(db.engine).get_columns(table)}
+    for name, ddl in columns.items():
+        if name not in existing:
+            try:
+                db.session.execute(text(f'ALTER TABLE {table} ADD COLUMN {name} {ddl}'))
+                db.session.commit()
+                print(f"Added column {table}.{name}")
+            except Exception as e:
+                db.session.rollback()
+                print(f"Could not add column {table}.{name}: {e}")
+
+with app.app_context(), STARTUP.step('schema migrations'):
+    ensure_columns('review', {'model_version': 'VARCHAR(40)', 'moderator_label': 'VARCHAR(20)', 'moderated_at': 'TIMESTAMP'})
 
 # Global variables to hold current state (simple in-memory for demo)
 CURRENT_DATASET_PATH = None
 TRAINED_MODELS = {}
+ENSEMBLE = EnsembleEngine({})
+# Reviews scored per vectorized call in /api/predict_bulk
+BULK_CHUNK_SIZE = int(os.environ.get('BULK_CHUNK_SIZE', 500))
+# Largest chunk_size a /api/predict_bulk request gets (bigger requests are capped)
+MAX_BULK_CHUNK_SIZE = int(os.environ.get('MAX_BULK_CHUNK_SIZE', 5000))
+# Classifiers /api/train fits at the same time (process pool; 1 = one after another in the request)
+TRAIN_WORKERS = int(os.environ.get('TRAIN_WORKERS', 1 if IS_VERCEL else min(3, os.cpu_count() or 1)))
+# /api/train streams CSVs bigger than OUT_OF_CORE_THRESHOLD_MB (or any CSV with "out_of_core": true)
+# in chunks instead of loading them, sizing chunks to keep training near OUT_OF_CORE_MEMORY_MB
+OUT_OF_CORE_THRESHOLD_MB = float(os.environ.get('OUT_OF_CORE_THRESHOLD_MB', 200))
+OUT_OF_CORE_MEMORY_MB = int(os.environ.get('OUT_OF_CORE_MEMORY_MB', 512))
+# Vectorized train/test splits of uploaded datasets (compressed .npz), reused by repeat trainings
+# and evaluations of the same file; least recently used entries go beyond FEATURE_CACHE_MB (0 = off)
+FEATURE_CACHE = FeatureCache(os.path.join(MODEL_FOLDER, 'feature_cache'),
+                             max_bytes=int(os.environ.get('FEATURE_CACHE_MB', 512)) * 1024 * 1024)
+# Tuning mode of /api/train ("tune": true, the default on Vercel): successive halving over
+# TfidfVectorizer/classifier settings within TUNING_BUDGET_S seconds, TUNING_SEARCH_SHARE of it for
+# the search and the rest for refitting the winner on as many rows as still fit
+TUNING_BUDGET_S = float(os.environ.get('TUNING_BUDGET_S', 8 if IS_VERCEL else 60))
+TUNING_SEARCH_SHARE = float(os.environ.get('TUNING_SEARCH_SHARE', 0.6))
+TUNING_CANDIDATES = int(os.environ.get('TUNING_CANDIDATES', 12))
+# Background /api/train jobs run at the same time (local process pool; see training_jobs.py)
+TRAINING_JOB_WORKERS = int(os.environ.get('TRAINING_JOB_WORKERS', 1))
+# Rows /api/analytics reads on Vercel (sentiment is lexicon-based, so thousands fit in the timeout)
+ANALYTICS_MAX_ROWS = int(os.environ.get('ANALYTICS_MAX_ROWS', 5000))
+# Serve predictions from compiled NumPy scorers (fast_scorer.py) instead of sklearn pipelines
+COMPILE_MODELS = os.environ.get('COMPILE_MODELS', '1') not in ['0', 'false', 'False']
+# Persist the SVM as one averaged linear model + one calibration map instead of CalibratedClassifierCV's folds
+COLLAPSE_SVM = os.environ.get('COLLAPSE_SVM', '0') in ['1', 'true', 'True']
+# Consensus strategy for /api/predict: 'full' runs every model, 'cascade' exits early when NaiveBayes is confident
+ENSEMBLE_MODES = ('full', 'cascade')
+ENSEMBLE_MODE = os.environ.get('ENSEMBLE_MODE', 'full')
+CASCADE_BAND = [float(b) for b in os.environ.get('CASCADE_BAND', '0.2,0.8').split(',')]
+# Version of the active models ('v<n>' from the registry, else a content fingerprint);
+# part of every prediction cache key, response and history row
+MODEL_VERSION = None
+# Numbered model versions shared by every worker; training publishes, workers follow CURRENT
+MODEL_REGISTRY = ModelRegistry(os.path.join(MODEL_FOLDER, 'registry'), keep=int(os.environ.get('MODEL_REGISTRY_KEEP', 5)))
+# How often (seconds) each worker checks the registry for a newly published or rolled-back version
+MODEL_REFRESH_SECONDS = float(os.environ.get('MODEL_REFRESH_SECONDS', 2))
+ACTIVE_REGISTRY_VERSION = None
+_LAST_REFRESH_CHECK = 0.0
+_REFRESH_LOCK = threading.Lock()
+PREDICTION_CACHE = PredictionCache(
+    max_entries=int(os.environ.get('PREDICTION_CACHE_SIZE', 5000)),
+    max_bytes=int(os.environ.get('PREDICTION_CACHE_MB', 64)) * 1024 * 1024,
+    ttl=int(os.environ.get('PREDICTION_CACHE_TTL', 3600)),
+    shared_db_path=os.environ.get('PREDICTION_CACHE_DB')  # e.g. /tmp/prediction_cache.db for multi-worker gunicorn
+)
+# AuthorDNA style vectors of scored reviews, for "written in a near-identical style" lookups.
+# Reviews shorter than STYLE_MIN_TOKENS are not fingerprinted: their style features are mostly noise.
+STYLE_INDEX = StyleIndex(rebuild_every=int(os.environ.get('STYLE_INDEX_REBUILD_EVERY', 256)))
+STYLE_MIN_TOKENS = int(os.environ.get('STYLE_MIN_TOKENS', 15))
+# Distance (in standardized feature units) under which two styles count as near-identical
+STYLE_MATCH_RADIUS = float(os.environ.get('STYLE_MATCH_RADIUS', 0.35))
+_STYLE_REFRESH_LOCK = threading.Lock()
+# Near-duplicate (templated / copy-pasted) reviews: MinHash-LSH over character shingles.
+# Estimated Jaccard similarity at or above NEAR_DUPLICATE_THRESHOLD counts as a near-duplicate.
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get('NEAR_DUPLICATE_THRESHOLD', 0.6))
+NEAR_DUPLICATE_PERMS = int(os.environ.get('NEAR_DUPLICATE_PERMS', 128))
+HISTORY_DUPLICATES = NearDuplicateIndex(NEAR_DUPLICATE_THRESHOLD, num_perm=NEAR_DUPLICATE_PERMS)
+_DUPLICATE_REFRESH_LOCK = threading.Lock()
+# Index of the current dataset, rebuilt only when a different file (or a newer upload) is current
+_DATASET_DUPLICATES = {'key': None, 'index': None}
+# Online learning (/api/train/incremental): hashing features + partial_fit classifiers, saved
+# between batches so each upload or set of moderator labels is absorbed without a full retrain.
+# The cached trainer is reloaded whenever another worker has saved a newer one.
+INCREMENTAL_PATH = os.path.join(MODEL_FOLDER, 'incremental', 'trainer.pkl')
+INCREMENTAL_TRAINER = None
+INCREMENTAL_VERSION = None
+_INCREMENTAL_LOCK = threading.Lock()
+
+def score_coalesced(items):
+    """
+    Micro-batcher callback: items are (engine, text, model_name) from concurrent /api/predict calls.
+    Each item is scored by the engine its request started with, even across a model swap.
+    """
+    results = [None] * len(items)
+    groups = {}
+    for i, (engine, _, _) in enumerate(items):
+        groups.setdefault(id(engine), (engine, []))[1].append(i)
+    for engine, indices in groups.values():
+        scored = engine.predict_many([items[i][1] for i in indices], [items[i][2] for i in indices])
+        for i, result in zip(indices, scored):
+            results[i] = result
+    return results
+
+# Coalesces concurrent single-text predictions; idle servers score directly
+MICRO_BATCHER = MicroBatcher(
+    score_coalesced,
+    max_wait_ms=float(os.environ.get('MICRO_BATCH_WAIT_MS', 5)),
+    max_batch=int(os.environ.get('MICRO_BATCH_MAX', 64))
+) if os.environ.get('MICRO_BATCH_ENABLED', '1') not in ['0', 'false', 'False'] else None
 
 # --- Helper Functions ---
+def set_active_models(models, engine=None, version=None, registry_version=None):
+    """
+    Swap in a new set of pipelines together with the ensemble engine built on them.
+    Binary artifacts pass a ready engine (and their stored version) with no pipelines.
+    The engine carries its own version, so a request that took a reference to it
+    keeps a consistent model set and version even if another thread swaps models.
+    """
+    global TRAINED_MODELS, ENSEMBLE, MODEL_VERSION, ACTIVE_REGISTRY_VERSION
+    if engine is None:
+        engine = EnsembleEngine(models, compile=COMPILE_MODELS)
+    engine.version = version or model_fingerprint(models)
+    TRAINED_MODELS = dict(models)
+    ENSEMBLE = engine
+    MODEL_VERSION = engine.version
+    ACTIVE_REGISTRY_VERSION = registry_version
+    # Cached predictions belong to the previous models
+    PREDICTION_CACHE.clear()
+    print(f"Ensemble ready: {len(engine.featurizers)} shared vectorizer(s) for {engine.names()}, compiled: {sorted(engine.compiled)} (version {MODEL_VERSION})")
+
+def activate_registry_version(version):
+    """Load a published registry version and make it the active model set"""
+    models, engine, meta = MODEL_REGISTRY.load(version, compile=COMPILE_MODELS)
+    set_active_models(models, engine, meta['model_version'], registry_version=version)
+    print(f"Models loaded from registry version {meta['model_version']}: {ENSEMBLE.names()}")
+
+def refresh_models():
+    """Follow the registry's CURRENT pointer (cheap; checked at most every MODEL_REFRESH_SECONDS)"""
+    global _LAST_REFRESH_CHECK
+    now = time.time()
+    if now - _LAST_REFRESH_CHECK < MODEL_REFRESH_SECONDS:
+        return
+    _LAST_REFRESH_CHECK = now
+    current = MODEL_REGISTRY.current()
+    if current is None or current == ACTIVE_REGISTRY_VERSION:
+        return
+    # One loader per process; other threads keep serving the previous version meanwhile
+    if _REFRESH_LOCK.acquire(blocking=False):
+        try:
+            if MODEL_REGISTRY.current() != ACTIVE_REGISTRY_VERSION:
+                activate_registry_version(MODEL_REGISTRY.current())
+        except Exception as e:
+            print(f"Model refresh failed, keeping version {MODEL_VERSION}: {e}")
+        finally:
+            _REFRESH_LOCK.release()
+
 def load_models():
     """Load models from disk on startup if available"""
-    global TRAINED_MODELS
     print(f"Loading models from: {MODEL_FOLDER}...")
     try:
         import pickle
+        # 0. The active version of the model registry (published by /api/train)
+        if MODEL_REGISTRY.current() is not None:
+            activate_registry_version(MODEL_REGISTRY.current())
+            return
+
         # On Vercel, try loading from /tmp first (newly trained), then fallback to repo (defaults)
         REPO_MODEL_FOLDER = os.path.join(BASE_DIR, 'model', 'artifacts')
-        
-        for model_name, filename in [('SVM', 'svm_pipeline.pkl'), ('NaiveBayes', 'nb_pipeline.pkl'), ('LogisticRegression', 'lr_pipeline.pkl')]:
+        models = {}
+
+        # 1. Memory-mapped binary artifacts, if they were converted from the pickles we would load
+        for folder in [MODEL_FOLDER, REPO_MODEL_FOLDER]:
+            compiled_folder = os.path.join(folder, 'compiled')
+            if COMPILE_MODELS and is_current(compiled_folder, folder):
+                featurizers, heads, manifest = load_compiled(compiled_folder)
+                set_active_models({}, EnsembleEngine.from_compiled(featurizers, heads), manifest['model_version'])
+                print(f"Models loaded from binary artifacts in {compiled_folder}: {ENSEMBLE.names()}")
+                return
+            if source_hashes(folder):
+                break  # Pickles here take precedence over older artifacts further down
+
+        # 2. Pickled pipelines
+        for model_name, filename in PIPELINE_FILES:
             # Try /tmp first
             path = os.path.join(MODEL_FOLDER, filename)
             if not os.path.exists(path):
@@ -120,12 +301,13 @@ def load_models():
             
             if os.path.exists(path):
                 with open(path, 'rb') as f:
-                    TRAINED_MODELS[model_name] = pickle.load(f)
+                    models[model_name] = pickle.load(f)
                     print(f"Loaded {model_name} from {path}")
             else:
                 print(f"Warning: model {model_name} not found in {MODEL_FOLDER} or {REPO_MODEL_FOLDER}")
 
-        print(f"Models loaded successfully. Available models: {list(TRAINED_MODELS.keys())}")
+        set_active_models(models)
+        print(f"Models loaded successfully. Available models: {ENSEMBLE.names()}")
     except Exception as e:
         print(f"CRITICAL: Models loading error: {e}")
 
@@ -157,15 +339,104 @@ def load_latest_dataset():
     except Exception as e:
         print(f"Error restoring dataset: {e}")
 
-load_models()
-load_latest_dataset()
+with STARTUP.step('load_models'):
+    load_models()
+with STARTUP.step('load_latest_dataset'):
+    load_latest_dataset()
 
-# Initialize Analyzers
+# Initialize Analyzers (cheap: their NLP resources load on first use or warmup)
 lie_detector = LieDetector()
 author_dna = AuthorDNA()
 
+def warmup_analyzers():
+    """Load the analyzers' NLP resources now rather than during the first scored review"""
+    timings = {}
+    for name, analyzer in [('lie_detector', lie_detector), ('author_dna', author_dna)]:
+        start = time.time()
+        analyzer.warmup()
+        timings[name] = round(time.time() - start, 3)
+    return timings
+
+# Set WARMUP_ANALYZERS=1 on long-lived servers (e.g. with gunicorn --preload) to pay this at boot
+if os.environ.get('WARMUP_ANALYZERS', '0') in ['1', 'true', 'True']:
+    with STARTUP.step('warmup_analyzers'):
+        print(f"Analyzers warmed up: {warmup_analyzers()}")
+
+def style_fingerprint(text, vector, n_tokens, author=None, product=None, review_id=None):
+    """StyleFingerprint row for a scored review, or None when it is too short to fingerprint"""
+    if n_tokens < STYLE_MIN_TOKENS:
+        return None
+    return StyleFingerprint(
+        review_id=review_id, text=text, n_tokens=n_tokens,
+        author=str(author)[:120] if author else None,
+        product=str(product)[:255] if product else None,
+        vector=json.dumps([round(float(v), 6) for v in vector])
+    )
+
+def refresh_style_index():
+    """Add fingerprints saved since the last refresh (by any worker) to STYLE_INDEX"""
+    # One refresh at a time: concurrent ones would read the same last_id and fetch the same rows
+    with _STYLE_REFRESH_LOCK:
+        rows = StyleFingerprint.query.filter(StyleFingerprint.id > STYLE_INDEX.last_id).order_by(StyleFingerprint.id).all()
+        added = 0
+        for row in rows:
+            added += STYLE_INDEX.add(row.id, json.loads(row.vector), author=row.author, product=row.product,
+                                     review_id=row.review_id, text=row.text)
+    return added
+
+def refresh_duplicate_index():
+    """Add Review history saved since the last refresh (by any worker) to HISTORY_DUPLICATES"""
+    # One refresh at a time: concurrent ones would read the same last_id and fetch the same rows
+    with _DUPLICATE_REFRESH_LOCK:
+        rows = Review.query.filter(Review.id > HISTORY_DUPLICATES.last_id).order_by(Review.id).all()
+        if not rows:
+            return 0
+        return HISTORY_DUPLICATES.add_many([r.id for r in rows], [r.text for r in rows],
+                                           [{'review_id': r.id, 'label': r.label} for r in rows])
+
+def dataset_duplicate_index():
+    """NearDuplicateIndex over the current dataset's text column (cached per file version)"""
+    import pandas as pd
+    key = (CURRENT_DATASET_PATH, os.path.getmtime(CURRENT_DATASET_PATH), IS_VERCEL)
+    if _DATASET_DUPLICATES['key'] != key:
+        df = pd.read_csv(CURRENT_DATASET_PATH)
+        if IS_VERCEL and len(df) > ANALYTICS_MAX_ROWS:
+            df = df.head(ANALYTICS_MAX_ROWS)
+        text_col = next((c for c in df.columns if 'text' in c.lower() or 'review' in c.lower()), None)
+        if text_col is None:
+            raise ValueError('Text column not found in dataset')
+        label_col = next((c for c in df.columns if 'label' in c.lower() or 'category' in c.lower()), None)
+        labels = df[label_col].astype(str).tolist() if label_col else [None] * len(df)
+        index = NearDuplicateIndex(NEAR_DUPLICATE_THRESHOLD, num_perm=NEAR_DUPLICATE_PERMS)
+        index.add_many(list(range(len(df))), df[text_col].fillna('').astype(str).tolist(),
+                       [{'row': i, 'label': label} for i, label in enumerate(labels)])
+        _DATASET_DUPLICATES.update(key=key, index=index)
+    return _DATASET_DUPLICATES['index']
+
+def format_duplicate_clusters(index, groups, max_reviews=50):
+    """JSON-ready near-duplicate clusters: sizes, Jaccard estimates and (truncated) member reviews"""
+    clusters = []
+    for group in groups:
+        reviews = []
+        for row, jaccard in list(zip(group['rows'], group['jaccard']))[:max_reviews]:
+            meta = index.meta[row]
+            reviews.append(dict({k: v for k, v in meta.items() if k != 'text'}, id=index.ids[row],
+                                jaccard=jaccard, text=meta['text'][:300]))
+        clusters.append({'size': len(group['rows']), 'mean_jaccard': group['mean_jaccard'],
+                         'min_jaccard': group['min_jaccard'], 'reviews': reviews})
+    return clusters
+
+# Imports made while serving requests are not part of startup
+STARTUP.uninstall()
+if STARTUP.enabled:
+    print(STARTUP.format_report())
+
 # --- API Endpoints ---
 
+@app.before_request
+def follow_model_registry():
+    refresh_models()
+
 @app.route('/')
 def home():
     return jsonify({
@@ -282,93 +553,336 @@ def preview_data():
 
 @app.route('/api/train', methods=['POST'])
 def train_models():
-    """Train multiple models and return comparison metrics"""
-    global CURRENT_DATASET_PATH, TRAINED_MODELS
-    
-    data = request.json
+    """Train multiple models and return comparison metrics ("background": true queues a training job instead)"""
+    data = request.json or {}
+    if data.get('background'):
+        return submit_training_job()
+
+    if not CURRENT_DATASET_PATH:
+        return jsonify({'error': 'No dataset uploaded'}), 400
+
+    try:
+        return jsonify(run_training(data, CURRENT_DATASET_PATH))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def run_training(data, path, progress=None):
+    """
+    The work of /api/train on the dataset at path; returns its response. progress (a
+    training_jobs.JobReporter when run as a background job) is told every stage and
+    every fitted model, and stops the run with JobCancelled once it was cancelled.
+    """
+    from sklearn.pipeline import Pipeline
     text_col = data.get('text_column', 'text')
     label_col = data.get('label_column', 'label')
-    
+    collapse_svm = data.get('collapse_svm', COLLAPSE_SVM)
+    workers = int(data.get('workers', TRAIN_WORKERS))
+    stage = progress.stage if progress else lambda name, **info: None
+
+    started = time.time()
+    out_of_core = data.get('out_of_core')
+    if out_of_core is None:
+        out_of_core = os.path.getsize(path) > OUT_OF_CORE_THRESHOLD_MB * 1024 * 1024
+    if out_of_core:
+        return train_models_out_of_core(data, text_col, label_col, started, path, stage)
+
+    # Ensure model folder exists
+    ensure_dir_exists(MODEL_FOLDER)
+
+    # Default settings, a config returned by an earlier tuning run, or a tuned one now
+    tuning = None
+    if data.get('tune', IS_VERCEL):
+        stage('searching')
+        vectorizer, classifiers, split, features, tuning = tuned_split(data, text_col, label_col, workers, started, path)
+    else:
+        stage('vectorizing')
+        vectorizer, classifiers = build_models(data.get('config'))
+        vectorizer, split, features = vectorized_split(text_col, label_col, vectorizer, path=path)
+
+    # The classifiers are fitted and scored concurrently, each on the same vectorized split
+    stage('fitting', models=[name for name, _ in classifiers])
+    fitted, metrics, timings = train_parallel(classifiers, split, workers=workers, collapse_svm=collapse_svm,
+                                              on_done=progress.model_done if progress else None)
+    # Persist as regular pipelines so artifacts stay loadable on their own
+    models = {name: Pipeline([('tfidf', vectorizer), ('clf', fitted[name])]) for name, _ in classifiers}
+    print(f"Trained {list(models)} in {timings['wall_clock_s']}s ({timings['executor']}, {timings['workers']} worker(s))")
+
+    # Publish all three models as one new registry version (pickles + binary artifacts),
+    # then swap them in here; other workers follow the registry pointer
+    stage('publishing')
+    engine = EnsembleEngine(models, compile=COMPILE_MODELS)
+    metadata = {'metrics': metrics, 'dataset': os.path.basename(path), 'features': features['key']}
+    if tuning or data.get('config'):
+        metadata['config'] = tuning['best'] if tuning else data['config']
+    version = MODEL_REGISTRY.publish(models, engine, metadata)
+    set_active_models(models, engine, f"v{version}", registry_version=version)
+
+    timings['vectorize_s'] = features['vectorize_s']
+    timings['feature_cache'] = 'hit' if features['cache_hit'] else 'miss'
+    timings['total_s'] = round(time.time() - started, 3)
+    response = {'message': 'Training complete', 'metrics': metrics, 'model_version': MODEL_VERSION, 'timings': timings}
+    if tuning:
+        response['tuning'] = tuning
+    return response
+
+def dataset_split(text_col, label_col, path=None):
+    """(X_train, X_test, y_train, y_test) texts and labels of a dataset (the current one by default), split 80/20 as /api/train does"""
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+    df = pd.read_csv(path or CURRENT_DATASET_PATH)
+    if text_col not in df.columns or label_col not in df.columns:
+        raise ValueError(f'Columns {text_col} or {label_col} not found')
+
+    # Preprocessing (Basic)
+    df = df.dropna(subset=[text_col, label_col])
+    return train_test_split(df[text_col].astype(str), df[label_col], test_size=0.2, random_state=42)
+
+def vectorized_split(text_col, label_col, vectorizer=None, texts=None, path=None):
+    """
+    (vectorizer, (X_train_vec, y_train, X_test_vec, y_test), info) of a dataset (the current one by default):
+    an 80/20 split with the (unfitted) vectorizer, TfidfVectorizer() by default, fitted on
+    the training part. Served from FEATURE_CACHE when the same file, columns and vectorizer
+    settings were vectorized before; texts is the dataset_split() to use if not. info has
+    the cache key, whether it was a hit and the seconds spent.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    start = time.time()
+    # One TF-IDF vocabulary shared by all three classifiers: the text is
+    # tokenized once at train time and once per request at predict time.
+    vectorizer = vectorizer if vectorizer is not None else TfidfVectorizer()
+    path = path or CURRENT_DATASET_PATH
+    key = feature_key(dataset_hash(path), text_col, label_col, vectorizer, test_size=0.2, random_state=42)
+    cached = FEATURE_CACHE.get(key)
+    if cached is not None:
+        vectorizer, split = cached
+        return vectorizer, split, {'key': key, 'cache_hit': True, 'vectorize_s': round(time.time() - start, 3)}
+
+    X_train, X_test, y_train, y_test = texts if texts is not None else dataset_split(text_col, label_col, path)
+    split = (vectorizer.fit_transform(X_train), y_train, vectorizer.transform(X_test), y_test)
+    try:
+        FEATURE_CACHE.put(key, vectorizer, split, {'dataset': os.path.basename(path)})
+    except OSError as e:
+        print(f"Feature cache write skipped: {e}")
+    return vectorizer, split, {'key': key, 'cache_hit': False, 'vectorize_s': round(time.time() - start, 3)}
+
+def tuned_split(data, text_col, label_col, workers, started, path):
+    """
+    Tuning mode of /api/train: successive halving picks the vectorizer and classifier
+    settings, then the winner's features are built on as many training rows as the rest
+    of the time budget allows. Returns what vectorized_split() does, plus the classifiers
+    and the search summary.
+    """
+    budget_s = float(data.get('budget_s', TUNING_BUDGET_S))
+    texts = dataset_split(text_col, label_col, path)
+    X_train, X_test, y_train, y_test = texts
+
+    # 1. Search on part of the budget
+    search = successive_halving(X_train, y_train, (budget_s - (time.time() - started)) * TUNING_SEARCH_SHARE,
+                                n_candidates=int(data.get('candidates', TUNING_CANDIDATES)), workers=workers)
+
+    # 2. Refit rows the rest of the budget affords, extrapolated from the winner's last fit
+    rows = affordable_rows(search, budget_s - (time.time() - started), len(X_train), len(X_test))
+    vectorizer, classifiers = build_models(search['best'])
+    if rows >= len(X_train):
+        vectorizer, split, features = vectorized_split(text_col, label_col, vectorizer, texts, path)
+    else:
+        start = time.time()
+        split = (vectorizer.fit_transform(X_train.iloc[:rows]), y_train.iloc[:rows], vectorizer.transform(X_test), y_test)
+        features = {'key': None, 'cache_hit': False, 'vectorize_s': round(time.time() - start, 3)}
+        print(f"Tuning budget: final fit on {rows} of {len(X_train)} training rows")
+    search.update(budget_s=budget_s, final_rows=rows)
+    return vectorizer, classifiers, split, features, search
+
+def train_models_out_of_core(data, text_col, label_col, started, path, stage):
+    """
+    /api/train for datasets too big to load: one streaming pass builds the vocabulary,
+    further passes fit partial_fit classifiers chunk by chunk (see out_of_core_training).
+    """
+    import pandas as pd
+    header = pd.read_csv(path, nrows=0).columns
+    if text_col not in header or label_col not in header:
+        raise ValueError(f'Columns {text_col} or {label_col} not found')
+    ensure_dir_exists(MODEL_FOLDER)
+
+    stage('streaming')
+    memory_mb = int(data.get('memory_mb', OUT_OF_CORE_MEMORY_MB))
+    models, metrics, report = train_out_of_core(path, text_col, label_col, memory_mb=memory_mb,
+                                                epochs=int(data.get('epochs', 2)))
+    timings = report.pop('timings')
+    print(f"Trained {list(models)} out of core on {report['train_rows']} rows, peak {report['run_peak_mb']} MB of {memory_mb} MB")
+
+    stage('publishing')
+    engine = EnsembleEngine(models, compile=COMPILE_MODELS)
+    version = MODEL_REGISTRY.publish(models, engine, {'metrics': metrics, 'dataset': os.path.basename(path),
+                                                      'mode': 'out_of_core'})
+    set_active_models(models, engine, f"v{version}", registry_version=version)
+
+    timings['total_s'] = round(time.time() - started, 3)
+    return {'message': 'Training complete', 'metrics': metrics, 'model_version': MODEL_VERSION,
+            'timings': timings, 'out_of_core': report}
+
+def run_training_job(params, reporter):
+    """A queued /api/train run, inside a TRAINING_JOBS worker"""
+    return run_training(params['data'], params['dataset'], reporter)
+
+# Queued /api/train runs; pool workers start (from a fork server, re-importing this module) when the first job is submitted
+TRAINING_JOBS = TrainingJobQueue(app, run_training_job, workers=TRAINING_JOB_WORKERS)
+
+@app.route('/api/train/jobs', methods=['GET', 'POST'])
+def submit_training_job():
+    """
+    POST queues /api/train (same body) as a background job on the current dataset and
+    returns its id at once (202). One job per dataset is queued or running at a time: a
+    submission while one is active returns that job instead (deduplicated: true).
+    GET lists the most recent jobs.
+    """
+    if request.method == 'GET':
+        limit = int(request.args.get('limit', 20))
+        jobs = TrainingJob.query.order_by(TrainingJob.created_at.desc()).limit(limit).all()
+        return jsonify({'jobs': [job.to_dict() for job in jobs], 'executor': TRAINING_JOBS.executor})
+
     if not CURRENT_DATASET_PATH:
         return jsonify({'error': 'No dataset uploaded'}), 400
 
     try:
-        import pandas as pd
-        import pickle
-        from sklearn.model_selection import train_test_split
-        from sklearn.feature_extraction.text import TfidfVectorizer
-        from sklearn.svm import LinearSVC
-        from sklearn.naive_bayes import MultinomialNB
-        from sklearn.linear_model import LogisticRegression
-        from sklearn.pipeline import Pipeline
-        from sklearn.calibration import CalibratedClassifierCV
-        from sklearn.metrics import accuracy_score, precision_score, recall_score, confusion_matrix
+        data = dict(request.json or {})
+        data.pop('background', None)
+        job, deduplicated = TRAINING_JOBS.submit(os.path.basename(CURRENT_DATASET_PATH), dataset_hash(CURRENT_DATASET_PATH),
+                                                 {'dataset': CURRENT_DATASET_PATH, 'data': data})
+        response = dict(job.to_dict(), deduplicated=deduplicated, status_url=f'/api/train/jobs/{job.id}')
+        return jsonify(response), 200 if deduplicated else 202
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-        df = pd.read_csv(CURRENT_DATASET_PATH)
-        if text_col not in df.columns or label_col not in df.columns:
-            return jsonify({'error': f'Columns {text_col} or {label_col} not found'}), 400
-            
-        # Subset data for Vercel to avoid 10s timeout
-        if IS_VERCEL and len(df) > 200:
-            df = df.sample(n=200, random_state=42)
-            print("Vercel mode: subsetted to 200 rows for fast training.")
-            
-        # Preprocessing (Basic)
-        df = df.dropna(subset=[text_col, label_col])
-        X = df[text_col].astype(str)
-        y = df[label_col]
-        
-        # Train/Test Split
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-        
-        metrics = {}
-        
-        # Ensure model folder exists
-        ensure_dir_exists(MODEL_FOLDER)
-        
-        # 1. SVM
-        svm_pipe = Pipeline([('tfidf', TfidfVectorizer()), ('clf', CalibratedClassifierCV(LinearSVC()))])
-        svm_pipe.fit(X_train, y_train)
-        y_pred = svm_pipe.predict(X_test)
-        metrics['SVM'] = {
-            'accuracy': accuracy_score(y_test, y_pred),
-            'precision': precision_score(y_test, y_pred, average='macro'),
-            'recall': recall_score(y_test, y_pred, average='macro'),
-            'cm': confusion_matrix(y_test, y_pred).tolist()
-        }
-        with open(f'{MODEL_FOLDER}/svm_pipeline.pkl', 'wb') as f: pickle.dump(svm_pipe, f)
-        TRAINED_MODELS['SVM'] = svm_pipe
-
-        # 2. Naive Bayes
-        nb_pipe = Pipeline([('tfidf', TfidfVectorizer()), ('clf', MultinomialNB())])
-        nb_pipe.fit(X_train, y_train)
-        y_pred = nb_pipe.predict(X_test)
-        metrics['NaiveBayes'] = {
-            'accuracy': accuracy_score(y_test, y_pred),
-            'precision': precision_score(y_test, y_pred, pos_label='Fake', average='macro'),
-            'recall': recall_score(y_test, y_pred, pos_label='Fake', average='macro'),
-            'cm': confusion_matrix(y_test, y_pred).tolist()
-        }
-        with open(f'{MODEL_FOLDER}/nb_pipeline.pkl', 'wb') as f: pickle.dump(nb_pipe, f)
-        TRAINED_MODELS['NaiveBayes'] = nb_pipe
-        
-        # 3. Logistic Regression
-        lr_pipe = Pipeline([('tfidf', TfidfVectorizer()), ('clf', LogisticRegression())])
-        lr_pipe.fit(X_train, y_train)
-        y_pred = lr_pipe.predict(X_test)
-        metrics['LogisticRegression'] = {
-            'accuracy': accuracy_score(y_test, y_pred),
-            'precision': precision_score(y_test, y_pred, pos_label='Fake', average='macro'),
-            'recall': recall_score(y_test, y_pred, pos_label='Fake', average='macro'),
-            'cm': confusion_matrix(y_test, y_pred).tolist()
-        }
-        with open(f'{MODEL_FOLDER}/lr_pipeline.pkl', 'wb') as f: pickle.dump(lr_pipe, f)
-        TRAINED_MODELS['LogisticRegression'] = lr_pipe
+@app.route('/api/train/jobs/<job_id>', methods=['GET'])
+def get_training_job(job_id):
+    """Status, current stage, per-model progress, elapsed time and (once done) metrics of a training job"""
+    job = db.session.get(TrainingJob, job_id)
+    if job is None:
+        return jsonify({'error': 'Training job not found'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/train/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_training_job(job_id):
+    """Cancel a training job: a queued one is dropped, a running one stops before publishing its models"""
+    try:
+        job = TRAINING_JOBS.cancel(job_id)
+        if job is None:
+            return jsonify({'error': 'Training job not found'}), 404
+        return jsonify(job.to_dict())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def current_incremental_trainer():
+    """The saved incremental trainer, reloaded if it changed on disk. Call with _INCREMENTAL_LOCK held."""
+    global INCREMENTAL_TRAINER, INCREMENTAL_VERSION
+    version = saved_version(INCREMENTAL_PATH)
+    if INCREMENTAL_TRAINER is None or version != INCREMENTAL_VERSION:
+        INCREMENTAL_TRAINER = IncrementalTrainer.load(INCREMENTAL_PATH)
+        INCREMENTAL_VERSION = version
+    return INCREMENTAL_TRAINER
+
+@app.route('/api/train/incremental', methods=['GET', 'POST'])
+def train_incremental():
+    """
+    Update the online models with one labelled batch and publish them.
+    source 'dataset' absorbs the current upload (once per file version); 'reviews'
+    absorbs the moderator labels set since the last increment.
+    GET returns the trainer state and the metrics of every increment so far.
+    """
+    global INCREMENTAL_TRAINER, INCREMENTAL_VERSION
+    if request.method == 'GET':
+        with _INCREMENTAL_LOCK:
+            return jsonify(current_incremental_trainer().describe())
+
+    data = request.json or {}
+    source = data.get('source', 'dataset')
+    text_col = data.get('text_column', 'text')
+    label_col = data.get('label_column', 'label')
+    if source not in ['dataset', 'reviews']:
+        return jsonify({'error': "source must be 'dataset' or 'reviews'"}), 400
 
-        return jsonify({'message': 'Training complete', 'metrics': metrics})
+    try:
+        # Threads of this worker, then other worker processes, absorb one batch at a time
+        with _INCREMENTAL_LOCK, trainer_lock(INCREMENTAL_PATH):
+            started = time.time()
+            # Work on a copy: a failed batch leaves the saved and in-memory state untouched
+            trainer = IncrementalTrainer() if data.get('reset') else copy.deepcopy(current_incremental_trainer())
+
+            # 1. Collect the new labelled batch
+            if source == 'dataset':
+                if not CURRENT_DATASET_PATH or not os.path.exists(CURRENT_DATASET_PATH):
+                    return jsonify({'error': 'No dataset uploaded'}), 400
+                stat = os.stat(CURRENT_DATASET_PATH)
+                key = (os.path.abspath(CURRENT_DATASET_PATH), stat.st_mtime, stat.st_size)
+                if key in trainer.sources:
+                    return jsonify({'message': 'Dataset already absorbed', 'model_version': MODEL_VERSION,
+                                    'samples_seen': trainer.samples_seen})
+                import pandas as pd
+                df = pd.read_csv(CURRENT_DATASET_PATH)
+                if text_col not in df.columns or label_col not in df.columns:
+                    return jsonify({'error': f'Columns {text_col} or {label_col} not found'}), 400
+                df = df.dropna(subset=[text_col, label_col])
+                texts, labels = df[text_col].astype(str).tolist(), df[label_col].tolist()
+                source_name = os.path.basename(CURRENT_DATASET_PATH)
+            else:
+                if trainer.models is None:
+                    return jsonify({'error': 'Train on a dataset first: moderator labels cannot define the classes'}), 400
+                query = Review.query.filter(Review.moderator_label.isnot(None))
+                if trainer.reviews_until is not None:
+                    query = query.filter(Review.moderated_at > trainer.reviews_until)
+                reviews = query.order_by(Review.moderated_at).all()
+                if not reviews:
+                    return jsonify({'message': 'No new moderator labels', 'model_version': MODEL_VERSION,
+                                    'samples_seen': trainer.samples_seen})
+                # Labels that match no trained class are passed over for good, not retried every call
+                trainer.reviews_until = reviews[-1].moderated_at
+                labelled = [(r.text, to_class_code(r.moderator_label, trainer.classes)) for r in reviews]
+                labelled = [(text, label) for text, label in labelled if label is not None]
+                if not labelled:
+                    trainer.save(INCREMENTAL_PATH)
+                    INCREMENTAL_TRAINER, INCREMENTAL_VERSION = trainer, saved_version(INCREMENTAL_PATH)
+                    return jsonify({'message': f'None of the {len(reviews)} new moderator labels match a trained class',
+                                    'model_version': MODEL_VERSION, 'samples_seen': trainer.samples_seen})
+                texts, labels = [text for text, _ in labelled], [label for _, label in labelled]
+                source_name = f'{len(labelled)} moderated reviews'
+
+            # 2. partial_fit on the batch only, scored on the fixed holdout
+            increment = trainer.partial_fit(texts, labels, source=source_name)
+            if source == 'dataset':
+                trainer.sources.add(key)
+            else:
+                increment['skipped_rows'] += len(reviews) - len(labelled)
+
+            # 3. Publish a snapshot like /api/train does, then keep the new state
+            models = trainer.pipelines()
+            engine = EnsembleEngine(models, compile=COMPILE_MODELS)
+            version = MODEL_REGISTRY.publish(models, engine, {'metrics': increment['metrics'], 'dataset': source_name,
+                                                              'mode': 'incremental', 'samples_seen': trainer.samples_seen})
+            trainer.save(INCREMENTAL_PATH)
+            INCREMENTAL_TRAINER, INCREMENTAL_VERSION = trainer, saved_version(INCREMENTAL_PATH)
+            set_active_models(models, engine, f"v{version}", registry_version=version)
+
+            increment['timings']['total_s'] = round(time.time() - started, 3)
+            print(f"Incremental update {increment['increment']}: {increment['batch_rows']} rows from {source_name}, {trainer.samples_seen} seen")
+            return jsonify({'message': 'Incremental update complete', 'metrics': increment['metrics'],
+                            'model_version': MODEL_VERSION, 'increment': increment})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def parse_cascade_band(value):
+    """(low, high) of a cascade_band value, or None unless it is two numbers with 0 <= low <= high <= 1"""
+    if not isinstance(value, (list, tuple)) or len(value) != 2:
+        return None
+    if any(isinstance(b, bool) or not isinstance(b, (int, float)) for b in value):
+        return None
+    low, high = float(value[0]), float(value[1])
+    return (low, high) if 0 <= low <= high <= 1 else None
+
 @app.route('/api/predict', methods=['POST'])
 @jwt_required(optional=True)
 def predict():
@@ -376,94 +890,98 @@ def predict():
         data = request.json
         text = data.get('text', '')
         model_name = data.get('model', 'SVM') # Default to SVM
+        # 'cascade' consults SVM/LogisticRegression only when NaiveBayes is unsure; a confident
+        # NaiveBayes then also gives the main prediction (reported in model_used)
+        ensemble_mode = data.get('ensemble_mode', ENSEMBLE_MODE)
+        if ensemble_mode not in ENSEMBLE_MODES:
+            return jsonify({'error': f'ensemble_mode must be one of {list(ENSEMBLE_MODES)}'}), 400
+        cascade_band = parse_cascade_band(data.get('cascade_band', CASCADE_BAND))
+        if cascade_band is None:
+            return jsonify({'error': 'cascade_band must be two numbers [low, high] with 0 <= low <= high <= 1'}), 400
         
         if not text: return jsonify({'error': 'No text provided'}), 400
         
         # Reload models if they are missing
-        if not TRAINED_MODELS:
+        if not ENSEMBLE.names():
             load_models()
+        # One consistent model set (and version) for the whole request
+        engine = ENSEMBLE
             
-        if model_name not in TRAINED_MODELS: 
-            available = list(TRAINED_MODELS.keys())
+        if model_name not in engine: 
+            available = engine.names()
             return jsonify({'error': f'Model {model_name} not found. Available: {available}. Check if model files exist in {MODEL_FOLDER}'}), 500
         
-        model = TRAINED_MODELS[model_name]
-
-        # === RUN MODEL FIRST (must happen before label mapping) ===
-        prediction = model.predict([text])[0]
-        proba = model.predict_proba([text])[0]
-        classes = model.classes_
-        probs = {str(c): float(p) for c, p in zip(classes, proba)}
-        confidence = float(max(proba))
-        
-        # Label Mapping (Comprehensive: handles CG/OR codes and 0/1 integers)
-        label_raw = str(prediction).upper()
-        if label_raw in ['1', 'CG', 'FAKE']:
-            label_display = "Fake"
-        elif label_raw in ['0', 'OR', 'REAL']:
-            label_display = "Real"
+        # Identical texts (re-scraped pages, re-submitted CSVs) are served from the cache
+        cache_kind = f"predict:{ensemble_mode}:{cascade_band}" if ensemble_mode == 'cascade' else 'predict'
+        cache_key = make_key(text, model_name, engine.version, kind=cache_kind)
+        cached = PREDICTION_CACHE.get(cache_key)
+        if cached:
+            response = cached['response']
+            prediction = cached['prediction']
+            style = cached.get('style')
         else:
-            label_display = label_raw  # Fallback for unknown codes
-
-        # Consensus: Run ALL models and normalize to Fake/Real labels
-        model_predictions = {}
-        consensus_votes = {'Fake': 0, 'Real': 0}
-        for name, m in TRAINED_MODELS.items():
-            if hasattr(m, 'predict'):
-                pred = m.predict([text])[0]
-                # Map consensus votes
-                p_str = str(pred).upper()
-                vote_label = 'Real' if p_str in ['0', 'OR', 'REAL'] else 'Fake'
-                model_predictions[name] = vote_label
-                consensus_votes[vote_label] += 1
-        
-        # Trust Score
-        if 'OR' in model.classes_:
-            real_idx = list(model.classes_).index('OR')
-            trust_score = float(proba[real_idx]) * 100
-        elif 0 in model.classes_:
-            real_idx = list(model.classes_).index(0)
-            trust_score = float(proba[real_idx]) * 100
-        else:
-            trust_score = 50.0
+            # === RUN MODEL FIRST (must happen before label mapping) ===
+            # One featurization feeds the selected model, the trust score and every consensus vote
+            if ensemble_mode == 'cascade' or MICRO_BATCHER is None:
+                scored = engine.predict(text, model_name, cascade=(ensemble_mode == 'cascade'), band=cascade_band)
+            else:
+                # Concurrent requests are coalesced into one vectorized predict
+                scored = MICRO_BATCHER.submit((engine, text, model_name))
+            prediction = str(scored['prediction'])
 
-        # Lie Detection Analysis
-        lie_analysis = lie_detector.analyze(text)
-        
-        # Author DNA Analysis
-        dna_analysis = author_dna.analyze(text)
+            # One analyzed document feeds sentiment, lie detection and author DNA
+            doc = AnalyzedDocument(text)
 
-        # Sentiment Analysis
-        from textblob import TextBlob
-        sentiment = TextBlob(text).sentiment.polarity
+            # Lie Detection Analysis
+            lie_analysis = lie_detector.analyze(text, doc)
+            
+            # Author DNA Analysis (the raw vector is kept as the review's style fingerprint)
+            dna_vector = author_dna.features(text, doc)
+            dna_analysis = author_dna.features_to_result(dna_vector)
+            style = {'vector': [float(v) for v in dna_vector], 'n_tokens': len(doc.tokens)}
+
+            # Sentiment Analysis (same lexicon pass the lie detector used)
+            sentiment = doc.polarity
+
+            response = {
+                'label': scored['label'],
+                'confidence': scored['confidence'],
+                'probs': scored['probs'],
+                'sentiment': sentiment,
+                'model_used': scored['model_used'],
+                'model_version': engine.version,
+                'trust_score': scored['trust_score'],
+                'consensus': scored['consensus'],
+                'ensemble_mode': ensemble_mode,
+                'models_evaluated': scored['models_evaluated'],
+                'lie_detection': lie_analysis,
+                'author_dna': dna_analysis
+            }
+            PREDICTION_CACHE.set(cache_key, {'response': response, 'prediction': prediction, 'style': style})
         
         # Save to History
         try:
             review = Review(
                 text=text, 
-                label=str(prediction), 
-                confidence=confidence, 
-                sentiment=sentiment, 
+                label=prediction, 
+                confidence=response['confidence'], 
+                sentiment=response['sentiment'], 
+                model_version=response['model_version'],
                 timestamp=datetime.now()
             )
             db.session.add(review)
+            if style:
+                db.session.flush()
+                fingerprint = style_fingerprint(text, style['vector'], style['n_tokens'], data.get('author'), data.get('product'), review.id)
+                if fingerprint is not None:
+                    db.session.add(fingerprint)
             db.session.commit()
         except Exception as db_err:
             print(f"Database error: {db_err}")
             db.session.rollback()
             # We continue even if DB save fails, just to return the prediction
 
-        return jsonify({
-            'label': label_display,
-            'confidence': confidence,
-            'probs': probs,
-            'sentiment': sentiment,
-            'model_used': model_name,
-            'trust_score': trust_score,
-            'consensus': model_predictions,
-            'lie_detection': lie_analysis,
-            'author_dna': dna_analysis
-        })
+        return jsonify(response)
 
     except Exception as e:
         print(f"Prediction Error: {e}")
@@ -474,79 +992,144 @@ def predict_bulk():
     data = request.json
     reviews = data.get('reviews', [])
     model_name = data.get('model', 'SVM')
+    try:
+        chunk_size = data.get('chunk_size', BULK_CHUNK_SIZE)
+        if isinstance(chunk_size, (bool, float)):
+            raise TypeError(chunk_size)
+        chunk_size = int(chunk_size)
+        if chunk_size < 1:
+            raise ValueError(chunk_size)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'chunk_size must be a positive integer'}), 400
+    chunk_size = min(chunk_size, MAX_BULK_CHUNK_SIZE)
     
     if not reviews: return jsonify({'error': 'No reviews provided'}), 400
     
     # Reload models if missing
-    if not TRAINED_MODELS:
+    if not ENSEMBLE.names():
         load_models()
         
-    if model_name not in TRAINED_MODELS:
-        available = list(TRAINED_MODELS.keys())
+    engine = ENSEMBLE
+    if model_name not in engine:
+        available = engine.names()
         return jsonify({'error': f'Model {model_name} not found. Available: {available}. Check files in {MODEL_FOLDER}'}), 500
     
-    model = TRAINED_MODELS[model_name]
-    results = []
+    results = [None] * len(reviews)
     
-    for item in reviews:
+    # 1. Normalize input: handle both string and dict items
+    parsed = []  # (index, text, metadata)
+    for i, item in enumerate(reviews):
         try:
-            # Handle both string and dict input
             if isinstance(item, dict):
-                text = item.get('text', '')
-                metadata = item
-            else:
-                text = str(item)
-                metadata = {}
-                
-            # Selected model prediction
-            prediction = model.predict([text])[0]
-            proba = model.predict_proba([text])[0]
-            confidence = float(max(proba))
-            from textblob import TextBlob
-            sentiment = TextBlob(text).sentiment.polarity
-            
-            # Label Mapping
-            label_raw = str(prediction).upper()
-            if label_raw in ['1', 'CG', 'FAKE']:
-                label_display = "Fake"
-            elif label_raw in ['0', 'OR', 'REAL']:
-                label_display = "Real"
-            else:
-                label_display = label_raw
-
-            # Trust Score
-            if 'OR' in model.classes_:
-                real_idx = list(model.classes_).index('OR')
-                trust_score = float(proba[real_idx]) * 100
-            elif 0 in model.classes_:
-                real_idx = list(model.classes_).index(0)
-                trust_score = float(proba[real_idx]) * 100
+                parsed.append((i, item.get('text', ''), item))
             else:
-                 trust_score = 50.0 # Fallback
+                parsed.append((i, str(item), {}))
+        except Exception as e:
+            results[i] = {'text': str(item), 'error': str(e)}
+    
+    # 2. Serve repeated texts from the cache; only the rest goes through the model
+    cache_keys = {}
+    to_score = []
+    for i, text, metadata in parsed:
+        cached = None
+        if isinstance(text, str):
+            cache_keys[i] = make_key(text, model_name, engine.version, kind='bulk')
+            cached = PREDICTION_CACHE.get(cache_keys[i])
+        if cached:
+            cached.update({k: v for k, v in metadata.items() if k != 'text'})
+            results[i] = cached
+        else:
+            to_score.append((i, text, metadata))
+    
+    # 3. Selected model: one vectorized transform/predict per chunk
+    scored = {}
+    for start in range(0, len(to_score), chunk_size):
+        chunk = to_score[start:start + chunk_size]
+        try:
+            for (i, _, _), res in zip(chunk, engine.predict_batch([text for _, text, _ in chunk], model_name)):
+                scored[i] = res
+        except Exception as chunk_err:
+            # Keep per-item error isolation: re-score this chunk one review at a time
+            print(f"Bulk chunk failed ({chunk_err}), falling back to per-item scoring")
+            for i, text, _ in chunk:
+                try:
+                    scored[i] = engine.predict_batch([text], model_name)[0]
+                except Exception as e:
+                    results[i] = {'text': str(reviews[i]), 'error': str(e)}
+    
+    # 4. Lie detection and Author DNA for all scored reviews in batch passes
+    batch = [(i, text, metadata) for i, text, metadata in to_score if i in scored]
+    docs = {i: AnalyzedDocument(text) for i, text, _ in batch if isinstance(text, str)}
+    lie_results = {}
+    try:
+        frame = lie_detector.analyze_batch([text for _, text, _ in batch], [docs.get(i) for i, _, _ in batch])
+        lie_results = {i: lie_detector.batch_result(row) for (i, _, _), row in zip(batch, frame.to_dict('records'))}
+    except Exception as lie_err:
+        print(f"Batch lie detection failed ({lie_err}), falling back to per-item analysis")
+    # Author DNA features for the same reviews (one POS tagging batch)
+    dna_results, dna_vectors, fingerprints = {}, {}, []
+    try:
+        matrix = author_dna.analyze_batch([text for _, text, _ in batch], [docs.get(i) for i, _, _ in batch])
+        dna_vectors = {i: row for (i, text, _), row in zip(batch, matrix) if i in docs and text}
+        dna_results = {i: author_dna.features_to_result(row) for i, row in dna_vectors.items()}
+    except Exception as dna_err:
+        print(f"Batch Author DNA failed ({dna_err}), falling back to per-item analysis")
+
+    # 5. Per-item analysis and metadata
+    for i, text, metadata in batch:
+        try:
+            res = scored[i]
+            doc = docs.get(i) or AnalyzedDocument(text)
+            sentiment = doc.polarity
             
             # Lie Detection Analysis
-            lie_analysis = lie_detector.analyze(text)
+            lie_analysis = lie_results.get(i) or lie_detector.analyze(text, doc)
             
             # Author DNA Analysis
-            dna_analysis = author_dna.analyze(text)
+            dna_analysis = dna_results.get(i) or author_dna.analyze(text, doc)
 
             result = {
                 'text': text,
-                'label': label_display,
-                'confidence': confidence,
+                'label': res['label'],
+                'confidence': res['confidence'],
                 'sentiment': sentiment,
-                'trust_score': round(trust_score, 2),
+                'trust_score': round(res['trust_score'], 2),
                 'lie_detection': lie_analysis,
                 'author_dna': dna_analysis
             }
+            if i in cache_keys:
+                PREDICTION_CACHE.set(cache_keys[i], result)
             # Merge metadata (date, rating, author)
             result.update({k: v for k, v in metadata.items() if k != 'text'})
-            results.append(result)
+            results[i] = result
+            if i in dna_vectors:
+                fingerprint = style_fingerprint(text, dna_vectors[i], len(doc.tokens), metadata.get('author'),
+                                                metadata.get('product') or data.get('product'))
+                if fingerprint is not None:
+                    fingerprints.append(fingerprint)
 
         except Exception as e:
-            results.append({'text': str(item), 'error': str(e)})
+            results[i] = {'text': str(reviews[i]), 'error': str(e)}
+
+    # 6. Style fingerprints of the newly scored reviews, in one commit
+    if fingerprints:
+        try:
+            db.session.add_all(fingerprints)
+            db.session.commit()
+        except Exception as db_err:
+            print(f"Database error: {db_err}")
+            db.session.rollback()
+
+    # 7. Near-duplicate groups within the submitted reviews (e.g. one scraped product page)
+    near_duplicates = []
+    try:
+        index = NearDuplicateIndex(NEAR_DUPLICATE_THRESHOLD, num_perm=NEAR_DUPLICATE_PERMS)
+        index.add_many([i for i, _, _ in parsed], [text if isinstance(text, str) else '' for _, text, _ in parsed])
+        near_duplicates = format_duplicate_clusters(index, index.clusters())
+    except Exception as dup_err:
+        print(f"Near-duplicate detection failed: {dup_err}")
             
-    return jsonify({'results': results})
+    return jsonify({'results': results, 'model_version': engine.version, 'near_duplicates': near_duplicates})
 
 def generate_synthetic_reviews(scraped_reviews, platform="Amazon", count=10):
     """
@@ -603,6 +1186,8 @@ def generate_synthetic_reviews(scraped_reviews, platform="Amazon", count=10):
 
 @app.route('/api/scrape', methods=['POST'])
 def scrape_reviews():
+    import requests
+    from bs4 import BeautifulSoup
     data = request.json
     url = data.get('url')
     max_items = data.get('max_items', 20) # Default to 20
@@ -916,6 +1501,7 @@ def extract_ubuy_asin(ubuy_url):
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
     }
     
+    import requests
     print(f"Fetching Ubuy Page: {ubuy_url}")
     res = requests.get(ubuy_url, headers=headers, timeout=15)
     
@@ -958,34 +1544,239 @@ def get_history():
     reviews = Review.query.order_by(Review.timestamp.desc()).limit(50).all()
     return jsonify([r.to_dict() for r in reviews])
 
+@app.route('/api/reviews/<int:review_id>/label', methods=['POST'])
+@jwt_required()
+def label_review(review_id):
+    """Record a moderator's Fake/Real verdict on a scored review (absorbed by /api/train/incremental)"""
+    data = request.json or {}
+    label = display_label(data.get('label', '')) if data.get('label') else None
+    if label not in ['Fake', 'Real']:
+        return jsonify({'error': "label must be 'Fake' or 'Real'"}), 400
+    review = db.session.get(Review, review_id)
+    if review is None:
+        return jsonify({'error': 'Review not found'}), 404
+    try:
+        review.moderator_label = label
+        review.moderated_at = datetime.utcnow()
+        db.session.commit()
+        return jsonify(review.to_dict())
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/style/similar', methods=['POST'])
+def get_similar_style():
+    """
+    Reviews written in a near-identical style to a text (or a stored fingerprint):
+    {text | fingerprint_id, k, radius, product}. Matches under other author names
+    are the sockpuppet candidates.
+    """
+    try:
+        data = request.json or {}
+        k = max(1, min(int(data.get('k', 10)), 100))
+        radius = float(data.get('radius', STYLE_MATCH_RADIUS))
+        product = data.get('product')
+        refresh_style_index()
+
+        exclude, author = (), data.get('author')
+        if data.get('fingerprint_id') is not None:
+            row = db.session.get(StyleFingerprint, int(data['fingerprint_id']))
+            if row is None:
+                return jsonify({'error': 'Unknown fingerprint_id'}), 404
+            vector, exclude, author = json.loads(row.vector), (row.id,), row.author
+        elif data.get('text'):
+            vector = author_dna.features(data['text'])
+        else:
+            return jsonify({'error': 'Provide text or fingerprint_id'}), 400
+
+        start = time.time()
+        matches = STYLE_INDEX.query(vector, k=k, radius=radius, product=product, exclude=exclude)
+        elapsed_ms = (time.time() - start) * 1000
+        results = []
+        for row, distance in matches:
+            meta = STYLE_INDEX.meta[row]
+            results.append({'fingerprint_id': STYLE_INDEX.ids[row], 'distance': round(distance, 4),
+                            'other_author': bool(author and meta['author'] and meta['author'] != author),
+                            'author': meta['author'], 'product': meta['product'],
+                            'review_id': meta['review_id'], 'text': (meta['text'] or '')[:300]})
+        return jsonify({'matches': results, 'radius': radius, 'indexed': len(STYLE_INDEX), 'query_ms': round(elapsed_ms, 2)})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/style/clusters', methods=['GET'])
+def get_style_clusters():
+    """Groups of reviews in near-identical styles posted under two or more author names"""
+    try:
+        radius = float(request.args.get('radius', STYLE_MATCH_RADIUS))
+        product = request.args.get('product')
+        min_authors = int(request.args.get('min_authors', 2))
+        refresh_style_index()
+
+        start = time.time()
+        groups = STYLE_INDEX.clusters(radius=radius, product=product)
+        elapsed_ms = (time.time() - start) * 1000
+        clusters = []
+        for rows in groups:
+            authors = sorted({STYLE_INDEX.meta[r]['author'] for r in rows if STYLE_INDEX.meta[r]['author']})
+            if len(authors) < min_authors:
+                continue
+            clusters.append({'size': len(rows), 'authors': authors,
+                             'reviews': [{'fingerprint_id': STYLE_INDEX.ids[r], 'author': STYLE_INDEX.meta[r]['author'],
+                                          'product': STYLE_INDEX.meta[r]['product'],
+                                          'text': (STYLE_INDEX.meta[r]['text'] or '')[:200]} for r in rows[:50]]})
+        return jsonify({'clusters': clusters, 'radius': radius, 'indexed': len(STYLE_INDEX), 'query_ms': round(elapsed_ms, 2)})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/duplicates', methods=['GET', 'POST'])
+def get_near_duplicates():
+    """
+    Clusters of near-duplicate reviews (templated or copy-pasted text) with their
+    estimated Jaccard similarity. POST {reviews: [...]} checks the given reviews
+    (e.g. one scraped product); source=history checks the saved Review history,
+    source=dataset the current dataset. Optional: threshold, min_size.
+    """
+    try:
+        params = dict(request.args)
+        params.update(request.get_json(silent=True) or {})
+        threshold = float(params.get('threshold', NEAR_DUPLICATE_THRESHOLD))
+        min_size = max(2, int(params.get('min_size', 2)))
+        source = params.get('source', 'reviews' if params.get('reviews') else 'history')
+
+        start = time.time()
+        if source == 'reviews':
+            reviews = params.get('reviews') or []
+            if not reviews:
+                return jsonify({'error': 'No reviews provided'}), 400
+            texts = [r.get('text', '') if isinstance(r, dict) else str(r) for r in reviews]
+            index = NearDuplicateIndex(threshold, num_perm=NEAR_DUPLICATE_PERMS)
+            index.add_many(list(range(len(texts))), texts)
+        elif source == 'history':
+            refresh_duplicate_index()
+            index = HISTORY_DUPLICATES
+        elif source == 'dataset':
+            if not CURRENT_DATASET_PATH:
+                return jsonify({'error': 'No dataset uploaded'}), 400
+            index = dataset_duplicate_index()
+        else:
+            return jsonify({'error': f'Unknown source {source}. Use reviews, history or dataset'}), 400
+
+        groups = index.clusters(threshold=threshold, min_size=min_size)
+        clusters = format_duplicate_clusters(index, groups)
+        return jsonify({'source': source, 'clusters': clusters, 'threshold': threshold, 'indexed': len(index),
+                        'duplicated_reviews': sum(c['size'] for c in clusters),
+                        'elapsed_ms': round((time.time() - start) * 1000, 2)})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Prediction cache hit/miss counters for sizing PREDICTION_CACHE_*"""
+    stats = PREDICTION_CACHE.stats()
+    stats['model_version'] = MODEL_VERSION
+    stats['feature_cache'] = FEATURE_CACHE.stats()
+    return jsonify(stats)
+
+@app.route('/api/models/versions', methods=['GET'])
+def get_model_versions():
+    """Published model versions (newest first) and the one this worker is serving"""
+    try:
+        return jsonify({'active': MODEL_VERSION, 'versions': MODEL_REGISTRY.describe()})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/models/evaluate', methods=['POST'])
+def evaluate_models():
+    """
+    Metrics of a published version (default: the active one) on the current dataset's
+    holdout split. A version trained on this dataset scores the cached holdout
+    features directly; any other version runs its own pipelines on the holdout texts.
+    """
+    data = request.json or {}
+    text_col = data.get('text_column', 'text')
+    label_col = data.get('label_column', 'label')
+    if not CURRENT_DATASET_PATH:
+        return jsonify({'error': 'No dataset uploaded'}), 400
+    try:
+        start = time.time()
+        version = int(data.get('version') or MODEL_REGISTRY.current() or 0)
+        if version not in MODEL_REGISTRY.versions():
+            return jsonify({'error': f'Unknown model version {version}'}), 404
+        models, _, meta = MODEL_REGISTRY.load(version, compile=False)
+        # The version's own settings: a tuned version's features are cached under its config
+        vectorizer, (_, _, X_test_vec, y_test), features = vectorized_split(text_col, label_col, build_models(meta.get('config'))[0])
+        shared_features = meta.get('features') == features['key']
+        if not shared_features:
+            _, X_test, _, y_test = dataset_split(text_col, label_col)
+        metrics = {}
+        for name, pipeline in models.items():
+            if shared_features:
+                metrics[name] = score_classifier(name, pipeline.named_steps['clf'], X_test_vec, y_test)
+            else:
+                metrics[name] = score_classifier(name, pipeline, X_test, y_test)
+        return jsonify({'model_version': f"v{version}", 'metrics': metrics, 'cached_features': shared_features,
+                        'elapsed_s': round(time.time() - start, 3)})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/models/rollback', methods=['POST'])
+def rollback_models():
+    """Point every worker back at an earlier version (default: the previous one)"""
+    data = request.json or {}
+    try:
+        version = MODEL_REGISTRY.rollback(data.get('version'))
+        activate_registry_version(version)
+        return jsonify({'message': f'Rolled back to v{version}', 'model_version': MODEL_VERSION})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/startup/profile', methods=['GET'])
+def get_startup_profile():
+    """Per-import and per-step startup breakdown (enable with STARTUP_PROFILE=1)"""
+    return jsonify(STARTUP.report())
+
+@app.route('/api/warmup', methods=['GET'])
+def warmup():
+    """Keep-warm hook for serverless/cron pings: loads analyzer resources and reports what is bundled"""
+    try:
+        timings = warmup_analyzers()
+        return jsonify({
+            'warmup_seconds': timings,
+            'nltk_bundle': nltk_resources.BUNDLE_PATH,
+            'missing_nltk_resources': nltk_resources.missing_resources(),
+            'models': ENSEMBLE.names()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/batcher/stats', methods=['GET'])
+def get_batcher_stats():
+    """Queue depth and batch-size histograms for tuning MICRO_BATCH_WAIT_MS / MICRO_BATCH_MAX"""
+    if MICRO_BATCHER is None:
+        return jsonify({'enabled': False})
+    stats = MICRO_BATCHER.stats()
+    stats['enabled'] = True
+    return jsonify(stats)
+
 @app.route('/api/model/features', methods=['GET'])
 def get_model_features():
     """Extract top 20 positive and negative features from the model"""
     model_name = request.args.get('model', 'SVM')
-    if model_name not in TRAINED_MODELS:
+    if model_name not in ENSEMBLE:
         return jsonify({'error': 'Model not found'}), 400
         
-    pipeline = TRAINED_MODELS[model_name]
     try:
-        # Check if pipeline has a linear model with coefficients
-        vectorizer = pipeline.named_steps['tfidf']
-        classifier = pipeline.named_steps['clf']
-        
-        # Handle CalibratedClassifierCV wrapper for SVM
-        if hasattr(classifier, 'calibrated_classifiers_'):
-            # Use the estimator of the first calibrated classifier
-            cc = classifier.calibrated_classifiers_[0]
-            if hasattr(cc, 'estimator'):
-                classifier = cc.estimator
-            elif hasattr(cc, 'base_estimator'):
-                classifier = cc.base_estimator
-            
-        if not hasattr(classifier, 'coef_'):
+        # Check if the model is linear; CalibratedClassifierCV is averaged over its folds,
+        # and compiled/memory-mapped heads answer from their weight arrays
+        feature_names, coefs = ENSEMBLE.feature_weights(model_name)
+        if coefs is None:
              return jsonify({'error': 'Model does not support feature extraction (no coefficients)'}), 400
              
-        feature_names = vectorizer.get_feature_names_out()
         import numpy as np
-        coefs = classifier.coef_[0]
         
         # Get top 10 positive (Fake) and top 10 negative (Real)
         top_positive_indices = np.argsort(coefs)[-10:]
@@ -1012,13 +1803,13 @@ def get_analytics():
         
     try:
         import pandas as pd
-        from textblob import TextBlob
+        from sentiment_engine import sentiment_batch
         df = pd.read_csv(CURRENT_DATASET_PATH)
         
-        # Subsetting for Vercel to avoid timeouts (TextBlob is slow)
-        if IS_VERCEL and len(df) > 50:
-            df = df.head(50)
-            print("Vercel mode: Analytics subsetted to 50 rows for speed.")
+        # Subsetting for Vercel to stay inside the function timeout
+        if IS_VERCEL and len(df) > ANALYTICS_MAX_ROWS:
+            df = df.head(ANALYTICS_MAX_ROWS)
+            print(f"Vercel mode: Analytics subsetted to {ANALYTICS_MAX_ROWS} rows for speed.")
             
         # Assume columns 'text', 'label', 'rating' exist or try to find them
         text_col = next((c for c in df.columns if 'text' in c.lower() or 'review' in c.lower()), 'text')
@@ -1034,6 +1825,15 @@ def get_analytics():
             auth_dist = df['normalized_label'].value_counts().to_dict()
         else:
             auth_dist = {}
+
+        # Lie detection scores (and polarity, reused by the charts below) in one batch pass
+        lie = lie_detector.analyze_batch(df[text_col].astype(str))
+        df['polarity'] = lie['polarity']
+        score_cols = ['deception_score', 'exaggeration_score', 'emotional_intensity', 'repetition_score', 'promotional_score']
+        lie_summary = {'overall': {c: round(float(lie[c].mean()), 2) for c in score_cols} if len(df) else {}}
+        if 'normalized_label' in df.columns:
+            by_label = lie[score_cols].groupby(df['normalized_label']).mean()
+            lie_summary['by_label'] = {label: {c: round(float(v), 2) for c, v in row.items()} for label, row in by_label.iterrows()}
             
         # 2. Vocabulary Richness (Avg unique words / total words)
         def get_richness(text):
@@ -1045,10 +1845,10 @@ def get_analytics():
         avg_richness = float(df['richness'].mean())
         
         # 3. Sentence Count Distribution
-        def get_sentence_count(text):
-            return len(TextBlob(str(text)).sentences)
-            
-        df['sentence_count'] = df[text_col].apply(get_sentence_count)
+        # Same Punkt split TextBlob(text).sentences uses, without building a TextBlob per row
+        nltk_resources.ensure_resources()
+        import nltk
+        df['sentence_count'] = df[text_col].apply(lambda text: len(nltk.sent_tokenize(str(text))))
         # Bucketize (Robustly)
         try:
             if df['sentence_count'].nunique() > 1:
@@ -1088,11 +1888,6 @@ def get_analytics():
         else:
             # Fallback: Infer rating from sentiment if column is missing
             try:
-                def get_polarity(text):
-                    return TextBlob(str(text)).sentiment.polarity
-                
-                df['polarity'] = df[text_col].apply(get_polarity)
-                
                 # Use rank-based bucketing to handle duplicate polarity values
                 # pct=True gives rank as a fraction 0-1, then multiply by 5 and ceil to get 1-5
                 df['inferred_rating'] = (df['polarity'].rank(pct=True) * 5).apply(lambda x: min(int(x) + 1, 5))
@@ -1124,7 +1919,7 @@ def get_analytics():
                 
                 # Calculate polarity if not already done
                 if 'polarity' not in temp_df.columns:
-                     temp_df['polarity'] = temp_df[text_col].apply(lambda x: TextBlob(str(x)).sentiment.polarity)
+                     temp_df['polarity'] = sentiment_batch(temp_df[text_col])[0]
                 
                 # Group by date (daily) and take mean sentiment
                 trend = temp_df.groupby(temp_df[date_col].dt.strftime('%Y-%m-%d'))['polarity'].mean().reset_index()
@@ -1140,7 +1935,8 @@ def get_analytics():
             'vocabulary_richness': avg_richness,
             'sentence_distribution': sent_dist,
             'rating_distribution': rating_auth_dist,
-            'sentiment_trend': sentiment_trend
+            'sentiment_trend': sentiment_trend,
+            'lie_detection': lie_summary
         })
         
     except Exception as e:
@@ -1,43 +1,184 @@
-import nltk
 import os
+import re
+import json
+from collections import Counter
+from nltk_resources import ensure_resources
+from nlp_document import AnalyzedDocument, pos_tag_sents
+
+# 'accurate': perceptron POS tags (as nltk.pos_tag), 'fast': TagLookup table
+AUTHOR_DNA_MODE = os.environ.get('AUTHOR_DNA_MODE', 'accurate')
+MODES = ('accurate', 'fast')
+
+# Columns of the analyze_batch() feature matrix
+FEATURES = ['avg_sentence_len', 'vocab_diversity', 'stopword_ratio', 'noun_ratio', 'verb_ratio',
+            'adj_ratio', 'exclamation_density', 'question_density']
+
+JJ_SUFFIXES = ('able', 'ible', 'al', 'ful', 'ish', 'ive', 'less', 'ous', 'ic', 'ent', 'ant')
+PUNCT_TAGS = {'.': '.', '!': '.', '?': '.', ',': ',', ':': ':', ';': ':', '...': ':', '--': ':',
+              '(': '(', ')': ')', '``': '``', "''": "''", '$': '$', '#': '#'}
+
+
+def guess_tag(word):
+    """Penn tag from the shape and suffix of a word the lookup table has never seen"""
+    if word in PUNCT_TAGS:
+        return PUNCT_TAGS[word]
+    if not any(c.isalnum() for c in word):
+        return 'SYM'
+    if re.match(r'^[0-9\-\,\.\:\/\%\$]+$', word):
+        return 'CD'
+    if word[0].isupper():
+        return 'NNP'
+    lower = word.lower()
+    if lower.endswith('ing'):
+        return 'VBG'
+    if lower.endswith('ed'):
+        return 'VBN'
+    if lower.endswith('ly'):
+        return 'RB'
+    if lower.endswith(JJ_SUFFIXES) or '-' in lower:
+        return 'JJ'
+    if lower.endswith('s') and not lower.endswith(('ss', 'us', 'is')):
+        return 'NNS'
+    return 'NN'
 
-# Optimize NLTK for Vercel (Download to /tmp)
-NLTK_DATA_PATH = '/tmp/nltk_data'
-# It's better to ensure it exists before appending to path
-os.makedirs(NLTK_DATA_PATH, exist_ok=True)
-if NLTK_DATA_PATH not in nltk.data.path:
-    nltk.data.path.append(NLTK_DATA_PATH)
-
-def download_nltk_capsule():
-    packages = [
-        ('tokenizers/punkt', 'punkt'),
-        ('taggers/averaged_perceptron_tagger_eng', 'averaged_perceptron_tagger_eng'),
-        ('corpora/stopwords', 'stopwords')
-    ]
-    for find_path, pkg_name in packages:
+
+class TagLookup:
+    """
+    Context-free word -> POS tag table for AuthorDNA's fast mode.
+
+    Seeded with the perceptron tagger's dictionary of unambiguous words (read
+    from its tagdict file, without loading the model weights) and extended
+    with the most frequent tag of every word that accurate mode has tagged.
+    Words in neither fall back to guess_tag().
+    """
+
+    def __init__(self, tagdict=None, max_words=100000):
+        self.tagdict = dict(tagdict or {})
+        self.max_words = max_words
+        self.learned = {}    # word -> most frequent tag seen
+        self._counts = {}    # word -> Counter of tags
+
+    @classmethod
+    def from_nltk(cls, **kwargs):
+        ensure_resources()
+        import nltk
         try:
-            nltk.data.find(find_path)
-        except LookupError:
-            nltk.download(pkg_name, download_dir=NLTK_DATA_PATH, quiet=True)
+            folder = nltk.data.find('taggers/averaged_perceptron_tagger_eng/')
+            with open(os.path.join(folder.path, 'averaged_perceptron_tagger_eng.tagdict.json')) as f:
+                tagdict = json.load(f)
+        except (LookupError, OSError, AttributeError):
+            from nlp_document import _get_pos_tagger
+            tagdict = _get_pos_tagger().tagdict
+        return cls(tagdict, **kwargs)
 
-download_nltk_capsule()
+    def learn(self, tagged):
+        """Count (word, tag) pairs from accurate tagging"""
+        for word, tag in tagged:
+            counts = self._counts.get(word)
+            if counts is None:
+                if len(self._counts) >= self.max_words:
+                    continue
+                counts = self._counts[word] = Counter()
+            counts[tag] += 1
+            best = self.learned.get(word)
+            if best is None or counts[tag] > counts[best]:
+                self.learned[word] = tag
+
+    def lookup(self, word):
+        tag = self.tagdict.get(word) or self.learned.get(word)
+        return tag if tag else guess_tag(word)
+
+    def tag(self, tokens):
+        return [(word, self.lookup(word)) for word in tokens]
 
-import re
-from collections import Counter
-from textblob import TextBlob
-from nltk.corpus import stopwords
 
 class AuthorDNA:
-    def __init__(self):
-        self.stop_words = set(stopwords.words('english'))
+    def __init__(self, mode=AUTHOR_DNA_MODE):
+        if mode not in MODES:
+            raise ValueError(f"Unknown AuthorDNA mode {mode!r}, expected one of {MODES}")
+        self.mode = mode
+        # NLTK resources are resolved on first use (or warmup()), never at import
+        self._stop_words = None
+        self._lookup = None
+
+    @property
+    def stop_words(self):
+        if self._stop_words is None:
+            ensure_resources()
+            from nltk.corpus import stopwords
+            self._stop_words = set(stopwords.words('english'))
+        return self._stop_words
 
-    def analyze(self, text):
+    @property
+    def lookup(self):
+        if self._lookup is None:
+            self._lookup = TagLookup.from_nltk()
+        return self._lookup
+
+    def warmup(self):
+        """Load stopwords, the punkt tokenizer and the POS tagger (or lookup table) ahead of the first request"""
+        self.analyze("Warm up the tokenizer. Then tag this sentence!")
+        if self.mode == 'fast':
+            self.lookup
+
+    def analyze(self, text, doc=None, mode=None):
+        """
+        doc: a shared AnalyzedDocument for text, so tokenization and tagging run once per review.
+        mode: 'accurate' or 'fast' for this call (default: the instance's mode).
+        """
         if not text or not isinstance(text, str):
             return self._empty_result()
+        return self.features_to_result(self.features(text, doc, mode))
+
+    def features(self, text, doc=None, mode=None):
+        """The FEATURES vector of one non-empty review (the style fingerprint analyze() summarizes)"""
+        # nltk (slow to import: it loads scipy and sklearn) is only touched inside the document stages
+        doc = doc or AnalyzedDocument(text)
+        if (mode or self.mode) == 'fast' and 'pos_tags' not in doc.__dict__:
+            pos_tags = self.lookup.tag(doc.tokens)
+        else:
+            pos_tags = doc.pos_tags
+            if self._lookup is not None:
+                self._lookup.learn(pos_tags)
+        return self._features(text, doc.sentences, doc.tokens, pos_tags)
 
-        # Tokenization
-        sentences = nltk.sent_tokenize(text)
-        words = nltk.word_tokenize(text)
+    def analyze_batch(self, texts, docs=None, mode=None):
+        """
+        Stylometric features for many texts as a float matrix, one row per text and
+        one column per FEATURES entry (unrounded). Accurate mode tags every text in a
+        single pos_tag_sents() call; fast mode uses the lookup table. Rows for empty
+        or non-string texts are zero. features_to_result() turns a row into the
+        dict analyze() returns.
+        """
+        import numpy as np
+        mode = mode or self.mode
+        if mode not in MODES:
+            raise ValueError(f"Unknown AuthorDNA mode {mode!r}, expected one of {MODES}")
+        texts = list(texts)
+        docs = list(docs) if docs is not None else [None] * len(texts)
+        valid = [i for i, text in enumerate(texts) if text and isinstance(text, str)]
+        for i in valid:
+            docs[i] = docs[i] or AnalyzedDocument(texts[i])
+
+        # 1. POS tags: reuse what the documents already have, tag the rest in one batch
+        tags = {i: docs[i].pos_tags for i in valid if 'pos_tags' in docs[i].__dict__}
+        pending = [i for i in valid if i not in tags]
+        if mode == 'fast':
+            tags.update((i, self.lookup.tag(docs[i].tokens)) for i in pending)
+        elif pending:
+            for i, tagged in zip(pending, pos_tag_sents([docs[i].tokens for i in pending])):
+                tags[i] = tagged
+                if self._lookup is not None:
+                    self._lookup.learn(tagged)
+
+        # 2. One feature row per text
+        matrix = np.zeros((len(texts), len(FEATURES)))
+        for i in valid:
+            matrix[i] = self._features(texts[i], docs[i].sentences, docs[i].tokens, tags[i])
+        return matrix
+
+    def _features(self, text, sentences, words, pos_tags):
+        """The FEATURES vector of one review"""
         words_alpha = [w.lower() for w in words if w.isalpha()]
         
         # 1. Average Sentence Length
@@ -52,7 +193,6 @@ class AuthorDNA:
         stopword_ratio = stopword_count / len(words_alpha) if words_alpha else 0
         
         # 4. POS Tag Distribution
-        pos_tags = nltk.pos_tag(words)
         pos_counts = Counter(tag[:2] for word, tag in pos_tags) # simplify tags (NN, VB, JJ)
         total_pos = len(pos_tags)
         
@@ -65,21 +205,27 @@ class AuthorDNA:
         total_chars = len(text)
         exclamation_density = (punct_counts.get('!', 0) / total_chars) * 100 if total_chars else 0
         question_density = (punct_counts.get('?', 0) / total_chars) * 100 if total_chars else 0
-        
+
+        return [avg_sentence_length, vocab_diversity, stopword_ratio, noun_ratio, verb_ratio,
+                adj_ratio, exclamation_density, question_density]
+
+    def features_to_result(self, features):
+        """A FEATURES vector (list or analyze_batch row) in the shape analyze() returns"""
+        f = dict(zip(FEATURES, (float(x) for x in features)))
         return {
-            'avg_sentence_len': round(avg_sentence_length, 2),
-            'vocab_diversity': round(vocab_diversity, 2),
-            'stopword_ratio': round(stopword_ratio, 2),
+            'avg_sentence_len': round(f['avg_sentence_len'], 2),
+            'vocab_diversity': round(f['vocab_diversity'], 2),
+            'stopword_ratio': round(f['stopword_ratio'], 2),
             'pos_ratios': {
-                'noun': round(noun_ratio, 2),
-                'verb': round(verb_ratio, 2),
-                'adj': round(adj_ratio, 2)
+                'noun': round(f['noun_ratio'], 2),
+                'verb': round(f['verb_ratio'], 2),
+                'adj': round(f['adj_ratio'], 2)
             },
             'punctuation': {
-                'exclamation_density': round(exclamation_density, 2),
-                'question_density': round(question_density, 2)
+                'exclamation_density': round(f['exclamation_density'], 2),
+                'question_density': round(f['question_density'], 2)
             },
-            'style_label': self._determine_style(avg_sentence_length, vocab_diversity, exclamation_density)
+            'style_label': self._determine_style(f['avg_sentence_len'], f['vocab_diversity'], f['exclamation_density'])
         }
 
     def _empty_result(self):
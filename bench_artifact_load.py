@@ -0,0 +1,93 @@
+import os
+import sys
+import json
+import time
+import pickle
+import tempfile
+import subprocess
+import numpy as np
+
+# Cold-start model loading: unpickling the pipelines vs memory-mapping the binary artifacts.
+# Each measurement runs in a fresh interpreter, like a newly forked gunicorn worker.
+# Usage: python bench_artifact_load.py [vocabulary_size]   (0 = the artifacts in model/artifacts)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+LOAD_PICKLES = """
+import pickle
+from ensemble import EnsembleEngine
+from model_artifacts import PIPELINE_FILES
+models = {}
+for name, filename in PIPELINE_FILES:
+    with open(os.path.join(FOLDER, filename), 'rb') as f:
+        models[name] = pickle.load(f)
+engine = EnsembleEngine(models, compile=True)
+"""
+
+LOAD_BINARY = """
+from ensemble import EnsembleEngine
+from model_artifacts import load_compiled
+featurizers, heads, manifest = load_compiled(os.path.join(FOLDER, 'compiled'))
+engine = EnsembleEngine.from_compiled(featurizers, heads)
+"""
+
+def measure(loader, folder):
+    """Seconds to load + score one review, and private (anonymous) resident MB, in a fresh process"""
+    script = f"""
+import os, sys, time, json
+sys.path.insert(0, {BASE_DIR!r})
+FOLDER = {folder!r}
+start = time.perf_counter()
+{loader}
+engine.predict('Great product, works exactly as described', 'SVM')
+elapsed = time.perf_counter() - start
+# RssAnon is memory this worker owns; mapped artifact pages are file-backed and shared (Linux only)
+with open('/proc/self/status') as f:
+    private_kb = next(int(line.split()[1]) for line in f if line.startswith('RssAnon:'))
+print(json.dumps({{'seconds': elapsed, 'private_mb': private_kb / 1024}}))
+"""
+    out = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def build_synthetic(folder, vocabulary_size):
+    """Train the three pipelines on random documents so the vocabulary has roughly vocabulary_size terms"""
+    import warnings
+    from sklearn.pipeline import Pipeline
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.svm import LinearSVC
+    from sklearn.naive_bayes import MultinomialNB
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.calibration import CalibratedClassifierCV
+    from model_artifacts import PIPELINE_FILES, convert
+
+    warnings.filterwarnings('ignore')
+    rng = np.random.default_rng(0)
+    words = np.array([f"w{i}" for i in range(vocabulary_size)])
+    texts = [" ".join(rng.choice(words, 40)) for _ in range(max(200, vocabulary_size // 10))]
+    labels = rng.choice(['CG', 'OR'], len(texts))
+    vectorizer = TfidfVectorizer().fit(texts)
+    X = vectorizer.transform(texts)
+    classifiers = {'SVM': CalibratedClassifierCV(LinearSVC()), 'NaiveBayes': MultinomialNB(), 'LogisticRegression': LogisticRegression()}
+    for name, filename in PIPELINE_FILES:
+        with open(os.path.join(folder, filename), 'wb') as f:
+            pickle.dump(Pipeline([('tfidf', vectorizer), ('clf', classifiers[name].fit(X, labels))]), f)
+    convert(folder)
+    return len(vectorizer.vocabulary_)
+
+def main(vocabulary_size=0, repeats=5):
+    with tempfile.TemporaryDirectory() as tmp:
+        if vocabulary_size:
+            folder = tmp
+            print(f"Synthetic models with {build_synthetic(folder, vocabulary_size)} terms")
+        else:
+            folder = os.path.join(BASE_DIR, 'model', 'artifacts')
+            print(f"Artifacts in {folder}")
+
+        for label, loader in [('pickle + compile', LOAD_PICKLES), ('binary (mmap)', LOAD_BINARY)]:
+            runs = [measure(loader, folder) for _ in range(repeats)]
+            seconds = sorted(r['seconds'] for r in runs)[len(runs) // 2]
+            private = sorted(r['private_mb'] for r in runs)[len(runs) // 2]
+            print(f"{label:18s} load + first prediction: {seconds * 1000:8.1f} ms   private RSS: {private:7.1f} MB")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 0)
@@ -0,0 +1,52 @@
+import sys
+import time
+import random
+import numpy as np
+from author_dna import AuthorDNA, TagLookup, FEATURES
+from nlp_document import AnalyzedDocument
+
+# AuthorDNA throughput (old per-call nltk.pos_tag, accurate per review, accurate batch, fast batch)
+# and how far fast-mode POS ratios are from accurate ones, before and after the lookup table has
+# learned from accurate tags of a disjoint set of reviews. Usage: python bench_author_dna.py [n_reviews]
+
+def make_reviews(n, rng):
+    subjects = ["The battery", "This phone", "The seller", "Shipping", "The screen", "My order", "Customer support"]
+    verbs = ["works", "arrived", "broke", "lasts", "looks", "feels", "failed", "exceeded my expectations"]
+    extras = ["quickly", "after two days", "and I am happy", "but the box was damaged", "as described",
+              "!!!", "honestly", "for the price", "which is disappointing", "with no issues"]
+    return [' '.join(f"{rng.choice(subjects)} {rng.choice(verbs)} {rng.choice(extras)}."
+                     for _ in range(rng.randint(1, 5))) for _ in range(n)]
+
+def timed(fn):
+    start = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - start
+
+def main(n=2000):
+    import nltk
+    rng = random.Random(0)
+    texts = make_reviews(n, rng)
+    learn_texts = make_reviews(n, rng)
+    dna = AuthorDNA()
+    dna.analyze_batch(texts[:5])
+
+    old_n = min(n, 50)
+    _, old_s = timed(lambda: [nltk.pos_tag(AnalyzedDocument(t).tokens) for t in texts[:old_n]])
+    _, single_s = timed(lambda: [dna.analyze(t, mode='accurate') for t in texts])
+    accurate, batch_s = timed(lambda: dna.analyze_batch(texts, mode='accurate'))
+
+    dna._lookup = TagLookup.from_nltk()
+    cold, cold_s = timed(lambda: dna.analyze_batch(texts, mode='fast'))
+    dna._lookup.learn(tag for tagged in [AnalyzedDocument(t).pos_tags for t in learn_texts] for tag in tagged)
+    warm, warm_s = timed(lambda: dna.analyze_batch(texts, mode='fast'))
+
+    per_ms = lambda seconds, count: seconds / count * 1000
+    print(f"{n} reviews (ms/review): nltk.pos_tag per call {per_ms(old_s, old_n):.2f}   accurate {per_ms(single_s, n):.2f}   "
+          f"accurate batch {per_ms(batch_s, n):.2f}   fast batch {per_ms(cold_s, n):.2f} / {per_ms(warm_s, n):.2f} (cold / learned)")
+    for name in ['noun_ratio', 'verb_ratio', 'adj_ratio']:
+        col = FEATURES.index(name)
+        print(f"  {name:11s} mean abs error vs accurate: cold {np.abs(cold[:, col] - accurate[:, col]).mean():.4f}   "
+              f"learned {np.abs(warm[:, col] - accurate[:, col]).mean():.4f}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,38 @@
+import os
+import time
+import pickle
+import warnings
+import pandas as pd
+from ensemble import EnsembleEngine
+
+# Compares per-review pipeline calls (old /api/predict_bulk) with chunked batch scoring.
+# Usage: python bench_bulk.py [n_reviews]
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def main(n_reviews=5000):
+    warnings.filterwarnings('ignore')
+    with open(os.path.join(BASE_DIR, 'model', 'artifacts', 'svm_pipeline.pkl'), 'rb') as f:
+        model = pickle.load(f)
+    engine = EnsembleEngine({'SVM': model})
+
+    base = pd.read_csv(os.path.join(BASE_DIR, 'test_reviews.csv'))['review'].astype(str).tolist()
+    texts = [f"{base[i % len(base)]} #{i}" for i in range(n_reviews)]
+
+    start = time.perf_counter()
+    for text in texts:
+        model.predict([text])
+        model.predict_proba([text])
+    per_item = time.perf_counter() - start
+    print(f"Per-item pipeline calls: {per_item:.2f}s ({n_reviews / per_item:.0f} reviews/s)")
+
+    for chunk_size in [50, 500, 5000]:
+        start = time.perf_counter()
+        for i in range(0, len(texts), chunk_size):
+            engine.predict_batch(texts[i:i + chunk_size], 'SVM')
+        batched = time.perf_counter() - start
+        print(f"Batched (chunk_size={chunk_size}): {batched:.2f}s ({n_reviews / batched:.0f} reviews/s, {per_item / batched:.1f}x)")
+
+if __name__ == "__main__":
+    import sys
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+import pickle
+import warnings
+from collections import Counter
+import pandas as pd
+from ensemble import EnsembleEngine, vote_label
+
+# Cascade vs full consensus on a labelled CSV, for requests that ask for model
+# (SVM, like /api/predict's default): models evaluated per request, how often
+# NaiveBayes answered alone, agreement with the full ensemble, and accuracy.
+# Usage: python bench_cascade.py <labelled.csv> [text_column] [label_column] [low,high] [model]
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def verdict(consensus):
+    """Majority Fake/Real vote; ties go to the first model consulted"""
+    counts = Counter(consensus.values()).most_common()
+    if len(counts) > 1 and counts[0][1] == counts[1][1]:
+        return next(iter(consensus.values()))
+    return counts[0][0]
+
+def main(csv_path, text_col=None, label_col=None, band=(0.2, 0.8), model='SVM'):
+    warnings.filterwarnings('ignore')
+    models = {}
+    for name, filename in [('SVM', 'svm_pipeline.pkl'), ('NaiveBayes', 'nb_pipeline.pkl'), ('LogisticRegression', 'lr_pipeline.pkl')]:
+        with open(os.path.join(BASE_DIR, 'model', 'artifacts', filename), 'rb') as f:
+            models[name] = pickle.load(f)
+    engine = EnsembleEngine(models, compile=True)
+
+    df = pd.read_csv(csv_path)
+    text_col = text_col or next((c for c in df.columns if 'text' in c.lower() or 'review' in c.lower()), df.columns[0])
+    label_col = label_col or next((c for c in df.columns if 'label' in c.lower() or 'category' in c.lower()), None)
+    df = df.dropna(subset=[text_col])
+
+    evaluated, early, agree, same_label, correct_full, correct_cascade = 0, 0, 0, 0, 0, 0
+    full_time, cascade_time = 0.0, 0.0
+    for _, row in df.iterrows():
+        text = str(row[text_col])
+        start = time.perf_counter()
+        full = engine.predict(text, model)
+        full_time += time.perf_counter() - start
+        start = time.perf_counter()
+        cascade = engine.predict(text, model, cascade=True, band=band)
+        cascade_time += time.perf_counter() - start
+
+        evaluated += len(cascade['models_evaluated'])
+        early += cascade['model_used'] != model
+        agree += verdict(full['consensus']) == verdict(cascade['consensus'])
+        same_label += full['label'] == cascade['label']
+        if label_col:
+            truth = vote_label(row[label_col])
+            correct_full += verdict(full['consensus']) == truth
+            correct_cascade += verdict(cascade['consensus']) == truth
+
+    n = len(df)
+    print(f"Reviews: {n}, band: {band}, model: {model}")
+    print(f"Avg models per request: full {len(engine.names()):.2f}, cascade {evaluated / n:.2f}")
+    print(f"Answered by NaiveBayes alone: {early / n:.2%}")
+    print(f"Cascade agreement with full ensemble: consensus {agree / n:.2%}, main label {same_label / n:.2%}")
+    if label_col:
+        print(f"Accuracy vs '{label_col}': full {correct_full / n:.2%}, cascade {correct_cascade / n:.2%}")
+    print(f"Avg latency: full {full_time / n * 1e6:.0f} us, cascade {cascade_time / n * 1e6:.0f} us")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python bench_cascade.py <labelled.csv> [text_column] [label_column] [low,high] [model]")
+        sys.exit(1)
+    band = tuple(float(b) for b in sys.argv[4].split(',')) if len(sys.argv) > 4 else (0.2, 0.8)
+    main(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None, sys.argv[3] if len(sys.argv) > 3 else None, band,
+         sys.argv[5] if len(sys.argv) > 5 else 'SVM')
@@ -0,0 +1,39 @@
+import os
+import time
+import pickle
+import warnings
+import pandas as pd
+from ensemble import EnsembleEngine
+
+# Single-review latency: sklearn pipelines vs the shared-featurization engine vs compiled scorers.
+# Usage: python bench_fast_scorer.py [iterations]
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def timed(fn, texts, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(texts[i % len(texts)])
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def main(iterations=2000):
+    warnings.filterwarnings('ignore')
+    models = {}
+    for name, filename in [('SVM', 'svm_pipeline.pkl'), ('NaiveBayes', 'nb_pipeline.pkl'), ('LogisticRegression', 'lr_pipeline.pkl')]:
+        with open(os.path.join(BASE_DIR, 'model', 'artifacts', filename), 'rb') as f:
+            models[name] = pickle.load(f)
+    texts = pd.read_csv(os.path.join(BASE_DIR, 'test_reviews.csv'))['review'].astype(str).tolist()
+
+    sklearn_engine = EnsembleEngine(models)
+    compiled_engine = EnsembleEngine(models, compile=True)
+    compiled_svm = compiled_engine.heads['SVM'][1]
+    featurizer = compiled_engine.featurizers[0]
+
+    print(f"SVM pipeline predict_proba:        {timed(lambda t: models['SVM'].predict_proba([t]), texts, iterations):9.1f} us")
+    print(f"Compiled SVM (featurize + score):  {timed(lambda t: compiled_svm.predict_proba([featurizer.transform_one(t)]), texts, iterations):9.1f} us")
+    print(f"Full consensus, sklearn engine:    {timed(lambda t: sklearn_engine.predict(t, 'SVM'), texts, iterations):9.1f} us")
+    print(f"Full consensus, compiled engine:   {timed(lambda t: compiled_engine.predict(t, 'SVM'), texts, iterations):9.1f} us")
+
+if __name__ == "__main__":
+    import sys
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
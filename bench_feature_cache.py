@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+import random
+import tempfile
+import pandas as pd
+from feature_cache import FeatureCache, dataset_hash, feature_key
+
+# Vectorizing an uploaded CSV for /api/train (read + split + TF-IDF) vs loading the cached
+# .npz split of the same file. Usage: python bench_feature_cache.py [n_rows]
+
+def main(n=200000):
+    from sklearn.model_selection import train_test_split
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    rng = random.Random(0)
+    vocab = [''.join(rng.choice('abcdefghij') for _ in range(rng.randint(2, 7))) for _ in range(30000)]
+    texts = [' '.join(rng.choice(vocab) for _ in range(rng.randint(10, 60))) for _ in range(n)]
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, 'reviews.csv')
+    pd.DataFrame({'text': texts, 'label': ['Fake' if i % 2 else 'Real' for i in range(n)]}).to_csv(path, index=False)
+    cache = FeatureCache(os.path.join(folder, 'cache'))
+
+    start = time.perf_counter()
+    df = pd.read_csv(path)
+    X_train, X_test, y_train, y_test = train_test_split(df['text'], df['label'], test_size=0.2, random_state=42)
+    vectorizer = TfidfVectorizer()
+    split = (vectorizer.fit_transform(X_train), y_train, vectorizer.transform(X_test), y_test)
+    vectorize_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    key = feature_key(dataset_hash(path), 'text', 'label', TfidfVectorizer(), test_size=0.2, random_state=42)
+    meta = cache.put(key, vectorizer, split)
+    put_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    key = feature_key(dataset_hash(path), 'text', 'label', TfidfVectorizer(), test_size=0.2, random_state=42)
+    _, (X_cached, _, _, _) = cache.get(key)
+    get_s = time.perf_counter() - start
+    assert (X_cached != split[0]).nnz == 0
+
+    print(f"{n} rows, {split[0].shape[1]} features, cache entry {meta['bytes'] / 1e6:.1f} MB (CSV {os.path.getsize(path) / 1e6:.1f} MB)")
+    print(f"Read + vectorize: {vectorize_s:6.2f}s")
+    print(f"Cache store:      {put_s:6.2f}s")
+    print(f"Cache hit:        {get_s:6.2f}s   ({vectorize_s / get_s:.1f}x faster)")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,52 @@
+import sys
+import time
+import random
+import warnings
+import numpy as np
+from hyperparameter_search import build_models, successive_halving, affordable_rows
+
+# Old Vercel training (default settings on a 200-row sample) vs tuning with successive halving
+# under the same kind of wall-clock budget. Usage: python bench_hyperparameter_search.py [n_rows] [budget_s]
+
+def fit_and_score(config, X_train, y_train, X_test, y_test):
+    vectorizer, classifiers = build_models(config)
+    X = vectorizer.fit_transform(X_train)
+    X_test_vec = vectorizer.transform(X_test)
+    return {name: round(float(np.mean(clf.fit(X, y_train).predict(X_test_vec) == y_test)), 3) for name, clf in classifiers}
+
+def main(n=50000, budget=8.0):
+    warnings.filterwarnings('ignore')
+    rng = random.Random(0)
+    vocab = [''.join(rng.choice('abcdefghij') for _ in range(rng.randint(2, 7))) for _ in range(20000)]
+    cues = vocab[:400]
+    texts, labels = [], []
+    for i in range(n):
+        label = 'Fake' if i % 2 else 'Real'
+        words = [rng.choice(cues[:200] if label == 'Fake' else cues[200:]) if rng.random() < 0.08 else rng.choice(vocab)
+                 for _ in range(rng.randint(10, 60))]
+        texts.append(' '.join(words))
+        labels.append(label)
+    cut = int(n * 0.8)
+    X_train, y_train = texts[:cut], np.array(labels[:cut])
+    X_test, y_test = texts[cut:], np.array(labels[cut:])
+
+    start = time.perf_counter()
+    sample = rng.sample(range(cut), 200)
+    baseline = fit_and_score(None, [X_train[i] for i in sample], y_train[sample], X_test, y_test)
+    baseline_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    search = successive_halving(X_train, y_train, budget * 0.6)
+    rows = affordable_rows(search, budget - (time.perf_counter() - start), cut, len(X_test))
+    tuned = fit_and_score(search['best'], X_train[:rows], y_train[:rows], X_test, y_test)
+    tuned_s = time.perf_counter() - start
+
+    print(f"{n} rows, budget {budget}s")
+    print(f"Default settings, 200-row sample: {baseline}  ({baseline_s:.1f}s)")
+    print(f"Tuned, first {rows} rows:        {tuned}  ({tuned_s:.1f}s)")
+    print(f"Best config: {search['best']}")
+    for r in search['rounds']:
+        print(f"  round {r['round']}: {r['candidates']:>2} configs x {r['rows']:>6} rows, best validation {r['best_accuracy']} ({r['elapsed_s']}s)")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000, float(sys.argv[2]) if len(sys.argv) > 2 else 8.0)
@@ -0,0 +1,40 @@
+import sys
+import time
+import random
+from lie_detector import LieDetector
+
+# Per-review LieDetector.analyze() loop vs one analyze_batch() call on the same reviews.
+# Sentiment (TextBlob) is shared by both paths, so it is computed up front and passed in.
+# Usage: python bench_lie_batch.py [n_reviews]
+
+def main(n=5000):
+    from nlp_document import AnalyzedDocument
+    rng = random.Random(0)
+    # A broad everyday vocabulary, with the lexicon's trigger words mixed in at a realistic rate
+    syllables = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'vo', 'ze', 'pa']
+    filler = [''.join(rng.choice(syllables) for _ in range(rng.randint(1, 3))) for _ in range(2000)]
+    filler += "the and it is i to a of in this product great works phone battery".split() * 20
+    flavour = "honestly best amazing trust me buy now check out discount to be honest literally".split()
+    texts = [' '.join(rng.choice(flavour) if rng.random() < 0.03 else rng.choice(filler)
+                      for _ in range(rng.randint(5, 120))) for _ in range(n)]
+    detector = LieDetector()
+    docs = [AnalyzedDocument(t) for t in texts]
+    for doc in docs:
+        doc.sentiment
+    # Keep one-time imports (pandas, scipy) out of the timings
+    detector.analyze_batch(texts[:10], docs[:10])
+
+    start = time.perf_counter()
+    loop = [detector.analyze(t, d) for t, d in zip(texts, docs)]
+    loop_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    frame = detector.analyze_batch(texts, docs)
+    batch_s = time.perf_counter() - start
+
+    for ref, row in zip(loop, frame.to_dict('records')):
+        assert ref['exaggeration_score'] == row['exaggeration_score'] and ref['repetition_score'] == row['repetition_score']
+    print(f"{n} reviews: analyze() loop {loop_s * 1000:8.1f} ms   analyze_batch {batch_s * 1000:8.1f} ms   ({loop_s / batch_s:.1f}x)")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,59 @@
+import sys
+import time
+import numpy as np
+from near_duplicates import NearDuplicateIndex
+
+# Near-duplicate review detection: MinHash-LSH clustering vs comparing every pair of signatures.
+# Usage: python bench_near_duplicates.py [n]
+
+def make_reviews(n, seed=0):
+    rng = np.random.default_rng(seed)
+    letters = np.array(list('abcdefghijklmnopqrstuvwxyz'))
+    words = np.array([''.join(rng.choice(letters, rng.integers(2, 9))) for _ in range(20000)])
+    reviews = [' '.join(rng.choice(words, rng.integers(8, 60))) for _ in range(n - n // 20)]
+    # 5% templated copies with one word changed
+    for i in range(n // 20):
+        copy = reviews[i % 200].split()
+        copy[rng.integers(len(copy))] = 'changed'
+        reviews.append(' '.join(copy))
+    return reviews
+
+def main(n=100000):
+    reviews = make_reviews(n)
+    index = NearDuplicateIndex()
+    start = time.perf_counter()
+    index.add_many(list(range(n)), reviews[:-1000])
+    build_s = time.perf_counter() - start
+
+    # Incremental update: the last 1000 reviews arrive after the index was built
+    start = time.perf_counter()
+    for i in range(n - 1000, n):
+        index.add(i, reviews[i])
+    add_ms = (time.perf_counter() - start) / 1000 * 1000
+
+    start = time.perf_counter()
+    groups = index.clusters()
+    cluster_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for text in reviews[:200]:
+        index.query(text)
+    query_ms = (time.perf_counter() - start) / 200 * 1000
+
+    # All-pairs comparison of the same signatures, timed on a sample and scaled to n^2 / 2 pairs
+    signatures = index.signatures
+    sample = 2000
+    start = time.perf_counter()
+    for i in range(sample):
+        (signatures[i + 1:sample] == signatures[i]).mean(axis=1)
+    pairs_s = (time.perf_counter() - start) * (n / sample) ** 2
+
+    print(f"{n} reviews, {index.bands} bands x {index.rows} rows")
+    print(f"Signatures + LSH tables:   {build_s:.2f} s")
+    print(f"Incremental add:           {add_ms:.3f} ms/review")
+    print(f"Clusters (LSH):            {cluster_s:.2f} s, {len(groups)} groups, {sum(len(g['rows']) for g in groups)} reviews")
+    print(f"All-pairs (estimated):     {pairs_s:.0f} s ({pairs_s / cluster_s:.0f}x slower)")
+    print(f"Query one review:          {query_ms:.3f} ms")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,81 @@
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+import pandas as pd
+from lie_detector import LieDetector
+from author_dna import AuthorDNA
+from nlp_document import AnalyzedDocument
+
+# Per-review NLP cost of /api/predict: every analyzer doing its own tokenization and
+# TextBlob pass (before) vs one shared AnalyzedDocument (after).
+# Usage: python bench_nlp_document.py [csv] [rounds]
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def timed(timings, stage, fn):
+    start = time.perf_counter()
+    value = fn()
+    timings[stage] += time.perf_counter() - start
+    return value
+
+def stages_before(text, timings):
+    """The stages the separate analyzers used to run for one review"""
+    import nltk
+    from textblob import TextBlob
+    timed(timings, 'sentiment', lambda: TextBlob(text).sentiment.polarity)    # predict()
+    timed(timings, 'sentiment', lambda: TextBlob(text).sentiment)             # LieDetector
+    timed(timings, 'words', lambda: re.findall(r'\w+', text.lower()))          # exaggeration
+    timed(timings, 'words', lambda: re.findall(r'\w+', text.lower()))          # repetition
+    timed(timings, 'sentences', lambda: nltk.sent_tokenize(text))              # AuthorDNA
+    tokens = timed(timings, 'tokens', lambda: nltk.word_tokenize(text))        # splits sentences again
+    timed(timings, 'pos_tags', lambda: nltk.pos_tag(tokens))
+
+def stages_after(text, timings):
+    doc = AnalyzedDocument(text)
+    for stage in ['sentiment', 'words', 'sentences', 'tokens', 'pos_tags']:
+        getattr(doc, stage)
+    for stage, seconds in doc.timings.items():
+        if stage != 'lower':
+            timings[stage] += seconds
+
+def main(csv_path=None, rounds=200):
+    csv_path = csv_path or os.path.join(BASE_DIR, 'test_reviews.csv')
+    texts = pd.read_csv(csv_path)['review'].dropna().astype(str).tolist()
+    lie_detector, author_dna = LieDetector(), AuthorDNA()
+    lie_detector.warmup()
+    author_dna.warmup()
+    n = len(texts) * rounds
+
+    before, after = defaultdict(float), defaultdict(float)
+    for _ in range(rounds):
+        for text in texts:
+            stages_before(text, before)
+            stages_after(text, after)
+    print(f"Per-stage time per review over {n} reviews ({csv_path}):")
+    print(f"  {'stage':12s} {'before':>10s} {'after':>10s}")
+    for stage in before:
+        print(f"  {stage:12s} {before[stage] / n * 1e6:8.1f}us {after[stage] / n * 1e6:8.1f}us")
+
+    def separate(text):
+        from textblob import TextBlob
+        TextBlob(text).sentiment.polarity
+        lie_detector.analyze(text)
+        author_dna.analyze(text)
+
+    def shared(text):
+        doc = AnalyzedDocument(text)
+        doc.polarity
+        lie_detector.analyze(text, doc)
+        author_dna.analyze(text, doc)
+
+    for label, fn in [('separate documents', separate), ('shared document', shared)]:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for text in texts:
+                fn(text)
+        print(f"End to end, {label:18s} {(time.perf_counter() - start) / n * 1e6:8.1f} us/review")
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None, int(sys.argv[2]) if len(sys.argv) > 2 else 200)
@@ -0,0 +1,44 @@
+import sys
+import time
+import random
+import warnings
+import numpy as np
+from parallel_training import train_parallel
+
+# /api/train's three classifiers fitted one after another vs concurrently in a process pool,
+# on one shared TF-IDF matrix. Usage: python bench_parallel_training.py [n_rows] [workers]
+
+def main(n=200000, workers=3):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.svm import LinearSVC
+    from sklearn.naive_bayes import MultinomialNB
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.calibration import CalibratedClassifierCV
+    warnings.filterwarnings('ignore')
+    rng = random.Random(0)
+    vocab = [''.join(rng.choice('abcdefghij') for _ in range(rng.randint(2, 7))) for _ in range(30000)]
+    fake = vocab[:300]
+    texts, labels = [], []
+    for i in range(n):
+        label = 'Fake' if i % 2 else 'Real'
+        words = [rng.choice(fake) if label == 'Fake' and rng.random() < 0.1 else rng.choice(vocab) for _ in range(rng.randint(10, 60))]
+        texts.append(' '.join(words))
+        labels.append(label)
+    vectorizer = TfidfVectorizer()
+    cut = int(n * 0.8)
+    split = (vectorizer.fit_transform(texts[:cut]), np.array(labels[:cut]), vectorizer.transform(texts[cut:]), np.array(labels[cut:]))
+
+    def classifiers():
+        return [('SVM', CalibratedClassifierCV(LinearSVC())), ('NaiveBayes', MultinomialNB()),
+                ('LogisticRegression', LogisticRegression())]
+
+    _, _, sequential = train_parallel(classifiers(), split, workers=1)
+    _, _, parallel = train_parallel(classifiers(), split, workers=workers)
+    print(f"{n} rows, {split[0].shape[1]} features")
+    for name, timings in [('Sequential', sequential), (f"{parallel['executor']} pool x{parallel['workers']}", parallel)]:
+        fits = ', '.join(f"{model} {t['fit_s']}s" for model, t in timings['models'].items())
+        print(f"{name:<18} wall clock {timings['wall_clock_s']:7.2f}s   ({fits})")
+    print(f"Speedup: {sequential['wall_clock_s'] / parallel['wall_clock_s']:.1f}x")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000, int(sys.argv[2]) if len(sys.argv) > 2 else 3)
@@ -0,0 +1,41 @@
+import re
+import sys
+import time
+import random
+from phrase_matcher import PhraseMatcher
+
+# One regex search per phrase (the old LieDetector loop) vs one PhraseMatcher scan,
+# as the lexicon grows. Usage: python bench_phrase_matcher.py [max_phrases]
+
+def make_phrases(n, rng):
+    syllables = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'vo', 'ze', 'pa']
+    def word():
+        return ''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4)))
+    return [' '.join(word() for _ in range(rng.randint(1, 3))) for _ in range(n)]
+
+def main(max_phrases=5000):
+    rng = random.Random(0)
+    review = ("Honestly this is the best blender I have ever owned, trust me. It crushes ice in seconds "
+              "and the jar is easy to clean. Check out the discount if you buy now! ") * 3
+    for n in [10, 100, 1000, max_phrases]:
+        phrases = make_phrases(n, rng) + ['trust me', 'buy now', 'check out', 'honestly']
+        patterns = [re.compile(r'\b(' + re.escape(p) + r')\b') for p in phrases]
+        matcher = PhraseMatcher({'lexicon': phrases})
+        text = review.lower()
+        rounds = max(20, 20000 // n)
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            found_regex = {p for p, pattern in zip(phrases, patterns) if pattern.search(text)}
+        regex_us = (time.perf_counter() - start) / rounds * 1e6
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            found_matcher = matcher.scan(text)['lexicon']['phrases']
+        matcher_us = (time.perf_counter() - start) / rounds * 1e6
+
+        assert found_regex == found_matcher
+        print(f"{len(phrases):6d} phrases: regex loop {regex_us:9.1f} us   single scan {matcher_us:7.1f} us")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,38 @@
+import sys
+import time
+import random
+
+# TextBlob(text).sentiment per review vs the lexicon engine (per review and batched).
+# Usage: python bench_sentiment.py [n_reviews]
+
+def main(n=5000):
+    from textblob import TextBlob
+    from sentiment_engine import get_engine
+    rng = random.Random(0)
+    words = ("the product is great and i love it but the battery is not very good honestly "
+             "terrible service really fast shipping would not buy again amazing quality !").split()
+    texts = [' '.join(rng.choice(words) for _ in range(rng.randint(5, 80))) + '.' for _ in range(n)]
+    engine = get_engine()
+    TextBlob("warm up").sentiment
+
+    start = time.perf_counter()
+    reference = [TextBlob(t).sentiment.polarity for t in texts]
+    textblob_s = time.perf_counter() - start
+
+    engine._token_cache.clear()
+    start = time.perf_counter()
+    single = [engine.analyze(t).polarity for t in texts]
+    single_s = time.perf_counter() - start
+
+    engine._token_cache.clear()
+    start = time.perf_counter()
+    polarity, _ = engine.analyze_batch(texts)
+    batch_s = time.perf_counter() - start
+
+    assert max(abs(a - b) for a, b in zip(reference, single)) < 1e-9
+    assert max(abs(a - b) for a, b in zip(reference, polarity)) < 1e-9
+    print(f"{n} reviews: TextBlob {textblob_s * 1000:8.1f} ms   engine {single_s * 1000:7.1f} ms   "
+          f"batch {batch_s * 1000:7.1f} ms   ({textblob_s / batch_s:.1f}x)")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,48 @@
+import sys
+import time
+import numpy as np
+from style_index import StyleIndex
+from author_dna import FEATURES
+
+# "Written in the same style" lookups: brute-force scan vs StyleIndex (KD-tree), and grouping the
+# whole history into style clusters vs an all-pairs comparison. Usage: python bench_style_index.py [n]
+
+def main(n=100000):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(n, len(FEATURES))) * [8, .2, .1, .1, .1, .1, 2, 1] + [15, .7, .4, .3, .2, .1, 1, .5]
+    index = StyleIndex()
+    for i, v in enumerate(vectors):
+        index.add(i + 1, v, author=f"author_{i % 5000}", product=f"P{i % 200}")
+
+    start = time.perf_counter()
+    index.query(vectors[0])
+    build_s = time.perf_counter() - start
+    queries = vectors[rng.integers(0, n, 200)]
+
+    start = time.perf_counter()
+    for q in queries:
+        index.query(q, k=10)
+    tree_ms = (time.perf_counter() - start) / len(queries) * 1000
+
+    X = (vectors - index._mean) / index._scale
+    start = time.perf_counter()
+    for q in queries[:50]:
+        np.argsort(((X - (q - index._mean) / index._scale) ** 2).sum(axis=1))[:10]
+    brute_ms = (time.perf_counter() - start) / 50 * 1000
+
+    start = time.perf_counter()
+    for q in queries[:50]:
+        index.query(q, k=10, product='P7')
+    product_ms = (time.perf_counter() - start) / 50 * 1000
+
+    start = time.perf_counter()
+    groups = index.clusters(radius=0.05)
+    cluster_s = time.perf_counter() - start
+    pairs = n * (n - 1) // 2
+
+    print(f"{n} fingerprints: tree build {build_s * 1000:.0f} ms")
+    print(f"  nearest 10: brute force {brute_ms:.2f} ms   KD-tree {tree_ms:.3f} ms   one product {product_ms:.2f} ms")
+    print(f"  style clusters over the whole history: {cluster_s * 1000:.0f} ms ({len(groups)} groups), vs {pairs:,} pair comparisons")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -5,6 +5,9 @@ set -o errexit
 # Install Python dependencies
 pip install -r requirements.txt
 
+# Bundle NLTK data so the app never downloads it at runtime
+python nltk_resources.py
+
 # Build Frontend
 echo "Building Frontend..."
 cd frontend
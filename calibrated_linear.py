@@ -0,0 +1,200 @@
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+
+
+def _expit(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class CalibratedLinearModel(ClassifierMixin, BaseEstimator):
+    """
+    One linear decision function with one Platt sigmoid on top.
+
+    This is the collapsed form of CalibratedClassifierCV(LinearSVC()): instead
+    of keeping a LinearSVC and a calibrator per CV fold and averaging their
+    probabilities, the fold coefficients are averaged into a single vector and
+    one sigmoid P(classes_[1]) = expit(-(a * d + b)) is fitted on top of it.
+    Drop-in for the 'clf' step of our pipelines (classes_, coef_,
+    decision_function, predict_proba, predict).
+
+    C is the only parameter; the fitted state (classes_, coef_, intercept_,
+    calib_a_, calib_b_) is set by collapse_calibrated_classifier() or by fit(),
+    which trains one directly (a LinearSVC with penalty C, sigmoid fitted on
+    cross-validated decisions), so clone() gives an unfitted copy as usual.
+    """
+
+    # Fitted state as older releases pickled it, when it was passed to the constructor
+    _LEGACY_STATE = {'classes': 'classes_', 'coef': 'coef_', 'intercept': 'intercept_',
+                     'calib_a': 'calib_a_', 'calib_b': 'calib_b_'}
+
+    def __init__(self, C=1.0):
+        self.C = C
+
+    def _set_fitted(self, classes, coef, intercept, calib_a, calib_b):
+        self.classes_ = np.asarray(classes)
+        self.coef_ = np.asarray(coef, dtype=np.float64).reshape(1, -1)
+        self.intercept_ = np.asarray(intercept, dtype=np.float64).reshape(1)
+        self.calib_a_ = float(calib_a)
+        self.calib_b_ = float(calib_b)
+        return self
+
+    def __setstate__(self, state):
+        state = dict(state)
+        if 'coef' in state:
+            legacy = {name: state.pop(name) for name in self._LEGACY_STATE}
+            state.setdefault('C', 1.0)
+            super().__setstate__(state)
+            self._set_fitted(*(legacy[name] for name in self._LEGACY_STATE))
+        else:
+            super().__setstate__(state)
+
+    def fit(self, X, y):
+        """
+        Fit a binary LinearSVC on (X, y) and one Platt sigmoid on its decisions: the
+        sigmoid sees out-of-fold decisions (up to 5 folds, as CalibratedClassifierCV
+        does) so it is not fitted to the SVM's own training margins.
+        """
+        from sklearn.svm import LinearSVC
+        from sklearn.model_selection import cross_val_predict
+        y = np.asarray(y)
+        classes = np.unique(y)
+        if len(classes) != 2:
+            raise ValueError("CalibratedLinearModel is binary: y needs exactly two classes")
+        svm = LinearSVC(C=self.C).fit(X, y)
+        folds = int(min(5, np.bincount(np.searchsorted(classes, y)).min()))
+        decision = cross_val_predict(LinearSVC(C=self.C), X, y, cv=folds, method='decision_function') if folds >= 2 \
+            else svm.decision_function(X)
+        # Platt's targets: labels pulled towards the class priors
+        positive = y == classes[1]
+        n_pos, n_neg = positive.sum(), len(y) - positive.sum()
+        target = np.where(positive, (n_pos + 1.0) / (n_pos + 2.0), 1.0 / (n_neg + 2.0))
+        return self._set_fitted(classes, svm.coef_[0], svm.intercept_[0], *fit_sigmoid(decision, target))
+
+    def decision_function(self, X):
+        return np.asarray(X @ self.coef_.T).ravel() + self.intercept_[0]
+
+    def predict_proba(self, X):
+        positive = _expit(-(self.calib_a_ * self.decision_function(X) + self.calib_b_))
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def __repr__(self):
+        if not hasattr(self, 'coef_'):
+            return f"CalibratedLinearModel(C={self.C})"
+        return f"CalibratedLinearModel(n_features={self.coef_.shape[1]}, a={self.calib_a_:.4f}, b={self.calib_b_:.4f})"
+
+
+def fold_estimators(calibrated):
+    """(estimator, calibrator) pairs of a fitted CalibratedClassifierCV (handles old/new sklearn names)"""
+    pairs = []
+    for cc in calibrated.calibrated_classifiers_:
+        estimator = getattr(cc, 'estimator', None) or getattr(cc, 'base_estimator', None)
+        calibrators = getattr(cc, 'calibrators', None) or getattr(cc, 'calibrators_', None)
+        pairs.append((estimator, calibrators[0] if calibrators else None))
+    return pairs
+
+
+def linear_coefficients(classifier):
+    """
+    Coefficient vector used to rank features, or None for non-linear models.
+    For CalibratedClassifierCV this is the average over the fold estimators,
+    i.e. the same vector the collapsed model uses.
+    """
+    if hasattr(classifier, 'calibrated_classifiers_'):
+        coefs = [est.coef_[0] for est, _ in fold_estimators(classifier) if hasattr(est, 'coef_')]
+        return np.mean(coefs, axis=0) if coefs else None
+    if hasattr(classifier, 'coef_'):
+        return np.asarray(classifier.coef_)[0]
+    return None
+
+
+def fit_sigmoid(decision, target):
+    """
+    Fit (a, b) of expit(-(a * d + b)) to soft targets by minimizing cross-entropy.
+    Soft targets let the collapsed model reproduce the fold-averaged probabilities
+    of the original ensemble rather than re-learning calibration from labels.
+    """
+    from scipy.optimize import minimize
+
+    decision = np.asarray(decision, dtype=np.float64)
+    target = np.clip(np.asarray(target, dtype=np.float64), 1e-12, 1 - 1e-12)
+
+    def loss(params):
+        a, b = params
+        z = a * decision + b
+        # -[t log expit(-z) + (1 - t) log(1 - expit(-z))], written stably
+        log_p = -np.logaddexp(0, z)
+        log_q = -np.logaddexp(0, -z)
+        value = -(target * log_p + (1 - target) * log_q).sum()
+        grad_z = target - _expit(-z)
+        return value, np.array([(grad_z * decision).sum(), grad_z.sum()])
+
+    result = minimize(loss, x0=np.array([-1.0, 0.0]), jac=True, method='L-BFGS-B')
+    return float(result.x[0]), float(result.x[1])
+
+
+def collapse_calibrated_classifier(calibrated, X):
+    """
+    Fold a fitted binary sigmoid CalibratedClassifierCV into a CalibratedLinearModel.
+    X is a featurized reference sample (normally the training matrix) used to fit
+    the single calibration map against the original ensemble's probabilities.
+    """
+    if len(calibrated.classes_) != 2:
+        raise ValueError("Only binary CalibratedClassifierCV models can be collapsed")
+    pairs = fold_estimators(calibrated)
+    if any(not hasattr(est, 'coef_') for est, _ in pairs):
+        raise ValueError("Fold estimators must be linear (coef_) to be averaged")
+
+    coef = np.mean([est.coef_[0] for est, _ in pairs], axis=0)
+    intercept = float(np.mean([est.intercept_[0] for est, _ in pairs]))
+    decision = np.asarray(X @ coef).ravel() + intercept
+    a, b = fit_sigmoid(decision, calibrated.predict_proba(X)[:, 1])
+    return CalibratedLinearModel()._set_fitted(calibrated.classes_, coef, intercept, a, b)
+
+
+def probability_drift(original, collapsed, X):
+    """How far the collapsed model's probabilities move from the original on a sample"""
+    p_original = original.predict_proba(X)[:, 1]
+    p_collapsed = collapsed.predict_proba(X)[:, 1]
+    drift = np.abs(p_original - p_collapsed)
+    return {
+        'n_samples': int(len(drift)),
+        'mean_abs_drift': float(drift.mean()) if len(drift) else 0.0,
+        'p95_abs_drift': float(np.percentile(drift, 95)) if len(drift) else 0.0,
+        'max_abs_drift': float(drift.max()) if len(drift) else 0.0,
+        'label_agreement': float(np.mean((p_original >= 0.5) == (p_collapsed >= 0.5))) if len(drift) else 1.0,
+        'n_folds_collapsed': len(fold_estimators(original))
+    }
+
+
+def collapse_pipeline(pipeline, texts):
+    """Collapse the SVM step of a tfidf/clf pipeline in place; returns the drift report"""
+    X = pipeline.named_steps['tfidf'].transform(texts)
+    original = pipeline.named_steps['clf']
+    collapsed = collapse_calibrated_classifier(original, X)
+    report = probability_drift(original, collapsed, X)
+    pipeline.steps[-1] = ('clf', collapsed)
+    return report
+
+
+if __name__ == "__main__":
+    # Convert an existing SVM artifact: python calibrated_linear.py <svm_pipeline.pkl> <reference.csv> [text_column]
+    import sys
+    import pickle
+    import pandas as pd
+
+    if len(sys.argv) < 3:
+        print("Usage: python calibrated_linear.py <svm_pipeline.pkl> <reference.csv> [text_column]")
+        sys.exit(1)
+    path, csv_path = sys.argv[1], sys.argv[2]
+    df = pd.read_csv(csv_path)
+    text_col = sys.argv[3] if len(sys.argv) > 3 else next((c for c in df.columns if 'text' in c.lower() or 'review' in c.lower()), df.columns[0])
+
+    with open(path, 'rb') as f:
+        pipe = pickle.load(f)
+    report = collapse_pipeline(pipe, df[text_col].dropna().astype(str))
+    with open(path, 'wb') as f:
+        pickle.dump(pipe, f)
+    print(f"Collapsed {path}: {report}")
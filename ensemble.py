@@ -0,0 +1,246 @@
+import numpy as np
+from fast_scorer import CompiledFeaturizer, CompiledLinearModel, compile_classifier
+
+# Cascade mode consults models cheapest-first; see EnsembleEngine.predict_cascade()
+CASCADE_ORDER = ['NaiveBayes', 'LogisticRegression', 'SVM']
+DEFAULT_CASCADE_BAND = (0.2, 0.8)
+
+# Raw class codes used across our datasets (CG/OR codes, 0/1 integers, plain words)
+FAKE_CODES = ['1', 'CG', 'FAKE']
+REAL_CODES = ['0', 'OR', 'REAL']
+
+
+def display_label(prediction):
+    """Map a raw class code to the label shown in the UI"""
+    label_raw = str(prediction).upper()
+    if label_raw in FAKE_CODES:
+        return "Fake"
+    elif label_raw in REAL_CODES:
+        return "Real"
+    return label_raw  # Fallback for unknown codes
+
+
+def vote_label(prediction):
+    """Consensus votes are always normalized to Fake/Real"""
+    return 'Real' if str(prediction).upper() in REAL_CODES else 'Fake'
+
+
+def real_class_index(classes):
+    """Index of the 'genuine' class in classes_, or None if there is no such class"""
+    classes = list(classes)
+    if 'OR' in classes:
+        return classes.index('OR')
+    elif 0 in classes:
+        return classes.index(0)
+    return None
+
+
+def trust_score_from_proba(classes, proba):
+    real_idx = real_class_index(classes)
+    if real_idx is None:
+        return 50.0  # Fallback
+    return float(proba[real_idx]) * 100
+
+
+def _same_vectorizer(a, b):
+    """True when two fitted vectorizers produce identical features"""
+    if a is b:
+        return True
+    if type(a) is not type(b) or a.get_params() != b.get_params():
+        return False
+    if getattr(a, 'vocabulary_', None) != getattr(b, 'vocabulary_', None):
+        return False
+    idf_a, idf_b = getattr(a, 'idf_', None), getattr(b, 'idf_', None)
+    if idf_a is None or idf_b is None:
+        return idf_a is None and idf_b is None
+    return np.array_equal(idf_a, idf_b)
+
+
+class EnsembleEngine:
+    """
+    Scores a text with every trained model while featurizing it only once.
+
+    Models are sklearn Pipelines of ('tfidf', vectorizer) -> ('clf', classifier).
+    Pipelines whose vectorizers are identical (the normal case since train_models()
+    fits a single shared TfidfVectorizer) are grouped, so one transform feeds all
+    of their classifiers. Anything that is not a tfidf/clf pipeline is scored as
+    an opaque model on the raw text.
+
+    With compile=True each feature space whose vectorizer and classifiers can be
+    exported is swapped for the NumPy scorers in fast_scorer.py, bypassing the
+    Pipeline/CalibratedClassifierCV machinery at predict time.
+    """
+
+    def __init__(self, models, compile=False):
+        self.models = dict(models)
+        self.featurizers = []   # list of fitted vectorizers, one per distinct feature space
+        self.heads = {}         # model name -> (featurizer index or None, estimator)
+        self.compiled = set()   # names of models served by compiled scorers
+        self.version = None     # model version label, set by the app when the engine goes live
+
+        for name, model in self.models.items():
+            steps = getattr(model, 'named_steps', {})
+            if 'tfidf' in steps and 'clf' in steps:
+                vectorizer = steps['tfidf']
+                group = next((i for i, v in enumerate(self.featurizers) if _same_vectorizer(v, vectorizer)), None)
+                if group is None:
+                    self.featurizers.append(vectorizer)
+                    group = len(self.featurizers) - 1
+                self.heads[name] = (group, steps['clf'])
+            else:
+                self.heads[name] = (None, model)
+
+        if compile:
+            self.compile()
+
+    @classmethod
+    def from_compiled(cls, featurizers, heads):
+        """Engine over already compiled scorers, e.g. memory-mapped ones from model_artifacts.load_compiled()"""
+        engine = cls({})
+        engine.featurizers = list(featurizers)
+        engine.heads = dict(heads)
+        engine.compiled = set(heads)
+        return engine
+
+    def compile(self):
+        """Replace sklearn featurizers/classifiers with compiled scorers where every part is supported"""
+        for group, vectorizer in enumerate(self.featurizers):
+            featurizer = CompiledFeaturizer.from_vectorizer(vectorizer)
+            members = [name for name, (g, _) in self.heads.items() if g == group]
+            heads = {name: compile_classifier(self.heads[name][1]) for name in members}
+            if featurizer is None or any(head is None for head in heads.values()):
+                print(f"Keeping sklearn scoring for {members} (unsupported configuration)")
+                continue
+            self.featurizers[group] = featurizer
+            for name, head in heads.items():
+                self.heads[name] = (group, head)
+                self.compiled.add(name)
+
+    def __contains__(self, model_name):
+        return model_name in self.heads
+
+    def names(self):
+        return list(self.heads.keys())
+
+    def classes(self, model_name):
+        return self.heads[model_name][1].classes_
+
+    def feature_weights(self, model_name):
+        """
+        (feature names, coefficient vector) of a linear model, or (None, None).
+        Works for sklearn and compiled heads alike; calibrated folds are averaged.
+        """
+        group, estimator = self.heads[model_name]
+        if group is None:
+            return None, None
+        if isinstance(estimator, CompiledLinearModel):
+            coefs = estimator.coefficients()
+        else:
+            from calibrated_linear import linear_coefficients
+            coefs = linear_coefficients(estimator)
+        if coefs is None:
+            return None, None
+        return self.featurizers[group].get_feature_names_out(), coefs
+
+    def transform(self, texts, groups=None):
+        """Featurize texts once per feature space (all spaces by default)"""
+        if groups is None:
+            groups = range(len(self.featurizers))
+        return {g: self.featurizers[g].transform(texts) for g in groups}
+
+    def predict_proba(self, texts, model_names=None, features=None):
+        """
+        Probability matrices for every requested model, sharing the featurization.
+        Pass a dict as features to reuse (and collect) transforms across calls.
+        """
+        model_names = self.names() if model_names is None else list(model_names)
+        groups = {self.heads[n][0] for n in model_names if self.heads[n][0] is not None}
+        if features is None:
+            features = {}
+        features.update(self.transform(texts, groups - set(features)))
+
+        probas = {}
+        for name in model_names:
+            group, estimator = self.heads[name]
+            X = features[group] if group is not None else texts
+            probas[name] = estimator.predict_proba(X)
+        return probas
+
+    def predict_cascade(self, text, band=DEFAULT_CASCADE_BAND):
+        """
+        Early-exit variant of predict_proba() for the consensus block.
+
+        The first model of CASCADE_ORDER (MultinomialNB) runs alone; the rest are
+        only consulted when its genuine-class probability falls inside band
+        (low, high). Returns probability rows for evaluated models only, the
+        first model's first.
+        """
+        order = [n for n in CASCADE_ORDER if n in self.heads] + [n for n in self.heads if n not in CASCADE_ORDER]
+        first = order[0]
+        features = {}
+        probas = self.predict_proba([text], [first], features)
+
+        real_idx = real_class_index(self.classes(first))
+        p = probas[first][0]
+        p_real = p[real_idx] if real_idx is not None else max(p)
+        low, high = band
+        uncertain = low <= p_real <= high
+
+        remaining = order[1:] if uncertain else []
+        if remaining:
+            probas.update(self.predict_proba([text], remaining, features))
+        return probas
+
+    def predict(self, text, model_name, cascade=False, band=DEFAULT_CASCADE_BAND):
+        """
+        Label, probabilities, trust score and consensus votes for one text.
+        Labels are the argmax of predict_proba, which is what every one of our
+        classifiers (CalibratedClassifierCV, MultinomialNB, LogisticRegression) does.
+        With cascade=True the consensus only contains the models the cascade consulted;
+        if model_name was not among them, the cascade's first model gives the main
+        prediction and 'model_used' says so.
+        """
+        if not cascade:
+            return self._consensus_result(self.predict_proba([text]), 0, model_name)
+        probas = self.predict_cascade(text, band)
+        return self._consensus_result(probas, 0, model_name if model_name in probas else next(iter(probas)))
+
+    def predict_many(self, texts, model_names):
+        """
+        predict() with the full ensemble for several texts in one vectorized pass.
+        model_names[i] is the model whose output is the main prediction for texts[i].
+        """
+        probas = self.predict_proba(list(texts))
+        return [self._consensus_result(probas, row, model_name) for row, model_name in enumerate(model_names)]
+
+    def _consensus_result(self, probas, row, model_name):
+        consensus = {}
+        for name, p in probas.items():
+            consensus[name] = vote_label(self.classes(name)[int(np.argmax(p[row]))])
+
+        result = self._result(self.classes(model_name), probas[model_name][row])
+        result['model_used'] = model_name
+        result['consensus'] = consensus
+        result['models_evaluated'] = [n for n in self.heads if n in probas]
+        return result
+
+    def predict_batch(self, texts, model_name):
+        """
+        Score many texts with one model in a single vectorized transform/predict.
+        Returns one result dict per text, in input order (no consensus block).
+        """
+        if not texts:
+            return []
+        proba_matrix = self.predict_proba(texts, [model_name])[model_name]
+        classes = self.classes(model_name)
+        return [self._result(classes, proba) for proba in proba_matrix]
+
+    def _result(self, classes, proba):
+        prediction = classes[int(np.argmax(proba))]
+        return {
+            'prediction': prediction,
+            'label': display_label(prediction),
+            'probs': {str(c): float(p) for c, p in zip(classes, proba)},
+            'confidence': float(max(proba)),
+            'trust_score': trust_score_from_proba(classes, proba)
+        }
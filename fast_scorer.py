@@ -0,0 +1,244 @@
+import re
+import numpy as np
+
+# Above this many texts, heads score through one sparse matrix product instead of per-row gathers
+SPARSE_BATCH_THRESHOLD = 16
+
+
+def _expit(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _softmax(scores):
+    scores = scores - scores.max(axis=1, keepdims=True)
+    exp = np.exp(scores)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+class MappedVocabulary:
+    """
+    Read-only vocabulary backed by two arrays (usually memory-mapped .npy files):
+    the UTF-8 encoded terms in sorted order and the feature column of each.
+    Lookups are one vectorized binary search per text instead of a dict that
+    every worker process would have to build and keep in private memory.
+    """
+
+    def __init__(self, sorted_terms, columns):
+        self.sorted_terms = sorted_terms
+        self.columns = columns
+        self.width = sorted_terms.dtype.itemsize
+
+    @classmethod
+    def from_dict(cls, vocabulary):
+        terms = sorted((term.encode('utf-8'), column) for term, column in vocabulary.items())
+        width = max((len(t) for t, _ in terms), default=1)
+        return cls(np.array([t for t, _ in terms], dtype=f'S{width}'), np.array([c for _, c in terms], dtype=np.int64))
+
+    def __len__(self):
+        return len(self.columns)
+
+    def lookup(self, terms):
+        """Columns of the terms that are in the vocabulary (repeats kept, unknown terms dropped)"""
+        encoded = [t for t in (term.encode('utf-8') for term in terms) if len(t) <= self.width]
+        if not encoded or not len(self.columns):
+            return np.empty(0, dtype=np.int64)
+        probe = np.array(encoded, dtype=self.sorted_terms.dtype)
+        pos = np.minimum(np.searchsorted(self.sorted_terms, probe), len(self.columns) - 1)
+        return np.asarray(self.columns[pos[self.sorted_terms[pos] == probe]], dtype=np.int64)
+
+    def items(self):
+        for term, column in zip(self.sorted_terms, self.columns):
+            yield term.decode('utf-8'), int(column)
+
+
+class CompiledFeaturizer:
+    """
+    NumPy re-implementation of a fitted word-level TfidfVectorizer.
+
+    transform() returns one (indices, values) pair per text: the non-zero
+    columns of the l2-normalized TF-IDF row, exactly as sklearn computes them.
+    """
+
+    def __init__(self, vocabulary, idf, token_pattern=r"(?u)\b\w\w+\b", lowercase=True,
+                 ngram_range=(1, 1), stop_words=None, binary=False, sublinear_tf=False, norm='l2'):
+        self.vocabulary = vocabulary if isinstance(vocabulary, MappedVocabulary) else dict(vocabulary)
+        self.idf = None if idf is None else np.asarray(idf, dtype=np.float64)
+        self.token_pattern = token_pattern
+        self.lowercase = lowercase
+        self.ngram_range = tuple(ngram_range)
+        self.stop_words = frozenset(stop_words) if stop_words else None
+        self.binary = binary
+        self.sublinear_tf = sublinear_tf
+        self.norm = norm
+        self._token_re = re.compile(token_pattern)
+
+    @classmethod
+    def from_vectorizer(cls, vectorizer):
+        """Compile a fitted TfidfVectorizer, or return None if it uses options we do not replicate"""
+        params = vectorizer.get_params()
+        if (params.get('analyzer') != 'word' or params.get('tokenizer') is not None
+                or params.get('preprocessor') is not None or params.get('strip_accents') is not None
+                or params.get('norm') not in ('l2', 'l1', None) or not hasattr(vectorizer, 'vocabulary_')):
+            return None
+        return cls(
+            vocabulary=vectorizer.vocabulary_,
+            idf=vectorizer.idf_ if params.get('use_idf', True) else None,
+            token_pattern=params.get('token_pattern'),
+            lowercase=params.get('lowercase', True),
+            ngram_range=params.get('ngram_range', (1, 1)),
+            stop_words=vectorizer.get_stop_words(),
+            binary=params.get('binary', False),
+            sublinear_tf=params.get('sublinear_tf', False),
+            norm=params.get('norm')
+        )
+
+    @property
+    def n_features(self):
+        return len(self.vocabulary)
+
+    def get_feature_names_out(self):
+        names = np.empty(len(self.vocabulary), dtype=object)
+        for term, j in self.vocabulary.items():
+            names[j] = term
+        return names
+
+    def _terms(self, text):
+        if self.lowercase:
+            text = text.lower()
+        tokens = self._token_re.findall(text)
+        if self.stop_words:
+            tokens = [t for t in tokens if t not in self.stop_words]
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+        terms = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), max_n + 1):
+            terms.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return terms
+
+    def transform_one(self, text):
+        vocabulary = self.vocabulary
+        if isinstance(vocabulary, MappedVocabulary):
+            indices, counts = np.unique(vocabulary.lookup(self._terms(text)), return_counts=True)
+            values = counts.astype(np.float64)
+        else:
+            counts = {}
+            for term in self._terms(text):
+                j = vocabulary.get(term)
+                if j is not None:
+                    counts[j] = counts.get(j, 0) + 1
+            indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+            values = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+
+        if self.binary:
+            values[:] = 1.0
+        elif self.sublinear_tf:
+            values = np.log(values) + 1.0
+        if self.idf is not None:
+            values *= self.idf[indices]
+        if self.norm == 'l2':
+            length = np.sqrt(np.dot(values, values))
+        elif self.norm == 'l1':
+            length = np.abs(values).sum()
+        else:
+            length = 0.0
+        if length > 0:
+            values /= length
+        return indices, values
+
+    def transform(self, texts):
+        return [self.transform_one(text) for text in texts]
+
+
+class CompiledLinearModel:
+    """
+    A classifier reduced to arrays: scores = x @ weights + bias, followed by an output map.
+
+    weights has shape (n_features, n_outputs). Output maps:
+      'softmax'  - class scores (MultinomialNB joint log-likelihood, multinomial LogisticRegression)
+      'logistic' - one binary decision value (binary LogisticRegression)
+      'sigmoid_calibrated' - one decision value per calibrated fold, each passed through
+                   its Platt map expit(-(a * d + b)) and averaged (CalibratedClassifierCV)
+    """
+
+    def __init__(self, classes, weights, bias, output, calib_a=None, calib_b=None):
+        self.classes_ = np.asarray(classes)
+        self.weights = np.ascontiguousarray(weights, dtype=np.float64)
+        self.bias = np.asarray(bias, dtype=np.float64)
+        self.output = output
+        self.calib_a = None if calib_a is None else np.asarray(calib_a, dtype=np.float64)
+        self.calib_b = None if calib_b is None else np.asarray(calib_b, dtype=np.float64)
+
+    def decision_scores(self, rows):
+        """Raw linear scores for featurized rows, shape (n_rows, n_outputs)"""
+        if len(rows) <= SPARSE_BATCH_THRESHOLD:
+            scores = np.empty((len(rows), self.weights.shape[1]))
+            for r, (indices, values) in enumerate(rows):
+                scores[r] = values @ self.weights[indices]
+        else:
+            from scipy.sparse import csr_matrix
+            indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+            indptr[1:] = np.cumsum([len(indices) for indices, _ in rows])
+            X = csr_matrix((np.concatenate([v for _, v in rows]), np.concatenate([i for i, _ in rows]), indptr),
+                           shape=(len(rows), self.weights.shape[0]))
+            scores = np.asarray(X @ self.weights)
+        return scores + self.bias
+
+    def coefficients(self):
+        """Per-feature weight towards classes_[1] for binary heads (fold average if calibrated), else None"""
+        if self.output == 'softmax':
+            return None
+        return np.asarray(self.weights).mean(axis=1)
+
+    def predict_proba(self, rows):
+        scores = self.decision_scores(rows)
+        if self.output == 'softmax':
+            return _softmax(scores)
+        if self.output == 'logistic':
+            positive = _expit(scores[:, 0])
+        else:
+            positive = _expit(-(self.calib_a * scores + self.calib_b))
+            positive = np.minimum(positive, 1.0).mean(axis=1)
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, rows):
+        return self.classes_[np.argmax(self.predict_proba(rows), axis=1)]
+
+
+def compile_classifier(clf):
+    """Export a fitted classifier into a CompiledLinearModel, or None if unsupported"""
+    name = type(clf).__name__
+    classes = getattr(clf, 'classes_', None)
+    if classes is None:
+        return None
+
+    if name == 'MultinomialNB':
+        return CompiledLinearModel(classes, clf.feature_log_prob_.T, clf.class_log_prior_, 'softmax')
+
+    if name == 'LogisticRegression':
+        if len(classes) == 2:
+            return CompiledLinearModel(classes, clf.coef_.T, clf.intercept_, 'logistic')
+        if getattr(clf, 'multi_class', 'auto') == 'ovr':
+            return None
+        return CompiledLinearModel(classes, clf.coef_.T, clf.intercept_, 'softmax')
+
+    if name == 'CalibratedLinearModel':
+        return CompiledLinearModel(classes, clf.coef_.T, clf.intercept_, 'sigmoid_calibrated', [clf.calib_a_], [clf.calib_b_])
+
+    if name == 'CalibratedClassifierCV':
+        if len(classes) != 2:
+            return None
+        weights, biases, calib_a, calib_b = [], [], [], []
+        for cc in clf.calibrated_classifiers_:
+            estimator = getattr(cc, 'estimator', None) or getattr(cc, 'base_estimator', None)
+            calibrators = getattr(cc, 'calibrators', None) or getattr(cc, 'calibrators_', None)
+            if (getattr(cc, 'method', 'sigmoid') != 'sigmoid' or not hasattr(estimator, 'coef_')
+                    or not calibrators or not hasattr(calibrators[0], 'a_')):
+                return None
+            weights.append(estimator.coef_[0])
+            biases.append(estimator.intercept_[0])
+            calib_a.append(calibrators[0].a_)
+            calib_b.append(calibrators[0].b_)
+        return CompiledLinearModel(classes, np.array(weights).T, biases, 'sigmoid_calibrated', calib_a, calib_b)
+
+    return None
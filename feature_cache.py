@@ -0,0 +1,191 @@
+import io
+import os
+import json
+import time
+import shutil
+import pickle
+import hashlib
+import zipfile
+import tempfile
+import threading
+import numpy as np
+
+META = 'meta.json'
+# Content hashes of datasets, remembered per (path, mtime, size) so a file is read once per change
+_DATASET_HASHES = {}
+_HASH_LOCK = threading.Lock()
+
+
+def dataset_hash(path, block_size=1024 * 1024):
+    """sha256 of a dataset file's contents (cached until the file changes)"""
+    stat = os.stat(path)
+    stamp = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    with _HASH_LOCK:
+        if stamp in _DATASET_HASHES:
+            return _DATASET_HASHES[stamp]
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    with _HASH_LOCK:
+        _DATASET_HASHES[stamp] = digest.hexdigest()
+    return _DATASET_HASHES[stamp]
+
+
+def feature_key(data_hash, text_col, label_col, vectorizer, **split):
+    """Cache key of a vectorized split: dataset contents, columns, vectorizer class and parameters, split options"""
+    parts = {
+        'dataset': data_hash,
+        'columns': [text_col, label_col],
+        'vectorizer': [type(vectorizer).__name__, vectorizer.get_params()],
+        'split': split
+    }
+    # repr() covers parameters json cannot encode (dtype=np.float64, callables)
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=repr).encode('utf-8')).hexdigest()[:32]
+
+
+def _save_csr(path, X, compresslevel=1):
+    """
+    scipy.sparse.save_npz(compressed=True), minus most of its cost: the float
+    TF-IDF values barely deflate (~20% for most of the write time), so they are
+    stored as is, and the column indices are deflated at a fast level that keeps
+    nearly all of the default level's saving. Loads with load_npz().
+    """
+    from scipy import sparse
+    X = sparse.csr_matrix(X)
+    arrays = {'indices': X.indices, 'indptr': X.indptr, 'format': np.array(X.format.encode('ascii')),
+              'shape': np.array(X.shape), 'data': X.data}
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED) as archive:
+        for name, array in arrays.items():
+            if name == 'data':
+                with archive.open(name + '.npy', 'w', force_zip64=True) as f:
+                    np.lib.format.write_array(f, array, allow_pickle=False)
+            else:
+                buffer = io.BytesIO()
+                np.lib.format.write_array(buffer, array, allow_pickle=False)
+                archive.writestr(name + '.npy', buffer.getvalue(), zipfile.ZIP_DEFLATED, compresslevel)
+
+
+def _save_labels(path, y):
+    y = np.asarray(y)
+    # Text labels are stored as fixed-width unicode: loading them needs no pickle
+    np.savez_compressed(path, y=y.astype(str) if y.dtype == object else y)
+
+
+def _load_labels(path):
+    y = np.load(path, allow_pickle=False)['y']
+    return y.astype(object) if y.dtype.kind == 'U' else y
+
+
+class FeatureCache:
+    """
+    Vectorized train/test splits of uploaded datasets, so a repeat training run
+    on the same data skips reading and tokenizing the CSV.
+
+    root/
+      <key>/  train.npz, test.npz   compressed CSR feature matrices
+              y_train/y_test.npz    labels
+              vectorizer.pkl        the fitted vectorizer (pipelines are built on it)
+              meta.json             size, rows, features; its mtime is the last use
+
+    Entries are written to a staging folder and renamed into place, like
+    ModelRegistry versions, so concurrent workers never read a partial entry.
+    Least recently used entries are evicted once the total exceeds max_bytes.
+    """
+
+    def __init__(self, root, max_bytes=512 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def path(self, key):
+        return os.path.join(self.root, key)
+
+    def get(self, key):
+        """(vectorizer, (X_train, y_train, X_test, y_test)) for key, or None"""
+        from scipy import sparse
+        folder = self.path(key)
+        if not self.enabled or not os.path.exists(os.path.join(folder, META)):
+            self.misses += 1
+            return None
+        try:
+            with open(os.path.join(folder, 'vectorizer.pkl'), 'rb') as f:
+                vectorizer = pickle.load(f)
+            X_train = sparse.load_npz(os.path.join(folder, 'train.npz'))
+            X_test = sparse.load_npz(os.path.join(folder, 'test.npz'))
+            y_train = _load_labels(os.path.join(folder, 'y_train.npz'))
+            y_test = _load_labels(os.path.join(folder, 'y_test.npz'))
+            os.utime(os.path.join(folder, META))
+        except Exception as e:
+            # Evicted by another worker mid-read, or damaged: rebuild it
+            print(f"Feature cache entry {key} unreadable ({e}), dropping it")
+            shutil.rmtree(folder, ignore_errors=True)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return vectorizer, (X_train, y_train, X_test, y_test)
+
+    def put(self, key, vectorizer, split, metadata=None):
+        """Store a fitted vectorizer with its vectorized split, then evict down to the budget"""
+        if not self.enabled:
+            return None
+        X_train, y_train, X_test, y_test = split
+        os.makedirs(self.root, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix='.staging-', dir=self.root)
+        try:
+            _save_csr(os.path.join(staging, 'train.npz'), X_train)
+            _save_csr(os.path.join(staging, 'test.npz'), X_test)
+            _save_labels(os.path.join(staging, 'y_train.npz'), y_train)
+            _save_labels(os.path.join(staging, 'y_test.npz'), y_test)
+            with open(os.path.join(staging, 'vectorizer.pkl'), 'wb') as f:
+                pickle.dump(vectorizer, f)
+            size = sum(os.path.getsize(os.path.join(staging, name)) for name in os.listdir(staging))
+            meta = dict(metadata or {}, key=key, bytes=size, train_rows=X_train.shape[0], test_rows=X_test.shape[0],
+                        features=X_train.shape[1], created_at=time.time())
+            with open(os.path.join(staging, META), 'w') as f:
+                json.dump(meta, f, indent=2)
+            try:
+                os.rename(staging, self.path(key))
+            except OSError:
+                # Another worker stored the same entry first
+                shutil.rmtree(staging, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        self.evict()
+        return meta
+
+    def entries(self):
+        """meta of every complete entry, most recently used first"""
+        if not os.path.isdir(self.root):
+            return []
+        entries = []
+        for name in os.listdir(self.root):
+            meta_path = os.path.join(self.root, name, META)
+            try:
+                with open(meta_path) as f:
+                    meta = json.load(f)
+                meta['last_used'] = os.path.getmtime(meta_path)
+            except (OSError, ValueError):
+                continue
+            entries.append(meta)
+        return sorted(entries, key=lambda meta: meta['last_used'], reverse=True)
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits max_bytes (the newest always stays)"""
+        total = 0
+        for i, meta in enumerate(self.entries()):
+            total += meta['bytes']
+            if i and total > self.max_bytes:
+                shutil.rmtree(self.path(meta['key']), ignore_errors=True)
+                print(f"Feature cache: evicted {meta['key']} ({meta['bytes'] // 1024} KB)")
+
+    def stats(self):
+        entries = self.entries()
+        return {'entries': len(entries), 'bytes': sum(meta['bytes'] for meta in entries), 'max_bytes': self.max_bytes,
+                'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,202 @@
+import os
+import math
+import time
+import random
+import itertools
+import numpy as np
+from concurrent.futures.process import BrokenProcessPool
+from parallel_training import make_pool, worker_split
+
+# /api/train's settings: TfidfVectorizer() and the three classifiers with sklearn's defaults
+DEFAULT_CONFIG = {'ngram_range': (1, 1), 'max_features': None, 'min_df': 1, 'svm_C': 1.0, 'nb_alpha': 1.0, 'lr_C': 1.0}
+SEARCH_SPACE = {
+    'ngram_range': [(1, 1), (1, 2)],
+    'max_features': [None, 50000, 10000],
+    'min_df': [1, 2],
+    'svm_C': [0.1, 1.0, 10.0],
+    'nb_alpha': [0.1, 0.5, 1.0],
+    'lr_C': [0.1, 1.0, 10.0]
+}
+VECTORIZER_KEYS = ['ngram_range', 'max_features', 'min_df']
+# Rows of the calibration fit that sizes the first round, and how much slower than the default
+# config an average candidate (bigrams, more features) is assumed to fit
+PROBE_ROWS = 1000
+CANDIDATE_COST = 1.5
+# Validation rows every candidate is scored on: scoring is a fixed cost per candidate, whatever its rows
+MAX_VALIDATION = 5000
+
+
+def vectorizer_params(config):
+    """TfidfVectorizer keyword arguments of a config (ngram_range may come back from JSON as a list)"""
+    return {key: tuple(config[key]) if key == 'ngram_range' else config[key] for key in VECTORIZER_KEYS}
+
+
+def build_models(config=None):
+    """(TfidfVectorizer, [(model_name, classifier)]) of a config, /api/train's defaults for missing keys"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.svm import LinearSVC
+    from sklearn.naive_bayes import MultinomialNB
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.calibration import CalibratedClassifierCV
+    config = dict(DEFAULT_CONFIG, **(config or {}))
+    return TfidfVectorizer(**vectorizer_params(config)), [
+        ('SVM', CalibratedClassifierCV(LinearSVC(C=config['svm_C']))),
+        ('NaiveBayes', MultinomialNB(alpha=config['nb_alpha'])),
+        ('LogisticRegression', LogisticRegression(C=config['lr_C']))
+    ]
+
+
+def sample_candidates(n, seed=42):
+    """DEFAULT_CONFIG plus n - 1 distinct random points of SEARCH_SPACE"""
+    keys = list(SEARCH_SPACE)
+    grid = [dict(zip(keys, values)) for values in itertools.product(*(SEARCH_SPACE[key] for key in keys))]
+    grid = [config for config in grid if config != DEFAULT_CONFIG]
+    return [dict(DEFAULT_CONFIG)] + random.Random(seed).sample(grid, min(max(0, n - 1), len(grid)))
+
+
+def evaluate_config(config, rows, split=None):
+    """
+    Fit a config's vectorizer and classifiers on the first `rows` training texts and
+    score them on the validation texts. Runs inside a pool worker (split=None reads
+    the worker's shared split). accuracy is the mean of the three models'; latency
+    is the sklearn time to featurize and score 1000 reviews with all three.
+    """
+    train_texts, y_train, val_texts, y_val = split if split is not None else worker_split()
+    result = {'config': config, 'rows': rows}
+    try:
+        start = time.perf_counter()
+        vectorizer, classifiers = build_models(config)
+        X = vectorizer.fit_transform(train_texts[:rows])
+        for _, clf in classifiers:
+            clf.fit(X, y_train[:rows])
+        result['fit_s'] = round(time.perf_counter() - start, 3)
+
+        start = time.perf_counter()
+        X_val = vectorizer.transform(val_texts)
+        probabilities = [clf.predict_proba(X_val) for _, clf in classifiers]
+        result['score_s'] = round(time.perf_counter() - start, 3)
+        result['ms_per_1k_reviews'] = round(result['score_s'] / len(val_texts) * 1e6, 2)
+        accuracies = {name: float(np.mean(clf.classes_[p.argmax(axis=1)] == y_val))
+                      for (name, clf), p in zip(classifiers, probabilities)}
+        result.update(accuracy=round(float(np.mean(list(accuracies.values()))), 4), models=accuracies, features=X.shape[1])
+    except ValueError as e:
+        # e.g. min_df prunes every term of a small fraction, or a fraction with a single class
+        result.update(accuracy=None, error=str(e))
+    return result
+
+
+def _rank(results):
+    """Best first: highest accuracy, then lowest latency; failed candidates last"""
+    return sorted(results, key=lambda r: (r['accuracy'] is None, -(r['accuracy'] or 0), r.get('ms_per_1k_reviews', 0)))
+
+
+def successive_halving(texts, labels, budget_s, n_candidates=12, eta=3, min_rows=200, workers=1,
+                       validation_size=0.2, seed=42):
+    """
+    Pick a config for /api/train within budget_s seconds.
+
+    A validation split (at most MAX_VALIDATION rows) is carved out of the training texts. Round 0 scores
+    n_candidates configs on a fraction of the remaining rows; each round keeps
+    the best 1/eta of them and gives them eta times more rows, up to all of
+    them. Every round costs about the same, so round 0's rows are sized from a
+    timed fit of the default config to let all rounds fit the budget. A later
+    round is only started if, extrapolated from the previous one, it ends
+    within the budget; otherwise the best config so far wins. Candidates of a
+    round are evaluated up to `workers` at a time.
+
+    Returns a summary: best config with its validation accuracy, latency and
+    fit time, per-round statistics and the accuracy/latency trade-off of the
+    last round's candidates.
+    """
+    from sklearn.model_selection import train_test_split
+    start = time.perf_counter()
+    texts = list(texts)
+    validation_rows = max(1, min(int(len(texts) * validation_size), MAX_VALIDATION))
+    train_texts, val_texts, y_train, y_val = train_test_split(texts, np.asarray(labels), test_size=validation_rows, random_state=seed)
+    split = (train_texts, y_train, val_texts, y_val)
+    n_rows = len(train_texts)
+    candidates = sample_candidates(n_candidates, seed)
+    n_rounds = max(1, math.ceil(math.log(len(candidates), eta))) if len(candidates) > 1 else 1
+
+    workers = max(1, min(int(workers), len(candidates)))
+    # Size round 0 so that all rounds fit: each costs ~len(candidates) * first_rows rows of fitting,
+    # plus one scoring pass per candidate evaluated (about 1.5 * len(candidates) over all rounds)
+    probe = evaluate_config(DEFAULT_CONFIG, min(n_rows, max(min_rows, PROBE_ROWS)), split)
+    per_row = probe.get('fit_s', 0) / probe['rows'] * CANDIDATE_COST
+    parallel = min(workers, os.cpu_count() or 1)
+    seconds = (budget_s - (time.perf_counter() - start)) * parallel - probe.get('score_s', 0) * 1.5 * len(candidates)
+    affordable = seconds / (n_rounds * len(candidates) * per_row) if per_row else n_rows
+    first_rows = int(max(min_rows, min(affordable, n_rows / eta ** (n_rounds - 1))))
+
+    pool, executor = make_pool(workers, split) if workers > 1 else (None, 'sequential')
+    rounds, ranked, stopped_early = [], [], False
+    try:
+        for r in range(n_rounds):
+            rows = min(n_rows, first_rows * eta ** r)
+            if rounds:
+                last = rounds[-1]
+                estimate = last['elapsed_s'] * rows / last['rows'] * len(candidates) / last['candidates']
+                if time.perf_counter() - start + estimate > budget_s:
+                    stopped_early = True
+                    break
+            round_start = time.perf_counter()
+            results = None
+            if pool is not None:
+                try:
+                    shared = None if executor == 'process' else split
+                    results = list(pool.map(evaluate_config, candidates, [rows] * len(candidates), [shared] * len(candidates)))
+                except BrokenProcessPool as e:
+                    print(f"Search pool failed ({e}), searching sequentially")
+                    pool.shutdown()
+                    pool, executor = None, 'sequential'
+            if results is None:
+                results = []
+                for config in candidates:
+                    # Past the budget: the rest of the round is not trained (at least one candidate is)
+                    if results and time.perf_counter() - start > budget_s:
+                        results.append({'config': config, 'rows': rows, 'accuracy': None, 'error': 'time budget exhausted'})
+                        stopped_early = True
+                    else:
+                        results.append(evaluate_config(config, rows, split))
+            ranked = _rank(results)
+            rounds.append({'round': r, 'rows': rows, 'candidates': len(candidates),
+                           'elapsed_s': round(time.perf_counter() - round_start, 3), 'best_accuracy': ranked[0]['accuracy']})
+            print(f"Search round {r}: {len(candidates)} configs on {rows} rows, best {ranked[0]['accuracy']} ({rounds[-1]['elapsed_s']}s)")
+            candidates = [result['config'] for result in ranked[:max(1, math.ceil(len(ranked) / eta))]]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    best = ranked[0]
+    if best['accuracy'] is None:
+        raise ValueError(f"No configuration could be trained: {best['error']}")
+    return {
+        'best': best['config'],
+        'validation_accuracy': best['accuracy'],
+        'ms_per_1k_reviews': best['ms_per_1k_reviews'],
+        'fit_s': best['fit_s'],
+        'score_s': best['score_s'],
+        'rows': best['rows'],
+        'train_rows': n_rows,
+        'probe_fit_s': probe.get('fit_s'),
+        'rounds': rounds,
+        'tradeoff': [{key: r.get(key) for key in ['config', 'accuracy', 'ms_per_1k_reviews', 'fit_s', 'features']} for r in ranked],
+        'stopped_early': stopped_early,
+        'executor': executor,
+        'workers': workers if executor != 'sequential' else 1,
+        'elapsed_s': round(time.perf_counter() - start, 3)
+    }
+
+
+def affordable_rows(search, seconds, n_rows, n_test):
+    """
+    Training rows the best config of a search can be refitted on in `seconds`,
+    after featurizing and scoring n_test test reviews (never fewer than it was
+    searched on). Fit time is extrapolated linearly with a CANDIDATE_COST margin,
+    as LinearSVC fits grow faster than linearly.
+    """
+    per_row = search['fit_s'] / max(search['rows'], 1) * CANDIDATE_COST
+    seconds -= search['ms_per_1k_reviews'] * n_test / 1e6
+    if per_row <= 0:
+        return n_rows
+    return int(min(n_rows, max(search['rows'], seconds / per_row)))
@@ -0,0 +1,181 @@
+import os
+import copy
+import time
+import pickle
+import tempfile
+from contextlib import contextmanager
+import numpy as np
+from ensemble import display_label
+from parallel_training import score_classifier
+
+try:
+    import fcntl
+except ImportError:  # Windows: callers' in-process locks are all there is
+    fcntl = None
+
+# Hashed feature columns: 2^18 keeps each published model a few MB while collisions stay rare
+N_FEATURES = int(os.environ.get('INCREMENTAL_FEATURES', 2 ** 18))
+
+
+def online_classifiers():
+    """The partial_fit model slots, named like /api/train's: SGD with modified Huber loss
+    (a linear SVM with probabilities), MultinomialNB and SGD with log loss"""
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.naive_bayes import MultinomialNB
+    return {
+        'SVM': SGDClassifier(loss='modified_huber', random_state=42),
+        'NaiveBayes': MultinomialNB(),
+        'LogisticRegression': SGDClassifier(loss='log_loss', random_state=42)
+    }
+
+
+@contextmanager
+def trainer_lock(path):
+    """
+    Exclusive lock on the trainer saved at path, shared by every process: hold it
+    from load() to save() so two workers never absorb batches into the same state.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.lock', 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def saved_version(path):
+    """(mtime, size) of the trainer saved at path, or None: changes whenever save() replaces it"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def to_class_code(label, classes):
+    """A moderator's label ('Fake'/'Real' or a raw code) as one of the trained class codes, or None"""
+    if label in classes:
+        return label
+    return next((c for c in classes if display_label(c) == display_label(label)), None)
+
+
+class IncrementalTrainer:
+    """
+    Online counterpart of /api/train: models that learn from each new labelled batch.
+
+    Features come from a HashingVectorizer, which has no vocabulary to fit, so a
+    batch is featurized on its own and the feature space never changes. The
+    models are online_classifiers(), so absorbing a batch costs time proportional
+    to the batch; nothing seen before is re-read.
+
+    The first batch is split like /api/train (80/20, random_state=42) and its 20%
+    becomes the fixed holdout every later increment is scored on, so the metrics
+    line up with those of a full retrain on the same file.
+    """
+
+    def __init__(self, n_features=N_FEATURES):
+        self.n_features = n_features
+        self.classes = None
+        self.models = None
+        self.holdout = None        # (texts, labels)
+        self.samples_seen = 0
+        self.history = []          # one summary per increment
+        self.sources = set()       # (path, mtime, size) of absorbed uploads
+        self.reviews_until = None  # newest Review.moderated_at absorbed
+
+    @property
+    def vectorizer(self):
+        from sklearn.feature_extraction.text import HashingVectorizer
+        # Non-negative features, as MultinomialNB requires
+        return HashingVectorizer(n_features=self.n_features, alternate_sign=False, norm='l2')
+
+    def partial_fit(self, texts, labels, source=None):
+        """
+        Absorb one labelled batch and score the updated models on the holdout.
+        Returns the increment summary (rows used, skipped, metrics and timings).
+        """
+        texts = [str(t) for t in texts]
+        labels = list(labels)
+        start = time.perf_counter()
+        skipped = 0
+        if self.models is None:
+            from sklearn.model_selection import train_test_split
+            self.classes = sorted(set(labels), key=str)
+            if len(self.classes) < 2:
+                raise ValueError("The first batch needs examples of at least two classes")
+            texts, holdout_texts, labels, holdout_labels = train_test_split(texts, labels, test_size=0.2, random_state=42)
+            self.holdout = (list(holdout_texts), list(holdout_labels))
+            self.models = online_classifiers()
+        else:
+            # Labels outside the classes learned so far cannot be added to a partial_fit model
+            keep = [i for i, label in enumerate(labels) if label in self.classes]
+            skipped = len(labels) - len(keep)
+            texts, labels = [texts[i] for i in keep], [labels[i] for i in keep]
+        if not texts:
+            raise ValueError("No usable labelled rows in this batch")
+
+        X = self.vectorizer.transform(texts)
+        y = np.asarray(labels, dtype=object if isinstance(self.classes[0], str) else None)
+        classes = np.asarray(self.classes, dtype=y.dtype)
+        for clf in self.models.values():
+            clf.partial_fit(X, y, classes=classes)
+        self.samples_seen += len(texts)
+        fit_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        metrics = self.evaluate()
+        summary = {
+            'increment': len(self.history) + 1,
+            'source': source,
+            'batch_rows': len(texts),
+            'skipped_rows': skipped,
+            'samples_seen': self.samples_seen,
+            'metrics': metrics,
+            'timings': {'fit_s': round(fit_s, 3), 'metrics_s': round(time.perf_counter() - start, 3)},
+            'created_at': time.time()
+        }
+        self.history.append(summary)
+        return summary
+
+    def evaluate(self):
+        """Holdout metrics of every model, in /api/train's format"""
+        texts, labels = self.holdout
+        X = self.vectorizer.transform(texts)
+        y = np.asarray(labels, dtype=object if isinstance(self.classes[0], str) else None)
+        return {name: score_classifier(name, clf, X, y) for name, clf in self.models.items()}
+
+    def pipelines(self):
+        """Snapshot of the current models as tfidf/clf pipelines (later increments do not touch them)"""
+        from sklearn.pipeline import Pipeline
+        vectorizer = self.vectorizer
+        return {name: Pipeline([('tfidf', vectorizer), ('clf', copy.deepcopy(clf))]) for name, clf in self.models.items()}
+
+    def describe(self):
+        return {
+            'trained': self.models is not None,
+            'classes': [str(c) for c in self.classes or []],
+            'n_features': self.n_features,
+            'samples_seen': self.samples_seen,
+            'holdout_rows': len(self.holdout[0]) if self.holdout else 0,
+            'reviews_until': self.reviews_until.isoformat() if self.reviews_until else None,
+            'history': self.history
+        }
+
+    def save(self, path):
+        """Write the trainer state atomically"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix='.trainer-', dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(self, f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """The saved trainer at path, or a fresh one"""
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        return cls()
@@ -1,28 +1,17 @@
 # Deployment Timestamp: 2026-03-25T01:00:00Z - Stability Fix V3
-import nltk
 import os
-
-# Optimize NLTK for Vercel (Download to /tmp)
-NLTK_DATA_PATH = '/tmp/nltk_data'
-os.makedirs(NLTK_DATA_PATH, exist_ok=True)
-if NLTK_DATA_PATH not in nltk.data.path:
-    nltk.data.path.append(NLTK_DATA_PATH)
-
-def download_nltk_capsule():
-    for pkg in ['stopwords', 'punkt', 'punkt_tab', 'averaged_perceptron_tagger_eng']:
-        try:
-            nltk.data.find(f'corpora/{pkg}' if pkg == 'stopwords' else f'tokenizers/{pkg}' if 'punkt' in pkg else f'taggers/{pkg}')
-        except LookupError:
-            nltk.download(pkg, download_dir=NLTK_DATA_PATH)
-
-download_nltk_capsule()
-
-import re
-from textblob import TextBlob
 from collections import Counter
+from itertools import chain
+from nlp_document import AnalyzedDocument
+from phrase_matcher import PhraseMatcher
+from ngram_repetition import analyze_repetition, repetition_batch
+from sentiment_engine import sentiment_batch
+
+# Extra phrases for any family ([deceptive], [promotional], [exaggeration]); see PhraseMatcher.from_file
+LEXICON_PATH = os.environ.get('LIE_LEXICON_PATH')
 
 class LieDetector:
-    def __init__(self):
+    def __init__(self, lexicon_path=LEXICON_PATH):
         self.exaggeration_words = {
             'amazing', 'awesome', 'best', 'worst', 'incredible', 'perfect', 
             'terrible', 'horrible', 'excellent', 'outstanding', 'fantastic',
@@ -30,43 +19,208 @@ class LieDetector:
             'extremely', 'totally', 'completely', 'utterly'
         }
         
-        self.deceptive_patterns = [
-            r'\b(trust me)\b',
-            r'\b(believe me)\b',
-            r'\b(honestly)\b',
-            r'\b(to be honest)\b',
-            r'\b(truth be told)\b',
-            r'\b(i swear)\b',
-            r'\b(literally)\b'
+        self.deceptive_phrases = [
+            'trust me',
+            'believe me',
+            'honestly',
+            'to be honest',
+            'truth be told',
+            'i swear',
+            'literally'
         ]
         
-        self.promotional_patterns = [
-            r'\b(check out)\b',
-            r'\b(click here)\b',
-            r'\b(link in bio)\b',
-            r'\b(buy now)\b',
-            r'\b(discount)\b',
-            r'\b(coupon)\b',
-            r'\b(use code)\b',
-            r'\b(visit my)\b',
-            r'\b(subscribe)\b'
+        self.promotional_phrases = [
+            'check out',
+            'click here',
+            'link in bio',
+            'buy now',
+            'discount',
+            'coupon',
+            'use code',
+            'visit my',
+            'subscribe'
         ]
 
-    def analyze(self, text):
+        # Frequent words that never count as suspicious repetition
+        self.repetition_stopwords = {'the', 'and', 'a', 'to', 'of', 'it', 'is', 'i', 'in'}
+
+        # All three families are found in one scan per review, however long the lexicons grow
+        self.matcher = PhraseMatcher({
+            'deceptive': self.deceptive_phrases,
+            'promotional': self.promotional_phrases,
+            'exaggeration': self.exaggeration_words
+        })
+        if lexicon_path:
+            PhraseMatcher.from_file(lexicon_path, self.matcher)
+
+    def warmup(self):
+        """Load the sentiment lexicon ahead of the first request"""
+        self.analyze("Warm up the sentiment lexicon, it is great.")
+
+    def analyze(self, text, doc=None):
+        """doc: a shared AnalyzedDocument for text, so sentiment and tokens are computed once per review"""
         if not text:
             return self._empty_result()
             
-        blob = TextBlob(text)
+        # The sentiment lexicon is only loaded once a review is scored (inside the document's sentiment stage)
+        doc = doc or AnalyzedDocument(text)
+        hits = self.matcher.scan(doc.lower)
+        # Repetition has two sub-scores: over-used words and repeated phrases (word n-grams)
+        repetition = analyze_repetition(doc.words)
+        repetition['word_score'] = self._detect_repetition(doc)
         
         return {
-            'deception_score': self._detect_deceptive_patterns(text),
-            'exaggeration_score': self._score_exaggeration(text),
-            'emotional_intensity': self._emotional_intensity(blob),
-            'repetition_score': self._detect_repetition(text),
-            'promotional_score': self._detect_promotional(text),
+            'deception_score': self._detect_deceptive_patterns(hits),
+            'exaggeration_score': self._score_exaggeration(doc, hits),
+            'emotional_intensity': self._emotional_intensity(doc),
+            'repetition_score': max(repetition['word_score'], repetition['phrase_score']),
+            'promotional_score': self._detect_promotional(hits),
+            'details': {
+                'subjectivity': float(doc.subjectivity),
+                'word_count': len(text.split()),
+                'repetition': repetition,
+                # (start, end, phrase) of every hit, offsets into the lowercased text
+                'matches': {family: [list(span) for span in hit['spans']] for family, hit in hits.items() if hit['spans']}
+            }
+        }
+
+    def analyze_batch(self, texts, docs=None):
+        """
+        Scores for many reviews at once, as a DataFrame aligned with texts (a list or
+        pandas Series). Every score is identical to analyze() on the same text.
+
+        The texts are tokenized together into one sparse review x word count matrix:
+        exaggeration and single-word phrases are a matrix-vector product, repetition
+        a grouped top-3 over (review, word) counts. Only reviews that contain every
+        adjacent word pair of some multi-word phrase are rescanned with the PhraseMatcher.
+        Repeated phrases are searched review by review (ngram_repetition's rolling
+        hashes over each review's words, reusing the tokens split here).
+        Sentiment comes from the batch lexicon engine; pass docs (AnalyzedDocuments
+        aligned with texts) to reuse sentiment that was already computed.
+        """
+        import numpy as np
+        import pandas as pd
+        from scipy import sparse
+
+        series = texts if isinstance(texts, pd.Series) else pd.Series(list(texts), dtype=object)
+        n = len(series)
+        present = np.array([bool(t) for t in series], dtype=bool)
+        text = series.where(present, '').astype(str)
+        lower = text.str.lower()
+        words = lower.str.findall(r'\w+')
+        n_words = words.str.len().fillna(0).to_numpy(dtype=np.int64)
+
+        # 1. Sparse review x word count matrix over the batch vocabulary
+        flat = np.fromiter(chain.from_iterable(words), dtype=object, count=int(n_words.sum()))
+        ids, vocab = pd.factorize(flat)
+        ids = ids.astype(np.int64)
+        column = {word: i for i, word in enumerate(vocab)}
+        rows = np.repeat(np.arange(n), n_words)
+        counts = sparse.csr_matrix((np.ones(len(ids), dtype=np.int64), (rows, ids)), shape=(n, len(vocab)))
+        presence = (counts > 0).astype(np.int64)
+
+        # 2. Phrase families: single-word phrases straight from the matrix
+        families = ['deceptive', 'promotional', 'exaggeration']
+        hit_count, distinct = {}, {}
+        multi_word = []
+        weights = {f: np.zeros(len(vocab), dtype=np.int64) for f in families}
+        for family, phrase, phrase_words in self.matcher.entries():
+            if family not in weights:
+                continue
+            if len(phrase_words) > 1:
+                multi_word.append(phrase_words)
+            elif phrase_words[0] in column:
+                weights[family][column[phrase_words[0]]] += 1
+        for family in families:
+            hit_count[family] = counts @ weights[family]
+            distinct[family] = presence @ weights[family]
+
+        # 3. Multi-word phrases: rescan only reviews that contain every adjacent word pair of a phrase
+        candidates = np.zeros(n, dtype=bool)
+        V = max(len(vocab), 1)
+        adjacent = rows[:-1] == rows[1:]
+        pair_keys, pair_ids = np.unique(ids[:-1][adjacent] * V + ids[1:][adjacent], return_inverse=True)
+        phrase_pairs = []
+        for phrase_words in multi_word:
+            if not all(word in column for word in phrase_words):
+                continue
+            keys = np.unique([column[a] * V + column[b] for a, b in zip(phrase_words, phrase_words[1:])])
+            where = np.searchsorted(pair_keys, keys)
+            if np.all(where < len(pair_keys)) and np.all(pair_keys[np.minimum(where, len(pair_keys) - 1)] == keys):
+                phrase_pairs.append(where)
+        if phrase_pairs:
+            pair_rows = rows[:-1][adjacent]
+            pairs = sparse.csr_matrix((np.ones(len(pair_ids), dtype=np.int64), (pair_rows, pair_ids.reshape(-1))),
+                                      shape=(n, len(pair_keys)))
+            incidence = sparse.csr_matrix(
+                (np.ones(sum(len(w) for w in phrase_pairs), dtype=np.int64),
+                 (np.concatenate(phrase_pairs), np.repeat(np.arange(len(phrase_pairs)), [len(w) for w in phrase_pairs]))),
+                shape=(len(pair_keys), len(phrase_pairs)))
+            found = ((pairs > 0).astype(np.int64) @ incidence).tocoo()
+            needed = np.array([len(w) for w in phrase_pairs])
+            candidates[found.row[found.data == needed[found.col]]] = True
+        for i in np.flatnonzero(candidates & present):
+            hits = self.matcher.scan(lower.iat[i])
+            for family in families:
+                hit_count[family][i] = hits[family]['count']
+                distinct[family][i] = len(hits[family]['phrases'])
+
+        # 4. Repetition: top-3 words per review, ties in order of first occurrence (Counter.most_common)
+        repetition = np.zeros(n, dtype=np.int64)
+        if len(ids):
+            keys, first, freq = np.unique(rows * len(vocab) + ids, return_index=True, return_counts=True)
+            key_rows, key_words = keys // len(vocab), keys % len(vocab)
+            order = np.lexsort((first, -freq, key_rows))
+            key_rows, key_words, freq = key_rows[order], key_words[order], freq[order]
+            rank = np.arange(len(order)) - np.searchsorted(key_rows, key_rows, side='left')
+            content = ~np.isin(vocab[key_words], list(self.repetition_stopwords))
+            flagged = (rank < 3) & content & (freq > n_words[key_rows] * 0.2) & (n_words[key_rows] >= 10)
+            repetition = np.minimum(np.bincount(key_rows[flagged], minlength=n) * 30, 100)
+        phrases = repetition_batch(words.tolist())
+
+        # 5. Sentiment: shared documents where given, one batch call for the rest
+        docs = list(docs) if docs is not None else [None] * n
+        polarity = np.zeros(n)
+        subjectivity = np.zeros(n)
+        missing = [i for i in np.flatnonzero(present) if docs[i] is None]
+        if missing:
+            polarity[missing], subjectivity[missing] = sentiment_batch(text.iloc[missing])
+        for i in np.flatnonzero(present):
+            if docs[i] is not None:
+                polarity[i], subjectivity[i] = docs[i].polarity, docs[i].subjectivity
+
+        density = (hit_count['exaggeration'] / np.maximum(n_words, 1)) * 100
+        exaggeration = np.where(n_words > 0, np.minimum(density * 10, 100), 0)
+        intensity = ((np.abs(polarity) + subjectivity) / 2) * 100
+        return pd.DataFrame({
+            'deception_score': np.minimum(20 * distinct['deceptive'], 100),
+            'exaggeration_score': [round(float(x), 2) for x in exaggeration],
+            'emotional_intensity': [round(float(x), 2) if p else 0 for x, p in zip(intensity, present)],
+            'repetition_score': np.maximum(repetition, phrases['phrase_score']),
+            'promotional_score': np.minimum(50 * distinct['promotional'], 100),
+            'word_repetition_score': repetition,
+            'phrase_repetition_score': phrases['phrase_score'],
+            'longest_repeated_span': phrases['longest_span'],
+            'repetition_coverage': phrases['coverage'],
+            'subjectivity': subjectivity,
+            'polarity': polarity,
+            'word_count': text.str.split().str.len().fillna(0).to_numpy(dtype=np.int64)
+        }, index=series.index)
+
+    @staticmethod
+    def batch_result(row):
+        """One analyze_batch row (a to_dict('records') entry) in the shape analyze() returns"""
+        return {
+            'deception_score': row['deception_score'],
+            'exaggeration_score': row['exaggeration_score'],
+            'emotional_intensity': row['emotional_intensity'],
+            'repetition_score': row['repetition_score'],
+            'promotional_score': row['promotional_score'],
             'details': {
-                'subjectivity': float(blob.sentiment.subjectivity),
-                'word_count': len(text.split())
+                'subjectivity': float(row['subjectivity']),
+                'word_count': row['word_count'],
+                'repetition': {'word_score': row['word_repetition_score'], 'phrase_score': row['phrase_repetition_score'],
+                               'longest_span': row['longest_repeated_span'], 'coverage': row['repetition_coverage']}
             }
         }
 
@@ -80,30 +234,25 @@ class LieDetector:
             'details': {}
         }
 
-    def _detect_deceptive_patterns(self, text):
+    def _detect_deceptive_patterns(self, hits):
         """
         Detects common linguistic cues of deception:
         - "Trust me", "Honestly" (Subconscious need to verify truth)
         - Lack of self-reference (Distancing language - though less reliable in reviews)
         """
-        text_lower = text.lower()
-        score = 0
-        
-        # Check for specific phrases
-        for pattern in self.deceptive_patterns:
-            if re.search(pattern, text_lower):
-                score += 20 # High penalty for "Trust me" etc.
+        # Each distinct phrase found counts once
+        score = 20 * len(hits['deceptive']['phrases']) # High penalty for "Trust me" etc.
                 
         # Cap at 100
         return min(score, 100)
 
-    def _score_exaggeration(self, text):
+    def _score_exaggeration(self, doc, hits):
         """
         Counts superlatives and intensifiers.
         Fake reviews often use more "extreme" language.
         """
-        words = re.findall(r'\w+', text.lower())
-        count = sum(1 for w in words if w in self.exaggeration_words)
+        words = doc.words
+        count = hits['exaggeration']['count']
         
         # Calculate density: matches per 100 words
         if not words: return 0
@@ -113,25 +262,25 @@ class LieDetector:
         score = min(density * 10, 100) 
         return round(score, 2)
 
-    def _emotional_intensity(self, blob):
+    def _emotional_intensity(self, doc):
         """
         Combination of polarity magnitude (how positive/negative) 
         and subjectivity (how opinionated).
         Fake reviews often have very high subjectivity and extreme polarity.
         """
-        polarity = abs(blob.sentiment.polarity) # 0 to 1
-        subjectivity = blob.sentiment.subjectivity # 0 to 1
+        polarity = abs(doc.polarity) # 0 to 1
+        subjectivity = doc.subjectivity # 0 to 1
         
         # Intensity = (Polarity + Subjectivity) / 2 * 100
         intensity = ((polarity + subjectivity) / 2) * 100
         return round(intensity, 2)
 
-    def _detect_repetition(self, text):
+    def _detect_repetition(self, doc):
         """
-        Detects repetitive n-grams or words.
+        Detects repetitive words (repeated phrases are scored by ngram_repetition).
         Fake reviews might be copy-pasted or generated with repetitive loops.
         """
-        words = re.findall(r'\w+', text.lower())
+        words = doc.words
         if len(words) < 10: return 0
         
         # Check for unigram repetition (excessive use of same words)
@@ -141,21 +290,16 @@ class LieDetector:
         repetition_penalty = 0
         for word, count in most_common:
             # Common stop words shouldn't trigger this too hard, but high freq of content words is suspicious
-            if word not in ['the', 'and', 'a', 'to', 'of', 'it', 'is', 'i', 'in']:
+            if word not in self.repetition_stopwords:
                 if count > len(words) * 0.2: # If a word makes up > 20% of the text
                     repetition_penalty += 30
                     
         return min(repetition_penalty, 100)
 
-    def _detect_promotional(self, text):
+    def _detect_promotional(self, hits):
         """
         Detects marketing speak.
         """
-        text_lower = text.lower()
-        score = 0
-        
-        for pattern in self.promotional_patterns:
-            if re.search(pattern, text_lower):
-                score += 50 
+        score = 50 * len(hits['promotional']['phrases'])
                 
         return min(score, 100)
@@ -0,0 +1,161 @@
+import time
+import threading
+from collections import Counter
+
+
+def _bucket(n):
+    """Power-of-two histogram bucket label: 1, 2, 3-4, 5-8, ..."""
+    if n <= 2:
+        return str(n)
+    upper = 1
+    while upper < n:
+        upper *= 2
+    return f"{upper // 2 + 1}-{upper}"
+
+
+def _one_per_item(results, n):
+    """results as a list, or RuntimeError unless score_batch returned exactly n of them"""
+    results = list(results)
+    if len(results) != n:
+        raise RuntimeError(f"score_batch returned {len(results)} results for {n} items")
+    return results
+
+
+class _Request:
+    __slots__ = ('item', 'result', 'error', 'done', 'enqueued_at')
+
+    def __init__(self, item):
+        self.item = item
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+        self.enqueued_at = time.perf_counter()
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item scoring calls into one vectorized call.
+
+    score_batch(items) must return one result per item, in order (a batch that
+    gets any other number of results fails every request in it). When nothing
+    else is in flight, submit() scores directly in the caller's thread, so an
+    idle server pays no extra latency. Under concurrency, items queue up and a
+    background thread scores them together once max_batch items are waiting or
+    the oldest has waited max_wait_ms. A failing batch is retried item by item
+    so one bad input only fails its own request.
+    """
+
+    def __init__(self, score_batch, max_wait_ms=5, max_batch=64):
+        self.score_batch = score_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch = max_batch
+        self._cond = threading.Condition()
+        self._pending = []
+        self._inflight = 0
+        self._worker = None
+        # Stats
+        self.direct_calls = 0
+        self.batched_items = 0
+        self.batches = 0
+        self.max_queue_depth = 0
+        self.total_wait = 0.0
+        self.batch_sizes = Counter()
+        self.queue_depths = Counter()
+
+    def submit(self, item):
+        with self._cond:
+            idle = self._inflight == 0 and not self._pending
+            if idle:
+                self._inflight += 1
+                self.direct_calls += 1
+            else:
+                request = _Request(item)
+                self._pending.append(request)
+                depth = len(self._pending)
+                self.queue_depths[_bucket(depth)] += 1
+                self.max_queue_depth = max(self.max_queue_depth, depth)
+                self._ensure_worker()
+                self._cond.notify_all()
+
+        if idle:
+            try:
+                return _one_per_item(self.score_batch([item]), 1)[0]
+            finally:
+                with self._cond:
+                    self._inflight -= 1
+
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def stats(self):
+        with self._cond:
+            return {
+                'queue_depth': len(self._pending),
+                'max_queue_depth': self.max_queue_depth,
+                'inflight': self._inflight,
+                'direct_calls': self.direct_calls,
+                'batches': self.batches,
+                'batched_items': self.batched_items,
+                'avg_batch_size': round(self.batched_items / self.batches, 2) if self.batches else 0.0,
+                'avg_wait_ms': round(self.total_wait / self.batched_items * 1000, 3) if self.batched_items else 0.0,
+                'batch_size_histogram': dict(self.batch_sizes),
+                'queue_depth_histogram': dict(self.queue_depths),
+                'max_wait_ms': self.max_wait * 1000,
+                'max_batch': self.max_batch
+            }
+
+    def _ensure_worker(self):
+        # Started lazily so every gunicorn worker process gets its own thread after fork
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                deadline = self._pending[0].enqueued_at + self.max_wait
+                while len(self._pending) < self.max_batch:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                self._inflight += 1
+                self.batches += 1
+                self.batched_items += len(batch)
+                self.batch_sizes[_bucket(len(batch))] += 1
+                now = time.perf_counter()
+                self.total_wait += sum(now - r.enqueued_at for r in batch)
+
+            try:
+                self._score(batch)
+            finally:
+                with self._cond:
+                    self._inflight -= 1
+                for request in batch:
+                    request.done.set()
+
+    def _score(self, batch):
+        try:
+            results = self.score_batch([r.item for r in batch])
+        except Exception:
+            for request in batch:
+                try:
+                    request.result = _one_per_item(self.score_batch([request.item]), 1)[0]
+                except Exception as e:
+                    request.error = e
+            return
+        try:
+            results = _one_per_item(results, len(batch))
+        except RuntimeError as e:
+            # zip() would leave the unmatched callers with a None result
+            for request in batch:
+                request.error = e
+            return
+        for request, result in zip(batch, results):
+            request.result = result
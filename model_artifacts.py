@@ -0,0 +1,192 @@
+import os
+import json
+import hashlib
+import numpy as np
+from fast_scorer import CompiledFeaturizer, CompiledLinearModel, MappedVocabulary
+
+# Bump whenever the layout below changes; loaders refuse versions they do not know
+FORMAT_VERSION = 1
+MANIFEST = 'manifest.json'
+
+# Pickled pipelines the binary format is converted from (and checked against)
+PIPELINE_FILES = [('SVM', 'svm_pipeline.pkl'), ('NaiveBayes', 'nb_pipeline.pkl'), ('LogisticRegression', 'lr_pipeline.pkl')]
+
+
+def model_fingerprint(models):
+    """Content hash of a set of pipelines, identical across workers that load the same artifacts"""
+    import pickle
+    digest = hashlib.sha1()
+    for name in sorted(models):
+        digest.update(name.encode('utf-8'))
+        digest.update(pickle.dumps(models[name]))
+    return digest.hexdigest()[:12]
+
+
+def source_hashes(folder):
+    """sha1 of every pickled pipeline in folder, used to detect binary artifacts that went stale"""
+    hashes = {}
+    for _, filename in PIPELINE_FILES:
+        path = os.path.join(folder, filename)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                hashes[filename] = hashlib.sha1(f.read()).hexdigest()
+    return hashes
+
+
+def save_compiled(engine, folder, version, sources=None):
+    """
+    Write a fully compiled EnsembleEngine as a manifest plus one .npy file per array.
+
+    Layout of folder:
+      manifest.json          format version, model version, featurizer options, per-model metadata
+      f<i>_terms.npy         sorted UTF-8 vocabulary terms of feature space i
+      f<i>_columns.npy       feature column of each term
+      f<i>_idf.npy           idf vector (absent when use_idf=False)
+      <model>_<array>.npy    weights, bias, calib_a, calib_b of each head
+
+    The manifest is written last, so a folder without one is never loaded half-written.
+    Returns False (and removes any previous manifest) when a model is not compiled.
+    """
+    os.makedirs(folder, exist_ok=True)
+    manifest_path = os.path.join(folder, MANIFEST)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    if not engine.names() or set(engine.names()) != engine.compiled:
+        return False
+
+    def save(name, array):
+        np.save(os.path.join(folder, name + '.npy'), np.ascontiguousarray(array), allow_pickle=False)
+
+    featurizers = []
+    for i, featurizer in enumerate(engine.featurizers):
+        vocabulary = featurizer.vocabulary
+        if not isinstance(vocabulary, MappedVocabulary):
+            vocabulary = MappedVocabulary.from_dict(vocabulary)
+        save(f'f{i}_terms', vocabulary.sorted_terms)
+        save(f'f{i}_columns', vocabulary.columns)
+        if featurizer.idf is not None:
+            save(f'f{i}_idf', featurizer.idf)
+        featurizers.append({
+            'token_pattern': featurizer.token_pattern,
+            'lowercase': featurizer.lowercase,
+            'ngram_range': list(featurizer.ngram_range),
+            'stop_words': sorted(featurizer.stop_words) if featurizer.stop_words else None,
+            'binary': featurizer.binary,
+            'sublinear_tf': featurizer.sublinear_tf,
+            'norm': featurizer.norm,
+            'use_idf': featurizer.idf is not None
+        })
+
+    models = {}
+    for name, (group, head) in engine.heads.items():
+        save(f'{name}_weights', head.weights)
+        save(f'{name}_bias', head.bias)
+        if head.calib_a is not None:
+            save(f'{name}_calib_a', head.calib_a)
+            save(f'{name}_calib_b', head.calib_b)
+        models[name] = {
+            'featurizer': group,
+            'output': head.output,
+            'classes': head.classes_.tolist(),
+            'calibrated': head.calib_a is not None
+        }
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'model_version': version,
+        'sources': sources or {},
+        'featurizers': featurizers,
+        'models': models
+    }
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    return True
+
+
+def read_manifest(folder):
+    """The manifest of a binary artifact folder, or None if there is no usable one"""
+    path = os.path.join(folder, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != FORMAT_VERSION:
+        print(f"Ignoring {folder}: artifact format {manifest.get('format_version')} (expected {FORMAT_VERSION})")
+        return None
+    return manifest
+
+
+def load_compiled(folder, mmap=True):
+    """
+    Load (featurizers, heads, manifest) from save_compiled() output, or None if absent.
+    With mmap=True arrays are memory-mapped read-only, so every worker process on a
+    host shares the same page-cache copy instead of holding its own unpickled one.
+    """
+    manifest = read_manifest(folder)
+    if manifest is None:
+        return None
+    mmap_mode = 'r' if mmap else None
+
+    def load(name):
+        return np.load(os.path.join(folder, name + '.npy'), mmap_mode=mmap_mode, allow_pickle=False)
+
+    featurizers = []
+    for i, spec in enumerate(manifest['featurizers']):
+        featurizers.append(CompiledFeaturizer(
+            vocabulary=MappedVocabulary(load(f'f{i}_terms'), load(f'f{i}_columns')),
+            idf=load(f'f{i}_idf') if spec['use_idf'] else None,
+            token_pattern=spec['token_pattern'],
+            lowercase=spec['lowercase'],
+            ngram_range=spec['ngram_range'],
+            stop_words=spec['stop_words'],
+            binary=spec['binary'],
+            sublinear_tf=spec['sublinear_tf'],
+            norm=spec['norm']
+        ))
+
+    heads = {}
+    for name, spec in manifest['models'].items():
+        calibrated = spec['calibrated']
+        heads[name] = (spec['featurizer'], CompiledLinearModel(
+            spec['classes'],
+            load(f'{name}_weights'),
+            load(f'{name}_bias'),
+            spec['output'],
+            load(f'{name}_calib_a') if calibrated else None,
+            load(f'{name}_calib_b') if calibrated else None
+        ))
+    return featurizers, heads, manifest
+
+
+def is_current(folder, pipeline_folder):
+    """True when folder holds binary artifacts converted from the pickles currently in pipeline_folder"""
+    manifest = read_manifest(folder)
+    return manifest is not None and manifest.get('sources') == source_hashes(pipeline_folder)
+
+
+def convert(pipeline_folder, out_folder=None):
+    """Convert the pickled pipelines in pipeline_folder into the binary format (default: <folder>/compiled)"""
+    import pickle
+    from ensemble import EnsembleEngine
+
+    out_folder = out_folder or os.path.join(pipeline_folder, 'compiled')
+    models = {}
+    for name, filename in PIPELINE_FILES:
+        path = os.path.join(pipeline_folder, filename)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                models[name] = pickle.load(f)
+
+    engine = EnsembleEngine(models, compile=True)
+    if not save_compiled(engine, out_folder, model_fingerprint(models), source_hashes(pipeline_folder)):
+        raise ValueError(f"Models {sorted(set(engine.names()) - engine.compiled)} cannot be compiled; keep the pickles")
+    return out_folder
+
+
+if __name__ == "__main__":
+    # Convert pickled pipelines: python model_artifacts.py [pipeline_folder] [out_folder]
+    import sys
+    pipeline_folder = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model', 'artifacts')
+    out_folder = convert(pipeline_folder, sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"Wrote binary artifacts for {sorted(read_manifest(out_folder)['models'])} to {out_folder}")
@@ -0,0 +1,138 @@
+import os
+import json
+import time
+import shutil
+import pickle
+import tempfile
+from model_artifacts import PIPELINE_FILES, model_fingerprint, source_hashes, save_compiled, load_compiled, is_current
+
+POINTER = 'CURRENT'
+META = 'meta.json'
+
+
+class ModelRegistry:
+    """
+    Numbered, immutable model versions on disk plus a pointer to the active one.
+
+    root/
+      v000001/  svm/nb/lr pipelines, compiled/ binary artifacts, meta.json
+      v000002/
+      CURRENT   the active version number
+
+    A version is written to a staging folder and renamed into place in one step,
+    and CURRENT is replaced with os.replace(), so a reader in any process sees
+    either the previous complete set of models or the new one, never a mix.
+    Rolling back only moves the pointer.
+    """
+
+    def __init__(self, root, keep=5):
+        self.root = root
+        self.keep = keep
+
+    def path(self, version):
+        return os.path.join(self.root, f"v{int(version):06d}")
+
+    def versions(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(int(name[1:]) for name in os.listdir(self.root)
+                      if name.startswith('v') and name[1:].isdigit() and os.path.exists(os.path.join(self.root, name, META)))
+
+    def current(self):
+        """Active version number, or None if nothing was published yet"""
+        try:
+            with open(os.path.join(self.root, POINTER)) as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def meta(self, version):
+        with open(os.path.join(self.path(version), META)) as f:
+            return json.load(f)
+
+    def describe(self):
+        current = self.current()
+        return [dict(self.meta(v), current=(v == current)) for v in reversed(self.versions())]
+
+    def publish(self, models, engine=None, metadata=None):
+        """
+        Store a complete set of pipelines (and the binary artifacts of engine, if it
+        is fully compiled) as the next version and make it the active one.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix='.staging-', dir=self.root)
+        try:
+            files = dict(PIPELINE_FILES)
+            for name, pipeline in models.items():
+                with open(os.path.join(staging, files.get(name, f"{name}.pkl")), 'wb') as f:
+                    pickle.dump(pipeline, f)
+            fingerprint = model_fingerprint(models)
+            if engine is not None:
+                save_compiled(engine, os.path.join(staging, 'compiled'), fingerprint, source_hashes(staging))
+
+            version = (self.versions() or [0])[-1] + 1
+            while True:
+                meta = dict(metadata or {}, version=version, model_version=f"v{version}",
+                            fingerprint=fingerprint, models=sorted(models), created_at=time.time())
+                with open(os.path.join(staging, META), 'w') as f:
+                    json.dump(meta, f, indent=2)
+                try:
+                    # Fails if another worker published this number first; take the next one
+                    os.rename(staging, self.path(version))
+                    break
+                except OSError:
+                    if not os.path.exists(self.path(version)):
+                        raise
+                    version += 1
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        self.activate(version)
+        self.prune()
+        return version
+
+    def activate(self, version):
+        """Atomically point CURRENT at an existing version"""
+        if int(version) not in self.versions():
+            raise ValueError(f"Unknown model version {version}")
+        fd, tmp = tempfile.mkstemp(prefix=f".{POINTER}-", dir=self.root)
+        with os.fdopen(fd, 'w') as f:
+            f.write(str(int(version)))
+        os.replace(tmp, os.path.join(self.root, POINTER))
+
+    def rollback(self, version=None):
+        """Activate version, or the newest version older than the current one"""
+        if version is None:
+            current = self.current()
+            older = [v for v in self.versions() if current is None or v < current]
+            if not older:
+                raise ValueError("No earlier model version to roll back to")
+            version = older[-1]
+        self.activate(version)
+        return int(version)
+
+    def load(self, version, compile=True):
+        """(models, engine, meta) for a version; prefers its memory-mapped binary artifacts"""
+        from ensemble import EnsembleEngine
+        folder = self.path(version)
+        meta = self.meta(version)
+        compiled_folder = os.path.join(folder, 'compiled')
+        if compile and is_current(compiled_folder, folder):
+            featurizers, heads, _ = load_compiled(compiled_folder)
+            return {}, EnsembleEngine.from_compiled(featurizers, heads), meta
+
+        models = {}
+        for name, filename in PIPELINE_FILES:
+            path = os.path.join(folder, filename)
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    models[name] = pickle.load(f)
+        return models, EnsembleEngine(models, compile=compile), meta
+
+    def prune(self):
+        """Delete all but the newest `keep` versions, never the active one"""
+        current = self.current()
+        for version in self.versions()[:-self.keep] if self.keep else []:
+            if version != current:
+                shutil.rmtree(self.path(version), ignore_errors=True)
@@ -22,13 +22,84 @@ class Review(db.Model):
     confidence = db.Column(db.Float, nullable=False)
     sentiment = db.Column(db.Float, nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    # Registry version (or fingerprint) of the models that produced this label
+    model_version = db.Column(db.String(40), nullable=True)
+    # Fake/Real verdict of a moderator, used as a training label by incremental training
+    moderator_label = db.Column(db.String(20), nullable=True)
+    moderated_at = db.Column(db.DateTime, nullable=True)
     
     def to_dict(self):
         return {
+            'id': self.id,
             'text': self.text,
             'label': self.label,
             'confidence': f"{self.confidence:.2f}",
             'sentiment': self.sentiment,
             'time': self.timestamp.strftime("%H:%M:%S"),
-            'date': self.timestamp.strftime("%Y-%m-%d")
+            'date': self.timestamp.strftime("%Y-%m-%d"),
+            'model_version': self.model_version,
+            'moderator_label': self.moderator_label
+        }
+
+class StyleFingerprint(db.Model):
+    """AuthorDNA style vector of a scored review, indexed by style_index.StyleIndex"""
+    id = db.Column(db.Integer, primary_key=True)
+    review_id = db.Column(db.Integer, db.ForeignKey('review.id'), nullable=True)
+    text = db.Column(db.Text, nullable=False)
+    author = db.Column(db.String(120), nullable=True)
+    product = db.Column(db.String(255), nullable=True, index=True)
+    # JSON list of floats in author_dna.FEATURES order
+    vector = db.Column(db.Text, nullable=False)
+    n_tokens = db.Column(db.Integer, nullable=False)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'review_id': self.review_id,
+            'text': self.text,
+            'author': self.author,
+            'product': self.product,
+            'date': self.timestamp.strftime("%Y-%m-%d") if self.timestamp else None
+        }
+
+class TrainingJob(db.Model):
+    """A background /api/train run, executed and updated by training_jobs.TrainingJobQueue"""
+    id = db.Column(db.String(32), primary_key=True)
+    dataset = db.Column(db.String(255), nullable=False)
+    dataset_hash = db.Column(db.String(64), nullable=False, index=True)
+    # dataset_hash while queued or running, NULL afterwards: the unique index allows one active job per dataset
+    active_key = db.Column(db.String(64), unique=True, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued/running/succeeded/failed/cancelled
+    stage = db.Column(db.String(40), nullable=True)
+    # JSON: request parameters, per-stage/per-model progress, and the /api/train response on success
+    params = db.Column(db.Text, nullable=True)
+    progress = db.Column(db.Text, nullable=True)
+    result = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    model_version = db.Column(db.String(40), nullable=True)
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    # Refreshed while the job is queued or running; an active job that stops beating is considered dead
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        import json
+        end = self.finished_at or datetime.utcnow()
+        result = json.loads(self.result) if self.result else {}
+        return {
+            'job_id': self.id,
+            'dataset': self.dataset,
+            'status': self.status,
+            'stage': self.stage,
+            'progress': json.loads(self.progress) if self.progress else {},
+            'elapsed_s': round((end - self.started_at).total_seconds(), 3) if self.started_at else 0.0,
+            'metrics': result.get('metrics'),
+            'timings': result.get('timings'),
+            'model_version': self.model_version,
+            'error': self.error,
+            'cancel_requested': self.cancel_requested,
+            'created_at': self.created_at.isoformat() if self.created_at else None
         }
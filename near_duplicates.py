@@ -0,0 +1,279 @@
+import re
+import threading
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+WORD_RE = re.compile(r'\w+')
+# Windows hashed per NumPy pass: num_perm x HASH_CHUNK uint64s of scratch, sized to stay in cache
+HASH_CHUNK = 1 << 13
+
+
+def normalize(text):
+    """Lowercase words joined by single spaces, so punctuation and spacing edits do not matter"""
+    return ' '.join(WORD_RE.findall(str(text).lower()))
+
+
+def _mix(x):
+    # splitmix64 finalizer: spreads the packed shingle bytes over all 64 bits
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xbf58476d1ce4e5b9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94d049bb133111eb)
+    return x ^ (x >> np.uint64(31))
+
+
+def lsh_params(threshold, num_perm):
+    """
+    (bands, rows) for LSH banding: the split whose candidate probability
+    1 - (1 - s^rows)^bands best separates similarities below and above threshold
+    (least false positive plus false negative area).
+    """
+    s = np.linspace(0, 1, 1001)
+    best, best_error = None, None
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        p = 1 - (1 - s ** rows) ** bands
+        error = np.where(s < threshold, p, 1 - p).mean()
+        if best_error is None or error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class MinHasher:
+    """
+    MinHash signatures of character shingles.
+
+    A text is normalized (lowercase words, single spaces) and cut into every
+    window of k bytes; with k <= 8 a window packs exactly into one uint64, so
+    shingles are never hashed into collisions. num_perm multiply-shift hash
+    functions map the shingles to 32-bit values and a signature keeps each
+    function's minimum: two signatures agree in a position with probability
+    equal to the Jaccard similarity of the two shingle sets. A whole batch is
+    shingled and hashed as NumPy arrays, with no per-shingle Python work.
+    """
+
+    def __init__(self, num_perm=128, k=5, seed=1):
+        if not 1 <= k <= 8:
+            raise ValueError("Shingle size k must be between 1 and 8 bytes")
+        self.num_perm = num_perm
+        self.k = k
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(0, 2 ** 64, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 64, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, texts):
+        """(window values, owning text) of every k-byte window of the normalized texts"""
+        k = self.k
+        data = [normalize(t).encode('utf-8') for t in texts]
+        # Texts shorter than one window become a single zero-padded shingle; empty texts have none
+        data = [d.ljust(k, b'\0') if d else d for d in data]
+        lengths = np.fromiter((len(d) for d in data), dtype=np.int64, count=len(data))
+        counts = np.where(lengths > 0, lengths - k + 1, 0)
+        buf = np.frombuffer(b''.join(data), dtype=np.uint8)
+        owners = np.repeat(np.arange(len(data)), counts)
+        # Window j of text i starts at offset_i + j
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]]) if len(data) else np.zeros(0, dtype=np.int64)
+        first = np.concatenate([[0], np.cumsum(counts)[:-1]]) if len(data) else np.zeros(0, dtype=np.int64)
+        starts = np.arange(counts.sum()) - np.repeat(first - offsets, counts)
+        # Read 8 bytes at each start as one little-endian integer and keep the low k
+        padded = np.concatenate([buf, np.zeros(8, dtype=np.uint8)])
+        windows = as_strided(padded, shape=(len(buf), 8), strides=(1, 1))
+        values = np.ascontiguousarray(windows[starts]).view('<u8').ravel().astype(np.uint64)
+        return values & np.uint64((1 << (8 * k)) - 1), owners
+
+    def signatures(self, texts):
+        """(len(texts), num_perm) uint32 signatures; a text with no words gets all 0xFFFFFFFF"""
+        texts = list(texts)
+        # Hashes are laid out permutation-major, so each minimum runs over contiguous memory
+        minima = np.full((self.num_perm, len(texts)), np.iinfo(np.uint32).max, dtype=np.uint64)
+        values, owners = self.shingles(texts)
+        mixed = _mix(values)
+        hashed = np.empty((self.num_perm, min(HASH_CHUNK, len(mixed))), dtype=np.uint64)
+        a, b, shift = self._a[:, None], self._b[:, None], np.uint64(32)
+        for start in range(0, len(mixed), HASH_CHUNK):
+            chunk = mixed[start:start + HASH_CHUNK]
+            chunk_owners = owners[start:start + HASH_CHUNK]
+            out = hashed[:, :len(chunk)]
+            np.multiply(a, chunk, out=out)
+            np.add(out, b, out=out)
+            np.right_shift(out, shift, out=out)
+            # Owners are sorted, so each text's windows in this chunk are one contiguous run
+            bounds = np.flatnonzero(np.r_[True, chunk_owners[1:] != chunk_owners[:-1]])
+            rows = chunk_owners[bounds]
+            minima[:, rows] = np.minimum(minima[:, rows], np.minimum.reduceat(out, bounds, axis=1))
+        return np.ascontiguousarray(minima.T, dtype=np.uint32)
+
+    def signature(self, text):
+        return self.signatures([text])[0]
+
+
+def estimate_jaccard(a, b):
+    """Jaccard estimates of signature pairs (rows of a against rows of b, or one against many)"""
+    return (np.asarray(a) == np.asarray(b)).mean(axis=-1)
+
+
+class NearDuplicateIndex:
+    """
+    MinHash-LSH index of reviews for near-duplicate (templated, copy-pasted) text.
+
+    Signatures are cut into bands of rows (lsh_params(threshold)); reviews that
+    agree on every row of any band share a bucket in that band's table. Only
+    bucket mates are compared, so a lookup or a full clustering costs about
+    O(n * bands) instead of the n^2 / 2 pairs a direct comparison needs.
+    Candidates are confirmed with their signature Jaccard estimate. Reviews can
+    be added at any time; the tables are updated in place.
+    """
+
+    # Buckets up to this size are verified pairwise, larger ones against their first member
+    max_pairwise_bucket = 32
+
+    def __init__(self, threshold=0.6, num_perm=128, k=5, seed=1):
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm=num_perm, k=k, seed=seed)
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        self._band_mult = np.random.default_rng(seed + 1).integers(
+            0, 2 ** 64, size=self.rows, dtype=np.uint64) | np.uint64(1)
+        self._tables = [{} for _ in range(self.bands)]
+        self.ids = []
+        self.meta = []
+        self.last_id = 0
+        self._blocks = []
+        self._signatures = np.zeros((0, num_perm), dtype=np.uint32)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _band_keys(self, signatures):
+        # One uint64 per (review, band); equal bands give equal keys
+        banded = signatures[:, :self.bands * self.rows].reshape(len(signatures), self.bands, self.rows)
+        return (banded.astype(np.uint64) * self._band_mult).sum(axis=2)
+
+    @property
+    def signatures(self):
+        if self._blocks:
+            self._signatures = np.vstack([self._signatures] + self._blocks)
+            self._blocks = []
+        return self._signatures
+
+    def add_many(self, ids, texts, metas=None):
+        """
+        Index texts under ids (e.g. Review ids); texts with no words are skipped, and so
+        are integer ids up to last_id, which are already indexed. Returns the rows added.
+        """
+        texts = list(texts)
+        signatures = self.hasher.signatures(texts)
+        keep = np.flatnonzero(signatures[:, 0] != np.iinfo(np.uint32).max) if len(texts) else np.zeros(0, dtype=np.int64)
+        keys = self._band_keys(signatures[keep])
+        metas = list(metas) if metas is not None else [{} for _ in texts]
+        with self._lock:
+            # A review indexed twice would be reported as its own near-duplicate
+            fresh = [n for n, j in enumerate(keep.tolist())
+                     if not (self.ids and isinstance(ids[j], int) and ids[j] <= self.last_id)]
+            first = len(self.ids)
+            for n in fresh:
+                self.ids.append(ids[keep[n]])
+                self.meta.append(dict(metas[keep[n]], text=texts[keep[n]]))
+            rows = list(range(first, first + len(fresh)))
+            for band, table in enumerate(self._tables):
+                for row, key in zip(rows, keys[fresh, band].tolist()):
+                    table.setdefault(key, []).append(row)
+            self._blocks.append(signatures[keep[fresh]])
+            if len(ids):
+                self.last_id = max([self.last_id] + [i for i in ids if isinstance(i, int)])
+        return len(fresh)
+
+    def add(self, review_id, text, meta=None):
+        return self.add_many([review_id], [text], [meta or {}])
+
+    def query(self, text, threshold=None, exclude=()):
+        """Indexed reviews near-duplicating text as (row, jaccard) pairs, most similar first"""
+        threshold = self.threshold if threshold is None else threshold
+        signature = self.hasher.signature(text)
+        if signature[0] == np.iinfo(np.uint32).max:
+            return []
+        keys = self._band_keys(signature[None, :])[0].tolist()
+        with self._lock:
+            candidates = set()
+            for table, key in zip(self._tables, keys):
+                candidates.update(table.get(key, ()))
+            excluded = set(exclude)
+            rows = np.array(sorted(r for r in candidates if self.ids[r] not in excluded), dtype=np.int64)
+            if not len(rows):
+                return []
+            jaccard = estimate_jaccard(self.signatures[rows], signature)
+        order = np.argsort(-jaccard, kind='stable')
+        return [(int(rows[j]), float(jaccard[j])) for j in order if jaccard[j] >= threshold]
+
+    def _candidate_pairs(self):
+        """Unique (i, j) row pairs, i < j, that share a bucket in some band"""
+        pairs, triu = [], {}
+        for table in self._tables:
+            for bucket in table.values():
+                if len(bucket) < 2:
+                    continue
+                members = np.asarray(bucket, dtype=np.int64)
+                if len(members) <= self.max_pairwise_bucket:
+                    if len(members) not in triu:
+                        triu[len(members)] = np.triu_indices(len(members), 1)
+                    i, j = triu[len(members)]
+                    pairs.append(members[i] * len(self.ids) + members[j])
+                else:
+                    pairs.append(members[0] * len(self.ids) + members[1:])
+        if not pairs:
+            return np.zeros((0, 2), dtype=np.int64)
+        # The same pair usually collides in several bands
+        keys = np.unique(np.concatenate(pairs))
+        return np.stack([keys // len(self.ids), keys % len(self.ids)], axis=1)
+
+    def clusters(self, threshold=None, min_size=2):
+        """
+        Groups of near-duplicates, largest first: connected components of the
+        confirmed candidate pairs. Each is a dict with rows (the first is the
+        representative), per-row jaccard against the representative, and the
+        mean and minimum Jaccard estimate over the confirmed pairs.
+        """
+        from scipy import sparse
+        from scipy.sparse.csgraph import connected_components
+        threshold = self.threshold if threshold is None else threshold
+        with self._lock:
+            signatures = self.signatures
+            pairs = self._candidate_pairs()
+            n = len(self.ids)
+        # 1. Confirm candidates with their Jaccard estimate
+        jaccard = np.zeros(len(pairs))
+        for start in range(0, len(pairs), HASH_CHUNK):
+            chunk = pairs[start:start + HASH_CHUNK]
+            jaccard[start:start + HASH_CHUNK] = estimate_jaccard(signatures[chunk[:, 0]], signatures[chunk[:, 1]])
+        confirmed = jaccard >= threshold
+        pairs, jaccard = pairs[confirmed], jaccard[confirmed]
+        if not len(pairs):
+            return []
+
+        # 2. Connected components of the confirmed pairs
+        graph = sparse.csr_matrix((np.ones(len(pairs), dtype=np.int8), (pairs[:, 0], pairs[:, 1])), shape=(n, n))
+        _, labels = connected_components(graph, directed=False)
+        sizes = np.bincount(labels)
+        edge_labels = labels[pairs[:, 0]]
+        mean = np.bincount(edge_labels, weights=jaccard, minlength=len(sizes)) / np.maximum(np.bincount(edge_labels, minlength=len(sizes)), 1)
+        low = np.ones(len(sizes))
+        np.minimum.at(low, edge_labels, jaccard)
+
+        # 3. Members of each component, grouped in one sort
+        order = np.argsort(labels, kind='stable')
+        bounds = np.concatenate([[0], np.cumsum(sizes)])
+        groups = []
+        for label in np.flatnonzero(sizes >= max(min_size, 2)):
+            rows = order[bounds[label]:bounds[label + 1]]
+            groups.append({
+                'rows': rows.tolist(),
+                'jaccard': estimate_jaccard(signatures[rows], signatures[rows[0]]).round(3).tolist(),
+                'mean_jaccard': round(float(mean[label]), 3),
+                'min_jaccard': round(float(low[label]), 3)
+            })
+        return sorted(groups, key=lambda g: len(g['rows']), reverse=True)
+
+    def stats(self):
+        return {'size': len(self.ids), 'last_id': self.last_id, 'threshold': self.threshold,
+                'num_perm': self.hasher.num_perm, 'shingle_bytes': self.hasher.k,
+                'bands': self.bands, 'rows_per_band': self.rows}
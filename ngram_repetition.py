@@ -0,0 +1,113 @@
+from collections import Counter
+import numpy as np
+
+# Repeated phrases are looked for among word n-grams of 2..MAX_N words; a span repeated at
+# MAX_N words is extended (binary search on its length) to the longest repeated span
+MAX_N = 6
+# Coverage: share of words that repeat an earlier n-gram of this length
+COVERAGE_N = 3
+# Reviews shorter than this are never scored for repetition (as with repeated words)
+MIN_WORDS = 10
+# Odd 64-bit multiplier of the polynomial rolling hash (arithmetic wraps mod 2^64)
+BASE = np.uint64(0x9E3779B97F4A7C15)
+_MASK = (1 << 64) - 1
+
+
+def _window_hashes(prefix, powers, m):
+    # Hash of ids[i:i + m] for every i, from prefix hashes: prefix[i + m] - prefix[i] * BASE^m
+    return prefix[m:] - prefix[:len(prefix) - m] * powers[m]
+
+
+def longest_repeat(ids):
+    """
+    (length, start) of the longest word span (ids: integer word ids) that occurs at least twice
+    in one review (occurrences may overlap), by binary search on the length over rolling hashes:
+    O(n log n) time and O(n) memory.
+    """
+    base = int(BASE)
+    prefix, powers = [0], [1]
+    for word_id in ids:
+        prefix.append((prefix[-1] * base + word_id) & _MASK)
+        powers.append((powers[-1] * base) & _MASK)
+    prefix, powers = np.array(prefix, dtype=np.uint64), np.array(powers, dtype=np.uint64)
+
+    def first_repeat(m):
+        hashes = _window_hashes(prefix, powers, m)
+        _, inverse, counts = np.unique(hashes, return_inverse=True, return_counts=True)
+        dup = np.flatnonzero(counts[inverse.reshape(-1)] > 1)
+        return int(dup[0]) if len(dup) else None
+
+    lo, hi, start = 0, len(ids) - 1, None
+    while lo < hi:
+        m = (lo + hi + 1) // 2
+        found = first_repeat(m)
+        if found is None:
+            hi = m - 1
+        else:
+            lo, start = m, found
+    return lo, start
+
+
+def phrase_score(coverage, n_words):
+    """0-100: twice the percentage of words that repeat an earlier COVERAGE_N-word phrase"""
+    if n_words < MIN_WORDS:
+        return 0
+    return min(int(round(200 * coverage)), 100)
+
+
+def analyze_repetition(words):
+    """
+    Repeated phrases of one review (its lowercase words):
+    repeated_ngrams (distinct n-grams seen twice or more, for n = 2..MAX_N),
+    longest_span and longest_phrase (the longest repeated run of words),
+    coverage (share of words repeating an earlier COVERAGE_N-gram) and phrase_score.
+
+    An n-gram can only repeat if the (n-1)-gram it extends repeats, so each pass
+    extends the rolling hashes of the previous pass's repeated windows only: a
+    review without repeated words costs one Counter, and no pass is longer than
+    the review.
+    """
+    # Word ids are the words' own hashes (only equality within one review matters)
+    ids = list(map(hash, words))
+    counts = Counter(ids)
+    repeated = {n: 0 for n in range(2, MAX_N + 1)}
+    # Start positions (ascending) of the repeated windows of the current length, with their hashes
+    positions = [i for i, word_id in enumerate(ids) if counts[word_id] > 1]
+    hashes = [ids[i] for i in positions]
+    longest = 1 if positions else 0
+    covered = set()
+    base = int(BASE)
+    for n in range(2, MAX_N + 1):
+        last = len(ids) - n
+        window = [(i, (h * base + ids[i + n - 1]) & _MASK) for i, h in zip(positions, hashes) if i <= last]
+        counts = Counter(h for _, h in window)
+        repeated[n] = sum(1 for c in counts.values() if c > 1)
+        if not repeated[n]:
+            break
+        window = [(i, h) for i, h in window if counts[h] > 1]
+        positions, hashes = [i for i, _ in window], [h for _, h in window]
+        longest = n
+        if n == COVERAGE_N:
+            seen = set()
+            for i, h in window:
+                if h in seen:
+                    covered.update(range(i, i + n))
+                seen.add(h)
+    start = positions[0] if longest else None
+    if longest == MAX_N:
+        # Long repeated runs are rare (copy-paste, generation loops): only then is the full search run
+        longest, start = longest_repeat(ids)
+    coverage = len(covered) / len(words) if words else 0.0
+    return {
+        'repeated_ngrams': repeated,
+        'longest_span': longest,
+        'longest_phrase': ' '.join(words[start:start + longest]) if longest else '',
+        'coverage': round(coverage, 3),
+        'phrase_score': phrase_score(coverage, len(words))
+    }
+
+
+def repetition_batch(word_lists):
+    """longest_span, coverage and phrase_score arrays of analyze_repetition() run on each review in turn"""
+    results = [analyze_repetition(words) for words in word_lists]
+    return {key: np.array([r[key] for r in results]) for key in ['longest_span', 'coverage', 'phrase_score']}
@@ -0,0 +1,99 @@
+import re
+import time
+from functools import cached_property
+from nltk_resources import ensure_resources
+
+WORD_RE = re.compile(r'\w+')
+_word_tokenizer = None
+_pos_tagger = None
+
+
+def _stage(fn):
+    """cached_property that also records how long the stage took in doc.timings"""
+    def compute(self):
+        start = time.perf_counter()
+        value = fn(self)
+        self.timings[fn.__name__] = time.perf_counter() - start
+        return value
+    compute.__name__ = fn.__name__
+    compute.__doc__ = fn.__doc__
+    return cached_property(compute)
+
+
+def _get_word_tokenizer():
+    # The tokenizer nltk.word_tokenize() applies to each sentence
+    global _word_tokenizer
+    if _word_tokenizer is None:
+        from nltk.tokenize import NLTKWordTokenizer
+        _word_tokenizer = NLTKWordTokenizer()
+    return _word_tokenizer
+
+
+def _get_pos_tagger():
+    # nltk.pos_tag() builds a new PerceptronTagger (reloading its weights) on every call; keep one
+    global _pos_tagger
+    if _pos_tagger is None:
+        ensure_resources()
+        from nltk.tag import PerceptronTagger
+        _pos_tagger = PerceptronTagger()
+    return _pos_tagger
+
+
+def pos_tag_sents(token_lists):
+    """nltk.pos_tag_sents() with the shared tagger: the same tags as nltk.pos_tag() on each list"""
+    tagger = _get_pos_tagger()
+    return [tagger.tag(tokens) for tokens in token_lists]
+
+
+class AnalyzedDocument:
+    """
+    One review, analyzed at most once per stage.
+
+    The model response, LieDetector and AuthorDNA all read from the same
+    document, so the lexicon sentiment, sentence split, word tokenization
+    and POS tagging each run once per text however many consumers need them.
+    Stages are computed on first access; timings records the cost of each.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.timings = {}
+
+    @_stage
+    def lower(self):
+        return self.text.lower()
+
+    @_stage
+    def words(self):
+        """Lowercased \\w+ runs (LieDetector's notion of a word)"""
+        return WORD_RE.findall(self.lower)
+
+    @_stage
+    def sentiment(self):
+        """Sentiment(polarity, subjectivity), as TextBlob scores it (sentiment_engine)"""
+        from sentiment_engine import sentiment
+        return sentiment(self.text)
+
+    @property
+    def polarity(self):
+        return self.sentiment.polarity
+
+    @property
+    def subjectivity(self):
+        return self.sentiment.subjectivity
+
+    @_stage
+    def sentences(self):
+        ensure_resources()
+        import nltk
+        return nltk.sent_tokenize(self.text)
+
+    @_stage
+    def tokens(self):
+        """Same tokens as nltk.word_tokenize(), reusing the sentence split"""
+        tokenizer = _get_word_tokenizer()
+        return [token for sentence in self.sentences for token in tokenizer.tokenize(sentence)]
+
+    @_stage
+    def pos_tags(self):
+        return _get_pos_tagger().tag(self.tokens)
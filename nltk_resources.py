@@ -0,0 +1,83 @@
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Offline bundle shipped with the repo/image; build it with: python nltk_resources.py
+BUNDLE_PATH = os.environ.get('NLTK_BUNDLE_PATH', os.path.join(BASE_DIR, 'nltk_data'))
+# Writable fallback for resources fetched at runtime (the only writable disk on Vercel)
+NLTK_DATA_PATH = '/tmp/nltk_data'
+# Set NLTK_OFFLINE=1 (e.g. air-gapped staging) to never download, even when a resource is missing
+OFFLINE = os.environ.get('NLTK_OFFLINE', '0') in ['1', 'true', 'True']
+
+# (nltk.data.find path, download id) for everything LieDetector/AuthorDNA use
+RESOURCES = [
+    ('corpora/stopwords', 'stopwords'),
+    ('tokenizers/punkt', 'punkt'),
+    ('tokenizers/punkt_tab', 'punkt_tab'),
+    ('taggers/averaged_perceptron_tagger_eng', 'averaged_perceptron_tagger_eng')
+]
+
+_checked = set()
+
+
+def configure_paths():
+    """
+    Put the bundle first on NLTK's search path without importing nltk (which drags in
+    scipy/sklearn): nltk reads NLTK_DATA when it is first imported.
+    """
+    paths = [BUNDLE_PATH, NLTK_DATA_PATH]
+    existing = [p for p in os.environ.get('NLTK_DATA', '').split(os.pathsep) if p and p not in paths]
+    os.environ['NLTK_DATA'] = os.pathsep.join(paths + existing)
+    if 'nltk' in sys.modules:
+        search_path = sys.modules['nltk'].data.path
+        search_path[:] = paths + [p for p in search_path if p not in paths]
+
+configure_paths()
+
+
+def missing_resources(resources=RESOURCES):
+    """Download ids of resources not found on the local search path"""
+    import nltk
+    missing = []
+    for find_path, pkg in resources:
+        try:
+            nltk.data.find(find_path)
+        except LookupError:
+            missing.append(pkg)
+    return missing
+
+
+def ensure_resources(resources=RESOURCES):
+    """
+    Called on first use by the analyzers, never at import. Resources missing from
+    the bundle are downloaded to /tmp unless NLTK_OFFLINE is set, in which case
+    the caller gets nltk's usual LookupError when it actually needs them.
+    """
+    pending = [r for r in resources if r not in _checked]
+    if not pending:
+        return
+    missing = missing_resources(pending)
+    if missing and not OFFLINE:
+        import nltk
+        print(f"NLTK resources {missing} not bundled, downloading to {NLTK_DATA_PATH}")
+        os.makedirs(NLTK_DATA_PATH, exist_ok=True)
+        for pkg in missing:
+            nltk.download(pkg, download_dir=NLTK_DATA_PATH, quiet=True)
+    elif missing:
+        print(f"NLTK resources {missing} not bundled and NLTK_OFFLINE is set")
+    _checked.update(pending)
+
+
+def build_bundle(target=BUNDLE_PATH):
+    """Build-time step: download every resource into target (the repo/image bundle)"""
+    import nltk
+    os.makedirs(target, exist_ok=True)
+    for _, pkg in RESOURCES:
+        if not nltk.download(pkg, download_dir=target, quiet=True):
+            raise RuntimeError(f"Could not download NLTK resource {pkg}")
+    return target
+
+
+if __name__ == "__main__":
+    target = build_bundle(sys.argv[1] if len(sys.argv) > 1 else BUNDLE_PATH)
+    print(f"NLTK bundle ready in {target}: {[pkg for _, pkg in RESOURCES]}")
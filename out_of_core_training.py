@@ -0,0 +1,309 @@
+import os
+import sys
+import time
+import random
+import threading
+import numpy as np
+from incremental_training import online_classifiers
+from parallel_training import score_classifier
+
+# Rough per-entry sizes used to turn a memory budget into chunk / vocabulary / holdout sizes
+TERM_BYTES = 150       # one term -> document count entry of a Python dict
+NNZ_BYTES = 64         # one non-zero across the count, TF-IDF and shuffled copies of a chunk
+ROW_OVERHEAD = 100     # pandas/Python object overhead of one text
+
+
+def peak_rss_mb():
+    """Lifetime peak resident memory of this process in MB (None where the resource module is missing)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def current_rss_mb():
+    """Resident memory of this process right now in MB (None without /proc)"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class MemoryWatch:
+    """
+    Peak memory of one training run, as opposed to peak_rss_mb(), which in a
+    long-lived web worker is dominated by whatever ran before. A thread samples
+    the resident size every `interval` seconds and the peak is reported above
+    the size at the start ('rss_delta'): the memory the process had to grow by.
+    Freed memory the allocator hands out again does not count, and spikes shorter
+    than the interval can be missed (a chunk being vectorized lasts far longer).
+    tracemalloc would count every allocation but slows training about 4x, so it
+    is only the fallback: without /proc, tracemalloc's peak of
+    the Python and NumPy allocations made meanwhile is used instead.
+    """
+
+    def __init__(self, interval=0.02):
+        self.interval = interval
+        self.method = None
+        self.start_mb = None
+        self.peak_mb = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start_mb = current_rss_mb()
+        if self.start_mb is None:
+            import tracemalloc
+            self.method = 'tracemalloc'
+            self._started_tracing = not tracemalloc.is_tracing()
+            if self._started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self._traced_start = tracemalloc.get_traced_memory()[0]
+        else:
+            self.method = 'rss_delta'
+            self.peak_mb = self.start_mb
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, current_rss_mb() or 0)
+
+    def __exit__(self, *exc):
+        if self.method == 'tracemalloc':
+            import tracemalloc
+            self.peak_mb = (tracemalloc.get_traced_memory()[1] - self._traced_start) / (1024 * 1024)
+            self.start_mb = 0.0
+            if self._started_tracing:
+                tracemalloc.stop()
+        else:
+            self._stop.set()
+            self._thread.join()
+            self.peak_mb = max(self.peak_mb, current_rss_mb() or 0)
+        return False
+
+    @property
+    def run_peak_mb(self):
+        return round(max(0.0, self.peak_mb - self.start_mb), 1)
+
+
+class BoundedCounter:
+    """
+    Document frequencies of at most 2 * capacity terms. When full, only the
+    capacity most frequent terms are kept (lossy counting): a dropped term that
+    comes back restarts from zero, so any count is low by at most `floor`, the
+    largest count ever dropped. Frequent terms - the ones a vocabulary keeps -
+    stay exact in practice.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}
+        self.floor = 0
+        self.peak_terms = 0
+
+    def __len__(self):
+        return len(self.counts)
+
+    def update(self, terms, counts):
+        get = self.counts.get
+        for term, count in zip(terms, counts.tolist()):
+            self.counts[term] = get(term, 0) + count
+        self.peak_terms = max(self.peak_terms, len(self.counts))
+        if len(self.counts) > 2 * self.capacity:
+            self._prune(self.capacity)
+
+    def _prune(self, keep):
+        terms = list(self.counts)
+        values = np.fromiter(self.counts.values(), dtype=np.int64, count=len(terms))
+        kept = np.argpartition(-values, keep - 1)[:keep]
+        dropped = np.ones(len(terms), dtype=bool)
+        dropped[kept] = False
+        self.floor = max(self.floor, int(values[dropped].max()))
+        self.counts = {terms[i]: int(values[i]) for i in kept}
+
+    def most_common(self, n):
+        return sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))[:n]
+
+
+def plan_memory(path, text_col, label_col, memory_mb):
+    """
+    Chunk rows, vocabulary capacity and holdout sample size that keep training
+    near memory_mb: 40% for the chunk being vectorized, 40% for the document
+    frequency counter and 20% for the holdout texts, sized from the first rows.
+    """
+    import pandas as pd
+    probe = pd.read_csv(path, nrows=1000, usecols=[text_col, label_col])
+    chars = float(probe[text_col].dropna().astype(str).str.len().mean() or 0) if len(probe) else 0
+    budget = memory_mb * 1024 * 1024
+    row_bytes = 2 * (ROW_OVERHEAD + chars) + NNZ_BYTES * (chars / 5 + 1)
+    return {
+        'memory_budget_mb': memory_mb,
+        'chunk_rows': int(np.clip(0.4 * budget / row_bytes, 256, 100000)),
+        'vocab_capacity': int(max(1000, 0.4 * budget / (2 * TERM_BYTES))),
+        'max_holdout': int(np.clip(0.2 * budget / (ROW_OVERHEAD + chars), 200, 20000)),
+        'avg_chars': round(chars, 1)
+    }
+
+
+def iter_chunks(path, text_col, label_col, chunk_rows):
+    """(texts, labels) of the labelled rows of a CSV, chunk_rows at a time"""
+    import pandas as pd
+    for chunk in pd.read_csv(path, chunksize=chunk_rows, usecols=[text_col, label_col]):
+        chunk = chunk.dropna(subset=[text_col, label_col])
+        if len(chunk):
+            yield chunk[text_col].astype(str).tolist(), chunk[label_col].tolist()
+
+
+def holdout_mask(labels, seen, every):
+    """
+    Stratified streaming split: the every-th row of each class (counting across
+    chunks in `seen`) is held out, so each class contributes 1/every of its rows
+    and a row lands on the same side on every pass.
+    """
+    mask = np.zeros(len(labels), dtype=bool)
+    for i, label in enumerate(labels):
+        n = seen.get(label, 0)
+        mask[i] = n % every == every - 1
+        seen[label] = n + 1
+    return mask
+
+
+def train_out_of_core(path, text_col='text', label_col='label', memory_mb=512, epochs=2,
+                      test_size=0.2, max_features=None, seed=42):
+    """
+    Train /api/train's three model slots on a CSV without loading it:
+
+    1. One pass counts document frequencies of the training rows per chunk into
+       a BoundedCounter, collects the classes and keeps a stratified sample of
+       the held-out rows (reservoir per class, at most max_holdout texts).
+    2. A TfidfVectorizer is built from the most frequent terms and their idf,
+       exactly as fit() would compute it on the kept vocabulary.
+    3. `epochs` more passes partial_fit online_classifiers() chunk by chunk
+       (rows shuffled within each chunk); NaiveBayes only needs the first, as
+       more passes would just multiply its counts.
+
+    Returns ({name: Pipeline}, {name: metrics}, report) with the plan, row counts,
+    per-pass times and the run's peak memory (run_peak_mb, see MemoryWatch), with
+    within_budget False when it went over memory_mb.
+    """
+    # Loaded before measuring: the first run in a process would count the modules' memory otherwise
+    import pandas  # noqa: F401
+    import sklearn.feature_extraction.text  # noqa: F401
+    import sklearn.pipeline  # noqa: F401
+    online_classifiers()
+    with MemoryWatch() as memory:
+        pipelines, metrics, report = _train_out_of_core(path, text_col, label_col, memory_mb, epochs,
+                                                        test_size, max_features, seed)
+    report.update(run_peak_mb=memory.run_peak_mb, memory_method=memory.method,
+                  within_budget=memory.run_peak_mb <= memory_mb, process_peak_rss_mb=peak_rss_mb())
+    if not report['within_budget']:
+        print(f"Out-of-core training used {memory.run_peak_mb} MB, over its {memory_mb} MB budget")
+    return pipelines, metrics, report
+
+
+def _train_out_of_core(path, text_col, label_col, memory_mb, epochs, test_size, max_features, seed):
+    from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+    from sklearn.pipeline import Pipeline
+    plan = plan_memory(path, text_col, label_col, memory_mb)
+    every = max(2, int(round(1 / test_size)))
+    rng = random.Random(seed)
+    timings = {}
+
+    # 1. Document frequencies, classes and the holdout sample
+    start = time.perf_counter()
+    counter = BoundedCounter(plan['vocab_capacity'])
+    counting = CountVectorizer(binary=True)
+    seen, holdout, holdout_seen = {}, {}, {}
+    n_train = n_holdout = 0
+    per_class_holdout = max(1, plan['max_holdout'])
+    for texts, labels in iter_chunks(path, text_col, label_col, plan['chunk_rows']):
+        mask = holdout_mask(labels, seen, every)
+        train_texts = [t for t, held in zip(texts, mask) if not held]
+        n_train += len(train_texts)
+        if train_texts:
+            try:
+                X = counting.fit_transform(train_texts)
+                counter.update(counting.get_feature_names_out().tolist(), np.asarray(X.sum(axis=0)).ravel())
+            except ValueError:
+                pass  # chunk with no tokens at all
+        for i in np.flatnonzero(mask):
+            label = labels[i]
+            n_holdout += 1
+            sample = holdout.setdefault(label, [])
+            k = holdout_seen.get(label, 0)
+            holdout_seen[label] = k + 1
+            if len(sample) < per_class_holdout:
+                sample.append(texts[i])
+            else:
+                j = rng.randrange(k + 1)
+                if j < per_class_holdout:
+                    sample[j] = texts[i]
+        # Keep the sample within budget overall, not per class
+        per_class_holdout = max(1, plan['max_holdout'] // max(1, len(seen)))
+        for sample in holdout.values():
+            del sample[per_class_holdout:]
+    classes = sorted(seen, key=str)
+    if len(classes) < 2:
+        raise ValueError("Training needs examples of at least two classes")
+    if not counter.counts:
+        raise ValueError("No tokens found in the text column")
+    timings['count_s'] = round(time.perf_counter() - start, 3)
+
+    # 2. Vectorizer over the kept vocabulary, idf as TfidfVectorizer(smooth_idf=True) computes it
+    kept = counter.most_common(max_features or plan['vocab_capacity'])
+    terms = sorted(term for term, _ in kept)
+    df = np.array([counter.counts[term] for term in terms], dtype=np.float64)
+    vectorizer = TfidfVectorizer(vocabulary={term: i for i, term in enumerate(terms)})
+    vectorizer.idf_ = np.log((1 + n_train) / (1 + df)) + 1
+
+    # 3. Streaming partial_fit passes
+    models = online_classifiers()
+    y_classes = np.array(classes, dtype=object if isinstance(classes[0], str) else None)
+    shuffle = np.random.RandomState(seed)
+    largest_chunk = 0
+    for epoch in range(max(1, int(epochs))):
+        start = time.perf_counter()
+        seen = {}
+        for texts, labels in iter_chunks(path, text_col, label_col, plan['chunk_rows']):
+            train = np.flatnonzero(~holdout_mask(labels, seen, every))
+            if not len(train):
+                continue
+            train = train[shuffle.permutation(len(train))]
+            X = vectorizer.transform([texts[i] for i in train])
+            y = np.array([labels[i] for i in train], dtype=y_classes.dtype)
+            largest_chunk = max(largest_chunk, X.data.nbytes + X.indices.nbytes + X.indptr.nbytes)
+            for name, clf in models.items():
+                if epoch == 0 or name != 'NaiveBayes':
+                    clf.partial_fit(X, y, classes=y_classes)
+        timings[f'epoch_{epoch + 1}_s'] = round(time.perf_counter() - start, 3)
+
+    # 4. Metrics on the held-out sample, in /api/train's format
+    start = time.perf_counter()
+    holdout_texts = [text for label in classes for text in holdout.get(label, [])]
+    holdout_labels = np.array([label for label in classes for _ in holdout.get(label, [])], dtype=y_classes.dtype)
+    X_test = vectorizer.transform(holdout_texts)
+    metrics = {name: score_classifier(name, clf, X_test, holdout_labels) for name, clf in models.items()}
+    timings['metrics_s'] = round(time.perf_counter() - start, 3)
+
+    pipelines = {name: Pipeline([('tfidf', vectorizer), ('clf', clf)]) for name, clf in models.items()}
+    report = {
+        'plan': plan,
+        'train_rows': n_train,
+        'holdout_rows': n_holdout,
+        'holdout_scored': len(holdout_texts),
+        'classes': [str(c) for c in classes],
+        'vocabulary': len(terms),
+        'counter_peak_terms': counter.peak_terms,
+        'counter_error_bound': counter.floor,
+        'largest_chunk_mb': round(largest_chunk / (1024 * 1024), 2),
+        'timings': timings
+    }
+    return pipelines, metrics, report
@@ -0,0 +1,144 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+# (X_train_vec, y_train, X_test_vec, y_test) of the training run a pool worker serves.
+# Set by the pool initializer: each worker unpickles it once, nothing is pickled per model.
+_SPLIT = None
+# Imported once by the fork server, so workers forked from it start without importing sklearn
+WORKER_PRELOAD = ['__main__', 'calibrated_linear', 'sklearn.calibration', 'sklearn.svm', 'sklearn.naive_bayes',
+                  'sklearn.linear_model', 'sklearn.metrics']
+
+
+def process_context():
+    """
+    Start method for worker processes. Pools are created from threaded processes
+    (web workers, training job workers with their heartbeat thread), and forking
+    one of those can copy a lock some other thread holds. forkserver forks workers
+    from a clean single-threaded server instead; spawn where it is missing.
+    """
+    import multiprocessing
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')
+    context = multiprocessing.get_context('forkserver')
+    # Only read when the server starts, the first time a pool is created
+    context.set_forkserver_preload(WORKER_PRELOAD)
+    return context
+
+
+def _load_split(split):
+    global _SPLIT
+    _SPLIT = split
+
+
+def worker_split():
+    """The split a make_pool() worker was started with"""
+    return _SPLIT
+
+
+def score_classifier(model_name, clf, X_test_vec, y_test):
+    """Holdout metrics of a fitted classifier, as reported by /api/train"""
+    from sklearn.metrics import accuracy_score, precision_score, recall_score, confusion_matrix
+    y_pred = clf.predict(X_test_vec)
+    if model_name == 'SVM':
+        precision = precision_score(y_test, y_pred, average='macro')
+        recall = recall_score(y_test, y_pred, average='macro')
+    else:
+        precision = precision_score(y_test, y_pred, pos_label='Fake', average='macro')
+        recall = recall_score(y_test, y_pred, pos_label='Fake', average='macro')
+    return {
+        'accuracy': accuracy_score(y_test, y_pred),
+        'precision': precision,
+        'recall': recall,
+        'cm': confusion_matrix(y_test, y_pred).tolist()
+    }
+
+
+def fit_and_score(model_name, clf, collapse_svm=False, split=None):
+    """
+    Fit one classifier on the vectorized training split and compute its test metrics.
+    Runs inside a pool worker (split=None reads the worker's shared split).
+    Returns (model_name, fitted classifier, metrics, timings).
+    """
+    from calibrated_linear import collapse_calibrated_classifier, probability_drift
+    X_train_vec, y_train, X_test_vec, y_test = split if split is not None else _SPLIT
+
+    start = time.perf_counter()
+    clf.fit(X_train_vec, y_train)
+    drift = None
+    if model_name == 'SVM' and collapse_svm:
+        # Fold the per-fold LinearSVCs + calibrators into one linear model and one sigmoid
+        try:
+            collapsed = collapse_calibrated_classifier(clf, X_train_vec)
+            drift = probability_drift(clf, collapsed, X_test_vec)
+            clf = collapsed
+        except ValueError as collapse_err:
+            print(f"SVM collapse skipped: {collapse_err}")
+    fit_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    metrics = score_classifier(model_name, clf, X_test_vec, y_test)
+    if drift:
+        metrics['calibration_drift'] = drift
+    timings = {'fit_s': round(fit_s, 3), 'metrics_s': round(time.perf_counter() - start, 3), 'pid': os.getpid()}
+    return model_name, clf, metrics, timings
+
+
+def make_pool(workers, split):
+    """A process pool (see process_context()) with the split preloaded, or a thread pool where processes are unavailable"""
+    try:
+        return ProcessPoolExecutor(workers, mp_context=process_context(), initializer=_load_split, initargs=(split,)), 'process'
+    except (ValueError, OSError, NotImplementedError) as e:
+        # No POSIX semaphores on some serverless runtimes
+        print(f"Process pool unavailable ({e}), training in threads")
+        return ThreadPoolExecutor(workers), 'thread'
+
+
+def train_parallel(classifiers, split, workers=1, collapse_svm=False, on_done=None):
+    """
+    Fit and score (model_name, classifier) pairs on one vectorized split, up to
+    workers at a time. Returns ({name: fitted classifier}, {name: metrics}, timings);
+    timings has the wall clock, each model's fit/metrics time and the executor used.
+    on_done(model_name, metrics, timings) is called as each model finishes.
+    """
+    workers = max(1, min(int(workers), len(classifiers)))
+    start = time.perf_counter()
+    results = None
+    executor = 'sequential'
+    if workers > 1:
+        pool, executor = make_pool(workers, split)
+        try:
+            with pool:
+                shared = None if executor == 'process' else split
+                futures = [pool.submit(fit_and_score, name, clf, collapse_svm, shared) for name, clf in classifiers]
+                finished = {}
+                for future in as_completed(futures):
+                    result = future.result()
+                    finished[result[0]] = result
+                    if on_done:
+                        on_done(result[0], result[2], result[3])
+                results = [finished[name] for name, _ in classifiers]
+        except BrokenProcessPool as e:
+            print(f"Training pool failed ({e}), training sequentially")
+            executor = 'sequential'
+    if results is None:
+        results = []
+        for name, clf in classifiers:
+            results.append(fit_and_score(name, clf, collapse_svm, split))
+            if on_done:
+                on_done(name, results[-1][2], results[-1][3])
+
+    fitted, metrics, model_timings = {}, {}, {}
+    for model_name, clf, model_metrics, timings in results:
+        fitted[model_name] = clf
+        metrics[model_name] = model_metrics
+        model_timings[model_name] = timings
+    wall_clock = time.perf_counter() - start
+    return fitted, metrics, {
+        'executor': executor,
+        'workers': workers if executor != 'sequential' else 1,
+        'wall_clock_s': round(wall_clock, 3),
+        'sequential_s': round(sum(t['fit_s'] + t['metrics_s'] for t in model_timings.values()), 3),
+        'models': model_timings
+    }
@@ -0,0 +1,109 @@
+import re
+from collections import defaultdict
+
+WORD_RE = re.compile(r'\w+')
+
+
+def _split(phrase):
+    """Words of a phrase and the exact separators between them, e.g. '50% off' -> ['50', 'off'], ['% ']"""
+    spans = [(m.start(), m.end()) for m in WORD_RE.finditer(phrase)]
+    words = [phrase[s:e] for s, e in spans]
+    separators = [phrase[spans[i][1]:spans[i + 1][0]] for i in range(len(spans) - 1)]
+    return words, separators
+
+
+class PhraseMatcher:
+    """
+    All phrase families matched in one left-to-right scan of the text.
+
+    Phrases are compiled into a word-level trie: each edge is a word, plus the
+    exact separator text that must precede it. A scan tokenizes the text once
+    with \\w+ and walks the trie from every word, so the cost grows with the
+    text and the longest phrase, not with the number of phrases. A hit means
+    the same thing as re.search(r'\\b' + re.escape(phrase) + r'\\b'): the phrase
+    starts and ends on word boundaries and its separators match exactly.
+    """
+
+    def __init__(self, families=None):
+        self._root = {}
+        self.families = set()
+        self.n_phrases = 0
+        for family, phrases in (families or {}).items():
+            self.add(family, phrases)
+
+    def add(self, family, phrases):
+        self.families.add(family)
+        for phrase in phrases:
+            phrase = phrase.strip().lower()
+            words, separators = _split(phrase)
+            if not words:
+                continue
+            node = self._root.setdefault(words[0], {})
+            for separator, word in zip(separators, words[1:]):
+                node = node.setdefault((separator, word), {})
+            # None holds the (family, phrase) pairs that end at this node
+            terminals = node.setdefault(None, set())
+            if (family, phrase) not in terminals:
+                terminals.add((family, phrase))
+                self.n_phrases += 1
+        return self
+
+    @classmethod
+    def from_file(cls, path, matcher=None):
+        """
+        Load phrases from a plain-text lexicon: '[family]' starts a section, every
+        other non-empty line is one phrase of the current family, '#' starts a comment.
+        """
+        matcher = matcher or cls()
+        family = None
+        phrases = defaultdict(list)
+        with open(path, encoding='utf-8') as f:
+            for number, line in enumerate(f, 1):
+                line = line.split('#', 1)[0].strip()
+                if not line:
+                    continue
+                if line.startswith('[') and line.endswith(']'):
+                    family = line[1:-1].strip()
+                elif family is None:
+                    raise ValueError(f"{path}:{number}: phrase before any [family] header")
+                else:
+                    phrases[family].append(line)
+        for family, items in phrases.items():
+            matcher.add(family, items)
+        return matcher
+
+    def entries(self):
+        """(family, phrase, words) for every phrase in the trie"""
+        stack = [(node, [word]) for word, node in self._root.items()]
+        while stack:
+            node, words = stack.pop()
+            for key, child in node.items():
+                if key is None:
+                    for family, phrase in child:
+                        yield family, phrase, words
+                else:
+                    stack.append((child, words + [key[1]]))
+
+    def scan(self, text):
+        """
+        Every hit in text (expected lowercase) as {family: {'count', 'phrases', 'spans'}}:
+        count is the number of occurrences, phrases the distinct phrases found and
+        spans (start, end, phrase) tuples in text order.
+        """
+        results = {family: {'count': 0, 'phrases': set(), 'spans': []} for family in self.families}
+        tokens = [(m.start(), m.end(), m.group()) for m in WORD_RE.finditer(text)]
+        root = self._root
+        for i, (start, end, word) in enumerate(tokens):
+            node = root.get(word)
+            j = i
+            while node is not None:
+                for family, phrase in node.get(None, ()):
+                    hit = results[family]
+                    hit['count'] += 1
+                    hit['phrases'].add(phrase)
+                    hit['spans'].append((start, tokens[j][1], phrase))
+                j += 1
+                if j == len(tokens):
+                    break
+                node = node.get((text[tokens[j - 1][1]:tokens[j][0]], tokens[j][2]))
+        return results
@@ -0,0 +1,157 @@
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_text(text):
+    """Canonical form used for cache keys (Unicode NFC, otherwise byte-identical)"""
+    return unicodedata.normalize('NFC', str(text))
+
+
+def make_key(text, model_name, model_version, kind='predict'):
+    """Content address of one prediction: hash of the text plus model name and version"""
+    raw = '\x00'.join([kind, str(model_name), str(model_version), normalize_text(text)])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class PredictionCache:
+    """
+    Per-process LRU cache of prediction payloads with TTL expiry.
+
+    Bounded both by entry count and by the total size of the stored (JSON)
+    payloads. Values are stored serialized, so every hit returns a fresh copy
+    that callers may mutate. If shared_db_path is set, entries are also written
+    to a SQLite table that all gunicorn workers on the host read on a local miss.
+    """
+
+    def __init__(self, max_entries=5000, max_bytes=64 * 1024 * 1024, ttl=3600, shared_db_path=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.shared_db_path = shared_db_path
+        self._entries = OrderedDict()  # key -> (expires_at, payload)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if shared_db_path:
+            self._init_shared()
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, payload = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return json.loads(payload)
+                self._drop(key)
+
+        # Local miss: try the shared tier before giving up
+        shared = self._shared_get(key, now) if self.shared_db_path else None
+        with self._lock:
+            if shared is None:
+                self.misses += 1
+                return None
+            self.shared_hits += 1
+            self._store(key, shared[1], shared[0])
+        return json.loads(shared[1])
+
+    def set(self, key, value):
+        if not self.enabled:
+            return
+        payload = json.dumps(value)
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._store(key, payload, expires_at)
+        if self.shared_db_path:
+            self._shared_set(key, payload, expires_at)
+
+    def clear(self):
+        """Drop every local entry (called whenever the active models are replaced)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round((self.hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+                'shared_tier': self.shared_db_path
+            }
+
+    # --- Local tier (callers hold self._lock) ---
+    def _store(self, key, payload, expires_at):
+        if key in self._entries:
+            self._drop(key)
+        if len(payload) > self.max_bytes:
+            return
+        self._entries[key] = (expires_at, payload)
+        self._bytes += len(payload)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _drop(self, key):
+        _, payload = self._entries.pop(key)
+        self._bytes -= len(payload)
+
+    # --- Shared SQLite tier ---
+    def _connect(self):
+        return sqlite3.connect(self.shared_db_path, timeout=5)
+
+    def _init_shared(self):
+        try:
+            with self._connect() as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("CREATE TABLE IF NOT EXISTS prediction_cache (key TEXT PRIMARY KEY, payload TEXT NOT NULL, expires_at REAL NOT NULL)")
+        except sqlite3.Error as e:
+            print(f"Shared prediction cache disabled: {e}")
+            self.shared_db_path = None
+
+    def _shared_get(self, key, now):
+        try:
+            with self._connect() as conn:
+                row = conn.execute("SELECT expires_at, payload FROM prediction_cache WHERE key = ? AND expires_at > ?", (key, now)).fetchone()
+            return row
+        except sqlite3.Error as e:
+            print(f"Shared prediction cache read failed: {e}")
+            return None
+
+    def _shared_set(self, key, payload, expires_at):
+        try:
+            with self._connect() as conn:
+                conn.execute("INSERT OR REPLACE INTO prediction_cache (key, payload, expires_at) VALUES (?, ?, ?)", (key, payload, expires_at))
+                self._writes += 1
+                # Expired rows are purged opportunistically rather than on every write
+                if self._writes % 256 == 0:
+                    conn.execute("DELETE FROM prediction_cache WHERE expires_at <= ?", (time.time(),))
+        except sqlite3.Error as e:
+            print(f"Shared prediction cache write failed: {e}")
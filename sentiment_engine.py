@@ -0,0 +1,285 @@
+import os
+import re
+import sys
+from collections import namedtuple
+
+# TextBlob's pattern sentiment lexicon, compiled to arrays (see build_lexicon)
+LEXICON_PATH = os.environ.get('SENTIMENT_LEXICON_PATH', os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'model', 'artifacts', 'sentiment_lexicon.npz'))
+# 'lexicon' (default) or 'textblob' to fall back to TextBlob(text).sentiment
+ENGINE = os.environ.get('SENTIMENT_ENGINE', 'lexicon')
+
+Sentiment = namedtuple('Sentiment', ['polarity', 'subjectivity'])
+
+# Tokenizer constants, as in textblob/_text.py (find_tokens)
+PUNCTUATION = ".,;:!?()[]{}`''\"@#$^&*+-|=~_"
+LEADING = tuple(PUNCTUATION.replace(".", ""))
+TRAILING = LEADING + (".",)
+ABBREVIATIONS = {
+    "a.", "adj.", "adv.", "al.", "a.m.", "c.", "cf.", "comp.", "conf.", "def.", "ed.", "e.g.",
+    "esp.", "etc.", "ex.", "f.", "fig.", "gen.", "id.", "i.e.", "int.", "l.", "m.", "Med.",
+    "Mil.", "Mr.", "n.", "n.q.", "orig.", "pl.", "pred.", "pres.", "p.m.", "ref.", "v.", "vs.", "w/"
+}
+RE_ABBR1 = re.compile(r"^[A-Za-z]\.$")
+RE_ABBR2 = re.compile(r"^([A-Za-z]\.)+$")
+RE_ABBR3 = re.compile("^[A-Z][" + "|".join("bcdfghjklmnpqrstvwxz") + "]+.$")
+REPLACEMENTS = [("'d", " 'd"), ("'m", " 'm"), ("'s", " 's"), ("'ll", " 'll"),
+                ("'re", " 're"), ("'ve", " 've"), ("n't", " n't")]
+QUOTES = [("“", " “ "), ("”", " ” "), ("‘", " ‘ "),
+          ("’", " ’ "), ("'", " ' "), ('"', ' " ')]
+EOS = "END-OF-SENTENCE"
+SENTENCE_END = ("...", ".", "!", "?", EOS)
+SENTENCE_TAIL = ("'", '"', "”", "’", "...", ".", "!", "?", ")", EOS)
+EMOTICONS = [
+    (+1.00, ("<3", "♥")),
+    (+1.00, (">:D", ":-D", ":D", "=-D", "=D", "X-D", "x-D", "XD", "xD", "8-D")),
+    (+0.75, (">:P", ":-P", ":P", ":-p", ":p", ":-b", ":b", ":c)", ":o)", ":^)")),
+    (+0.50, (">:)", ":-)", ":)", "=)", "=]", ":]", ":}", ":>", ":3", "8)", "8-)")),
+    (+0.25, (">;]", ";-)", ";)", ";-]", ";]", ";D", ";^)", "*-)", "*)")),
+    (+0.05, (">:o", ":-O", ":O", ":o", ":-o", "o_O", "o.O", "°O°", "°o°")),
+    (-0.25, (">:/", ":-/", ":/", ":\\", ">:\\", ":-.", ":-s", ":s", ":S", ":-S", ">.>")),
+    (-0.75, (">:[", ":-(", ":(", "=(", ":-[", ":[", ":{", ":-<", ":c", ":-c", "=/")),
+    (-1.00, (":'(", ":'''(", ";'(")),
+]
+RE_EMOTICONS = re.compile(r"(%s)($|\s)" % "|".join(
+    r" ?".join(re.escape(c) for c in e) for _, group in EMOTICONS for e in group))
+RE_SARCASM = re.compile(r"\( ?\! ?\)")
+NEGATIONS = ("no", "not", "n't", "never")
+
+_engine = None
+
+
+def _emoticon_polarity():
+    # An emoticon token scores with the first group that lists it (lowercased), as in TextBlob
+    table = {}
+    for polarity, group in EMOTICONS:
+        for e in group:
+            table.setdefault(e.lower(), polarity)
+    return table
+
+
+def build_lexicon(path=LEXICON_PATH):
+    """
+    Compile TextBlob's English sentiment lexicon (after its own load-time
+    adjustments, e.g. 'terribly' from 'terrible') into arrays at path.
+    Only needs TextBlob when the lexicon is (re)built.
+    """
+    import numpy as np
+    from importlib.metadata import version
+    from textblob.en import sentiment as pattern_sentiment
+
+    pattern_sentiment.load()
+    words = sorted(dict.keys(pattern_sentiment))
+    scores = [dict.__getitem__(pattern_sentiment, w)[None] for w in words]
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    np.savez_compressed(path,
+             words=np.array(words),
+             polarity=np.array([s[0] for s in scores], dtype=np.float64),
+             subjectivity=np.array([s[1] for s in scores], dtype=np.float64),
+             intensity=np.array([s[2] for s in scores], dtype=np.float64),
+             modifier=np.array(['RB' in dict.__getitem__(pattern_sentiment, w) for w in words]),
+             source=np.array(f"textblob {version('textblob')}"))
+    print(f"Sentiment lexicon: {len(words)} words -> {path}")
+    return path
+
+
+class LexiconSentiment:
+    """
+    TextBlob's PatternAnalyzer polarity and subjectivity without TextBlob.
+
+    The lexicon is read once from compact arrays (word list plus polarity,
+    subjectivity, intensity and an adverb/modifier flag). Scoring ports
+    pattern's tokenizer and assessment rules, including intensity modifiers
+    ("very good"), negation ("not good"), exclamation marks, sarcasm marks
+    and emoticons, so results match TextBlob to float precision. Splitting a
+    whitespace token into words is memoized, which is most of the speedup on
+    review text where the same words recur.
+    """
+
+    def __init__(self, words, polarity, subjectivity, intensity, modifier, cache_size=200000):
+        self.index = {w: i for i, w in enumerate(words)}
+        self.polarity = list(map(float, polarity))
+        self.subjectivity = list(map(float, subjectivity))
+        self.intensity = list(map(float, intensity))
+        self.modifier = list(map(bool, modifier))
+        self.emoticons = _emoticon_polarity()
+        self.cache_size = cache_size
+        self._token_cache = {}
+
+    @classmethod
+    def load(cls, path=LEXICON_PATH):
+        import numpy as np
+        if not os.path.exists(path):
+            build_lexicon(path)
+        data = np.load(path)
+        return cls(data['words'].tolist(), data['polarity'], data['subjectivity'],
+                   data['intensity'], data['modifier'])
+
+    def __len__(self):
+        return len(self.index)
+
+    def _split_token(self, raw):
+        """A whitespace-delimited token -> pattern's word tokens (contractions, quotes and punctuation split off)"""
+        pieces = self._token_cache.get(raw)
+        if pieces is not None:
+            return pieces
+        text = raw
+        for a, b in REPLACEMENTS:
+            text = text.replace(a, b)
+        for a, b in QUOTES:
+            text = text.replace(a, b)
+        pieces = []
+        replace_keys = [a for a, _ in REPLACEMENTS]
+        for t in text.split():
+            tail = []
+            while t.startswith(LEADING) and t not in replace_keys:
+                pieces.append(t[0])
+                t = t[1:]
+            while t.endswith(TRAILING) and t not in replace_keys:
+                if t.endswith(LEADING):
+                    tail.append(t[-1])
+                    t = t[:-1]
+                if t.endswith("..."):
+                    tail.append("...")
+                    t = t[:-3].rstrip(".")
+                if t.endswith("."):
+                    if t in ABBREVIATIONS or RE_ABBR1.match(t) or RE_ABBR2.match(t) or RE_ABBR3.match(t):
+                        break
+                    tail.append(t[-1])
+                    t = t[:-1]
+            if t != "":
+                pieces.append(t)
+            pieces.extend(reversed(tail))
+        if len(self._token_cache) >= self.cache_size:
+            self._token_cache.clear()
+        self._token_cache[raw] = pieces
+        return pieces
+
+    def tokenize(self, text):
+        """Lowercased words in the order TextBlob's sentiment sees them"""
+        text = re.sub(r"\n{2,}", " %s " % EOS, text.replace("\r\n", "\n"))
+        tokens = []
+        for raw in text.split():
+            tokens.extend(self._split_token(raw))
+
+        # Group into sentences (drops the paragraph markers); the sarcasm and
+        # emoticon rules are applied per sentence, as in pattern
+        sentences, i, j = [[]], 0, 0
+        while j < len(tokens):
+            if tokens[j] in SENTENCE_END:
+                while j < len(tokens) and tokens[j] in SENTENCE_TAIL:
+                    if tokens[j] in ("'", '"') and sentences[-1].count(tokens[j]) % 2 == 0:
+                        break
+                    j += 1
+                sentences[-1].extend(t for t in tokens[i:j] if t != EOS)
+                sentences.append([])
+                i = j
+            j += 1
+        sentences[-1].extend(tokens[i:j])
+
+        words = []
+        for sentence in sentences:
+            if not sentence:
+                continue
+            s = " ".join(sentence)
+            if "(" in s:
+                s = RE_SARCASM.sub("(!)", s)
+            s = RE_EMOTICONS.sub(lambda m: m.group(1).replace(" ", "") + m.group(2), s)
+            words.extend(w.lower() for w in s.split())
+        return words
+
+    def assessments(self, words):
+        """(polarity, subjectivity) of each scored chunk: a known word with its modifier / negation"""
+        index, P, S, I, modifier = self.index, self.polarity, self.subjectivity, self.intensity, self.modifier
+        a = []          # [p, s, i, negated]
+        m = None        # preceding modifier word
+        n = None        # preceding negation
+        for w in words:
+            k = index.get(w)
+            if k is not None:
+                p, s, i = P[k], S[k], I[k]
+                if m is None:
+                    a.append([p, s, i, False])
+                else:
+                    last = a[-1]
+                    last[0] = max(-1.0, min(p * last[2], +1.0))
+                    last[1] = max(-1.0, min(s * last[2], +1.0))
+                    last[2] = i
+                if n is not None:
+                    a[-1][2] = 1.0 / a[-1][2]
+                    a[-1][3] = True
+                m = w if modifier[k] else None
+                n = w if w in NEGATIONS else None
+            else:
+                if w in NEGATIONS:
+                    n = w
+                elif n and len(w.strip("'")) > 1:
+                    n = None
+                if n is not None and m is not None and m.endswith("ly"):
+                    a[-1][3] = True
+                    n = None
+                elif m and len(w) > 2:
+                    m = None
+                if w == "!" and a:
+                    a[-1][0] = max(-1.0, min(a[-1][0] * 1.25, +1.0))
+                if w == "(!)":
+                    a.append([0.0, 1.0, 1.0, False])
+                if w.isalpha() is False and len(w) <= 5 and w not in PUNCTUATION:
+                    p = self.emoticons.get(w)
+                    if p is not None:
+                        a.append([p, 1.0, 1.0, False])
+        # "not good" = slightly bad, "not bad" = slightly good
+        return [(p * -0.5 if negated else p, s) for p, s, _, negated in a]
+
+    def analyze(self, text):
+        """Sentiment(polarity, subjectivity) of one text, like TextBlob(text).sentiment"""
+        a = self.assessments(self.tokenize(str(text)))
+        polarity = subjectivity = 0
+        for p, s in a:
+            polarity += p
+            subjectivity += s
+        n = float(len(a) or 1)
+        return Sentiment(polarity / n, subjectivity / n)
+
+    def analyze_batch(self, texts):
+        """(polarity, subjectivity) arrays for many texts; repeated texts are scored once"""
+        import numpy as np
+        texts = [str(t) for t in texts]
+        scores = {}
+        for t in texts:
+            if t not in scores:
+                scores[t] = self.analyze(t)
+        polarity = np.fromiter((scores[t].polarity for t in texts), dtype=np.float64, count=len(texts))
+        subjectivity = np.fromiter((scores[t].subjectivity for t in texts), dtype=np.float64, count=len(texts))
+        return polarity, subjectivity
+
+
+def get_engine():
+    """The shared LexiconSentiment, loaded on first use"""
+    global _engine
+    if _engine is None:
+        _engine = LexiconSentiment.load()
+    return _engine
+
+
+def sentiment(text):
+    """Sentiment(polarity, subjectivity) for text with the configured engine"""
+    if ENGINE == 'textblob':
+        from textblob import TextBlob
+        return Sentiment(*TextBlob(text).sentiment)
+    return get_engine().analyze(text)
+
+
+def sentiment_batch(texts):
+    """(polarity, subjectivity) arrays for texts with the configured engine"""
+    if ENGINE == 'textblob':
+        import numpy as np
+        from textblob import TextBlob
+        scores = [TextBlob(str(t)).sentiment for t in texts]
+        return np.array([s.polarity for s in scores], dtype=np.float64), np.array([s.subjectivity for s in scores], dtype=np.float64)
+    return get_engine().analyze_batch(texts)
+
+
+if __name__ == "__main__":
+    # Rebuild the compiled lexicon from the installed TextBlob: python sentiment_engine.py [path]
+    build_lexicon(sys.argv[1] if len(sys.argv) > 1 else LEXICON_PATH)
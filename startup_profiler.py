@@ -0,0 +1,128 @@
+import os
+import sys
+import time
+import builtins
+from contextlib import contextmanager
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB (Linux /proc, else the peak from resource)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        return 0.0
+
+
+class StartupProfiler:
+    """
+    Records wall time and RSS growth of app startup.
+
+    Imports are attributed to the top-level package that was first imported
+    (cumulative: importing flask counts werkzeug and jinja2 too). step() times
+    named initialization blocks. When disabled every call is a cheap no-op.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.started_at = time.perf_counter()
+        self.start_rss = current_rss_mb() if enabled else 0.0
+        self.imports = []   # (module, seconds, rss delta MB)
+        self.steps = []     # (name, seconds, rss delta MB)
+        self._depth = 0
+        self._original_import = None
+
+    @classmethod
+    def from_env(cls):
+        """Enabled by STARTUP_PROFILE=1 or by running with --profile-startup"""
+        enabled = os.environ.get('STARTUP_PROFILE', '0') in ['1', 'true', 'True'] or '--profile-startup' in sys.argv
+        profiler = cls(enabled)
+        if enabled:
+            profiler.install()
+        return profiler
+
+    def install(self):
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        top = name.partition('.')[0]
+        # Only the outermost import of a not-yet-loaded package is recorded
+        if self._depth or level or top in sys.modules:
+            self._depth += 1
+            try:
+                return self._original_import(name, globals, locals, fromlist, level)
+            finally:
+                self._depth -= 1
+        start, rss = time.perf_counter(), current_rss_mb()
+        self._depth += 1
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            self._depth -= 1
+            self.imports.append((top, time.perf_counter() - start, current_rss_mb() - rss))
+
+    @contextmanager
+    def step(self, name):
+        if not self.enabled:
+            yield
+            return
+        start, rss = time.perf_counter(), current_rss_mb()
+        try:
+            yield
+        finally:
+            self.steps.append((name, time.perf_counter() - start, current_rss_mb() - rss))
+
+    def report(self):
+        def rows(entries):
+            return [{'name': n, 'ms': round(s * 1000, 1), 'rss_mb': round(m, 1)}
+                    for n, s, m in sorted(entries, key=lambda e: -e[1])]
+        return {
+            'enabled': self.enabled,
+            'total_ms': round((time.perf_counter() - self.started_at) * 1000, 1),
+            'rss_mb': round(current_rss_mb(), 1),
+            'rss_growth_mb': round(current_rss_mb() - self.start_rss, 1),
+            'imports': rows(self.imports),
+            'steps': rows(self.steps)
+        }
+
+    def format_report(self):
+        report = self.report()
+        lines = [f"Startup: {report['total_ms']} ms, RSS {report['rss_mb']} MB (+{report['rss_growth_mb']} MB)"]
+        for section in ['imports', 'steps']:
+            lines.append(f"  {section}:")
+            for row in report[section]:
+                lines.append(f"    {row['name']:32s} {row['ms']:9.1f} ms  {row['rss_mb']:+7.1f} MB")
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # Profile a cold import: python startup_profiler.py [module] [budget_ms]
+    # e.g. python startup_profiler.py api.index 1500  (exits 1 when over budget)
+    import importlib
+    os.environ['STARTUP_PROFILE'] = '1'
+    target = sys.argv[1] if len(sys.argv) > 1 else 'app'
+    budget_ms = float(sys.argv[2]) if len(sys.argv) > 2 else None
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    start = time.perf_counter()
+    importlib.import_module(target)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"import {target}: {elapsed_ms:.1f} ms")
+    heavy = [m for m in ['pandas', 'sklearn', 'scipy', 'fpdf', 'bs4', 'requests', 'textblob'] if m in sys.modules]
+    print(f"Heavy modules loaded at import: {heavy or 'none'}")
+    if budget_ms is not None and elapsed_ms > budget_ms:
+        print(f"Over the cold-start budget of {budget_ms:.0f} ms")
+        sys.exit(1)
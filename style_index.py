@@ -0,0 +1,141 @@
+import threading
+import numpy as np
+from author_dna import FEATURES
+
+
+class StyleIndex:
+    """
+    Nearest-neighbour index over AuthorDNA style vectors.
+
+    Features are standardized (z-scores with the statistics of the indexed
+    reviews) so sentence length does not drown out the ratios, and stored in a
+    KD-tree: an unscoped "who writes like this" query or a whole-history
+    grouping costs about O(log n) per review (plus the brute-force pending
+    rows below) instead of comparing every pair. Vectors added since the last
+    rebuild are searched by brute force and folded into the tree once
+    rebuild_every of them have accumulated or the index has doubled. Queries
+    scoped to one product skip the tree and scan every row of that product;
+    product-scoped groupings build a throwaway tree over those rows.
+    """
+
+    def __init__(self, rebuild_every=256, leaf_size=40):
+        self.rebuild_every = rebuild_every
+        self.leaf_size = leaf_size
+        self.ids = []
+        self.meta = []          # per row: dict(author, product, review_id, text)
+        self._product_rows = {}  # product -> rows
+        self.last_id = 0
+        self._vectors = []
+        self._matrix = np.zeros((0, len(FEATURES)))
+        self._tree = None
+        self._tree_rows = 0
+        self._mean = np.zeros(len(FEATURES))
+        self._scale = np.ones(len(FEATURES))
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, fingerprint_id, vector, author=None, product=None, review_id=None, text=None):
+        """Index one fingerprint; ids up to last_id are already indexed and skipped (False)"""
+        with self._lock:
+            if fingerprint_id <= self.last_id:
+                return False
+            self.ids.append(fingerprint_id)
+            self.meta.append({'author': author, 'product': product, 'review_id': review_id, 'text': text})
+            self._product_rows.setdefault(product, []).append(len(self.ids) - 1)
+            self._vectors.append(np.asarray(vector, dtype=np.float64))
+            self.last_id = max(self.last_id, fingerprint_id)
+            return True
+
+    def _refresh(self):
+        """
+        Bring the matrix up to date and rebuild the tree (re-fitting mean and scale) once
+        rebuild_every new rows are pending, or the index has doubled since the last
+        rebuild, so statistics fitted on the first few rows are not kept for long.
+        """
+        if len(self._matrix) != len(self._vectors):
+            self._matrix = np.vstack([self._matrix] + self._vectors[len(self._matrix):])
+        pending = len(self._matrix) - self._tree_rows
+        if self._tree is None or pending >= self.rebuild_every or len(self._matrix) >= 2 * self._tree_rows:
+            from sklearn.neighbors import KDTree
+            if len(self._matrix):
+                self._mean = self._matrix.mean(axis=0)
+                std = self._matrix.std(axis=0)
+                self._scale = np.where(std > 0, std, 1.0)
+            self._tree = KDTree(self._standardize(self._matrix), leaf_size=self.leaf_size) if len(self._matrix) else None
+            self._tree_rows = len(self._matrix)
+
+    def _standardize(self, X):
+        return (np.asarray(X, dtype=np.float64) - self._mean) / self._scale
+
+    def query(self, vector, k=10, radius=None, product=None, exclude=()):
+        """
+        The k nearest indexed reviews to a style vector as (row, distance) pairs,
+        nearest first; radius (standardized units) drops anything farther away.
+        """
+        with self._lock:
+            self._refresh()
+            if not len(self._matrix):
+                return []
+            q = self._standardize(vector)[None, :]
+            if product is not None:
+                rows = np.array(self._product_rows.get(product, []), dtype=np.int64)
+                dist = np.sqrt(((self._standardize(self._matrix[rows]) - q) ** 2).sum(axis=1)) if len(rows) else np.zeros(0)
+            else:
+                found = []
+                if self._tree is not None:
+                    d, r = self._tree.query(q, k=min(k + len(exclude), self._tree_rows))
+                    found.append((r[0], d[0]))
+                pending = np.arange(self._tree_rows, len(self._matrix))
+                if len(pending):
+                    found.append((pending, np.sqrt(((self._standardize(self._matrix[pending]) - q) ** 2).sum(axis=1))))
+                rows = np.concatenate([r for r, _ in found])
+                dist = np.concatenate([d for _, d in found])
+            order = np.argsort(dist, kind='stable')
+            excluded = set(exclude)
+            results = []
+            for j in order:
+                if radius is not None and dist[j] > radius:
+                    break
+                if self.ids[rows[j]] in excluded:
+                    continue
+                results.append((int(rows[j]), float(dist[j])))
+                if len(results) == k:
+                    break
+            return results
+
+    def clusters(self, radius=0.25, product=None, min_size=2):
+        """
+        Groups of reviews whose styles chain together within radius (connected
+        components of the radius-neighbour graph), largest first, as lists of rows.
+        """
+        from scipy import sparse
+        from scipy.sparse.csgraph import connected_components
+        from sklearn.neighbors import KDTree
+        with self._lock:
+            self._refresh()
+            rows = np.arange(len(self._matrix))
+            if product is not None:
+                rows = np.array(self._product_rows.get(product, []), dtype=np.int64)
+            if len(rows) < min_size:
+                return []
+            X = self._standardize(self._matrix[rows])
+            tree = self._tree if product is None and self._tree_rows == len(rows) else KDTree(X, leaf_size=self.leaf_size)
+            neighbours = tree.query_radius(X, r=radius)
+
+        # Connected components of the neighbour graph
+        lengths = np.fromiter((len(near) for near in neighbours), dtype=np.int64, count=len(rows))
+        graph = sparse.csr_matrix((np.ones(lengths.sum(), dtype=np.int8),
+                                   np.concatenate(neighbours).astype(np.int64),
+                                   np.concatenate([[0], np.cumsum(lengths)])), shape=(len(rows), len(rows)))
+        _, labels = connected_components(graph, directed=False)
+        sizes = np.bincount(labels)
+        order = np.argsort(labels, kind='stable')
+        bounds = np.concatenate([[0], np.cumsum(sizes)])
+        groups = [rows[order[bounds[label]:bounds[label + 1]]].tolist() for label in np.flatnonzero(sizes >= min_size)]
+        return sorted(groups, key=len, reverse=True)
+
+    def stats(self):
+        return {'size': len(self.ids), 'tree_rows': self._tree_rows, 'pending': len(self.ids) - self._tree_rows,
+                'last_id': self.last_id, 'features': FEATURES}
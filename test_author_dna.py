@@ -1,4 +1,7 @@
-from author_dna import AuthorDNA
+import random
+import numpy as np
+from author_dna import AuthorDNA, TagLookup, FEATURES, guess_tag
+from nlp_document import AnalyzedDocument, pos_tag_sents
 
 def test_author_dna():
     dna = AuthorDNA()
@@ -24,5 +27,79 @@ def test_author_dna():
     print(f"Text: {emotional_text}")
     print(res3)
 
+TEXTS = [
+    "The product is good. I like it. It works well. The price is good.",
+    "Upon thorough examination, the device demonstrates exceptional build quality, although the battery performance leaves something to be desired.",
+    "OMG!!! I absolutely LOVE this product! It's the best thing ever?! Seriously, buy it now!!!",
+    "Shipping was slow and the box arrived damaged, but support replaced it quickly.",
+    "Works as described. Would buy again.",
+    "",
+    None
+]
+
+def test_batch_matches_analyze():
+    dna = AuthorDNA()
+    matrix = dna.analyze_batch(TEXTS)
+    print(f"\n--- Batch feature matrix {matrix.shape} ---")
+    print(FEATURES)
+    assert matrix.shape == (len(TEXTS), len(FEATURES))
+    for text, row in zip(TEXTS, matrix):
+        if text:
+            assert dna.features_to_result(row) == dna.analyze(text)
+        else:
+            assert not row.any()
+
+def make_reviews(n, rng):
+    subjects = ["The battery", "This phone", "The seller", "Shipping", "The screen", "My order", "Customer support"]
+    verbs = ["works", "arrived", "broke", "lasts", "looks", "feels", "failed", "exceeded my expectations"]
+    extras = ["quickly", "after two days", "and I am happy", "but the box was damaged", "as described",
+              "!!!", "honestly", "for the price", "which is disappointing", "with no issues"]
+    return [' '.join(f"{rng.choice(subjects)} {rng.choice(verbs)} {rng.choice(extras)}."
+                     for _ in range(rng.randint(1, 5))) for _ in range(n)]
+
+def test_fast_mode_against_accurate():
+    # Cold table: tagger dictionary + suffix rules; warm table: also learned from the accurate
+    # tags of other reviews. Both are scored on held-out texts the table never learned from.
+    rng = random.Random(0)
+    learned_texts = make_reviews(200, rng)
+    texts = make_reviews(100, rng) + [t for t in TEXTS if t]
+    accurate = pos_tag_sents([AnalyzedDocument(t).tokens for t in texts])
+    lookup = TagLookup.from_nltk()
+    cold = [lookup.tag([w for w, _ in tagged]) for tagged in accurate]
+    for tagged in pos_tag_sents([AnalyzedDocument(t).tokens for t in learned_texts]):
+        lookup.learn(tagged)
+    warm = [lookup.tag([w for w, _ in tagged]) for tagged in accurate]
+
+    def agreement(tagged_sents):
+        pairs = [(a[1], b[1]) for ref, got in zip(accurate, tagged_sents) for a, b in zip(ref, got)]
+        return sum(a == b for a, b in pairs) / len(pairs)
+    print(f"\nHeld-out fast vs accurate tag agreement: cold {agreement(cold):.2%}, after learning {agreement(warm):.2%}")
+    assert agreement(warm) >= 0.9 and agreement(warm) >= agreement(cold)
+
+    dna = AuthorDNA(mode='fast')
+    dna._lookup = lookup
+    fast = dna.analyze_batch(texts)
+    slow = AuthorDNA().analyze_batch(texts, mode='accurate')
+    ratio_cols = [FEATURES.index(c) for c in ['noun_ratio', 'verb_ratio', 'adj_ratio']]
+    difference = np.abs(fast[:, ratio_cols] - slow[:, ratio_cols]).mean()
+    print(f"POS ratio mean abs difference: {difference:.4f}")
+    assert difference <= 0.05
+    # Everything but the POS ratios is mode-independent
+    other = [i for i in range(len(FEATURES)) if i not in ratio_cols]
+    assert np.allclose(fast[:, other], slow[:, other])
+    assert dna.analyze(texts[0])['style_label'] == AuthorDNA().analyze(texts[0])['style_label']
+
+def test_guess_tag_and_modes():
+    assert [guess_tag(w) for w in ['running', 'quickly', 'wonderful', 'boxes', 'London', '42', '!']] == \
+        ['VBG', 'RB', 'JJ', 'NNS', 'NNP', 'CD', '.']
+    try:
+        AuthorDNA(mode='turbo')
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
 if __name__ == "__main__":
     test_author_dna()
+    test_batch_matches_analyze()
+    test_fast_mode_against_accurate()
+    test_guess_tag_and_modes()
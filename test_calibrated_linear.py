@@ -0,0 +1,110 @@
+import os
+import pickle
+import warnings
+import numpy as np
+import pandas as pd
+from calibrated_linear import CalibratedLinearModel, collapse_calibrated_classifier, probability_drift, linear_coefficients, collapse_pipeline
+from fast_scorer import CompiledFeaturizer, compile_classifier
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def make_dataset(n=600, seed=0):
+    rng = np.random.RandomState(seed)
+    fake = ["best product ever buy now", "amazing amazing perfect", "total scam do not buy", "wow highly recommend"]
+    real = ["works fine packaging dented", "battery okay setup slow", "hinge weak after a month", "arrived on time works"]
+    texts, labels = [], []
+    for _ in range(n):
+        if rng.rand() < 0.5:
+            texts.append(rng.choice(fake) + " " + rng.choice(real).split()[0]); labels.append('CG')
+        else:
+            texts.append(rng.choice(real) + " " + rng.choice(fake).split()[0]); labels.append('OR')
+    return texts, labels
+
+def test_collapse_keeps_probabilities_close():
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.calibration import CalibratedClassifierCV
+    from sklearn.svm import LinearSVC
+    texts, labels = make_dataset()
+    vectorizer = TfidfVectorizer()
+    X = vectorizer.fit_transform(texts)
+    calibrated = CalibratedClassifierCV(LinearSVC()).fit(X[:500], labels[:500])
+
+    collapsed = collapse_calibrated_classifier(calibrated, X[:500])
+    report = probability_drift(calibrated, collapsed, X[500:])
+    print("\n--- Collapse drift on holdout ---")
+    print(report)
+    assert report['n_folds_collapsed'] == 5
+    assert report['label_agreement'] >= 0.98
+    assert report['mean_abs_drift'] < 0.05
+    assert np.allclose(linear_coefficients(calibrated), collapsed.coef_[0])
+
+    # The compiled scorer reproduces the collapsed model exactly
+    head = compile_classifier(collapsed)
+    rows = CompiledFeaturizer.from_vectorizer(vectorizer).transform(texts[500:])
+    assert np.allclose(head.predict_proba(rows), collapsed.predict_proba(X[500:]))
+
+def test_fit_refits_like_an_estimator():
+    from sklearn.base import clone
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.pipeline import Pipeline
+    from sklearn.model_selection import cross_val_score
+    from sklearn.calibration import CalibratedClassifierCV
+    from sklearn.svm import LinearSVC
+    texts, labels = make_dataset(seed=1)
+    X = TfidfVectorizer().fit_transform(texts)
+    collapsed = collapse_calibrated_classifier(CalibratedClassifierCV(LinearSVC()).fit(X[:500], labels[:500]), X[:500])
+
+    from sklearn.exceptions import NotFittedError
+    from sklearn.utils.validation import check_is_fitted
+    fresh = clone(collapsed)
+    # A clone carries the parameters only, not the trained weights
+    assert fresh.get_params() == {'C': 1.0}
+    try:
+        check_is_fitted(fresh)
+        assert False, 'clone of a collapsed model reported as fitted'
+    except NotFittedError:
+        pass
+    refit = fresh.fit(X[:500], labels[:500])
+    assert list(refit.classes_) == ['CG', 'OR'] and refit.coef_.shape == collapsed.coef_.shape
+    # Same data, same kind of model: close to the collapsed ensemble
+    assert np.mean(refit.predict(X[500:]) == collapsed.predict(X[500:])) >= 0.98
+    assert np.abs(refit.predict_proba(X[500:]) - collapsed.predict_proba(X[500:])).mean() < 0.1
+
+    pipe = Pipeline([('tfidf', TfidfVectorizer()), ('clf', collapsed)])
+    scores = cross_val_score(pipe, texts, labels, cv=3)
+    print(f"\nCross-validated accuracy of the collapsed pipeline: {scores}")
+    assert scores.min() > 0.9
+
+def test_legacy_pickles_load():
+    texts, labels = make_dataset(seed=2)
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    X = TfidfVectorizer().fit_transform(texts)
+    model = CalibratedLinearModel().fit(X, labels)
+    # Collapsed models used to keep their fitted state in constructor parameters
+    legacy = CalibratedLinearModel.__new__(CalibratedLinearModel)
+    legacy.__dict__.update(classes=model.classes_, coef=model.coef_[0], intercept=float(model.intercept_[0]),
+                           calib_a=model.calib_a_, calib_b=model.calib_b_)
+    restored = pickle.loads(pickle.dumps(legacy))
+    assert restored.get_params() == {'C': 1.0} and not hasattr(restored, 'coef')
+    assert np.allclose(restored.predict_proba(X), model.predict_proba(X))
+
+def test_collapse_existing_artifact():
+    with open(os.path.join(BASE_DIR, 'model', 'artifacts', 'svm_pipeline.pkl'), 'rb') as f:
+        with warnings.catch_warnings():
+            # Artifacts pickled by another scikit-learn version warn on load
+            warnings.simplefilter('ignore', UserWarning)
+            pipe = pickle.load(f)
+    texts = pd.read_csv(os.path.join(BASE_DIR, 'test_reviews.csv'))['review'].astype(str).tolist()
+    report = collapse_pipeline(pipe, texts)
+    print(report)
+    assert type(pipe.named_steps['clf']).__name__ == 'CalibratedLinearModel'
+    # Still a working, picklable pipeline
+    restored = pickle.loads(pickle.dumps(pipe))
+    assert restored.predict_proba(texts).shape == (len(texts), 2)
+    assert report['label_agreement'] == 1.0
+
+if __name__ == "__main__":
+    test_collapse_keeps_probabilities_close()
+    test_fit_refits_like_an_estimator()
+    test_legacy_pickles_load()
+    test_collapse_existing_artifact()
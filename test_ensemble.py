@@ -0,0 +1,73 @@
+import os
+import pickle
+import warnings
+import numpy as np
+import pandas as pd
+from ensemble import EnsembleEngine
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ARTIFACTS = os.path.join(BASE_DIR, 'model', 'artifacts')
+
+def load_pipelines():
+    models = {}
+    for name, filename in [('SVM', 'svm_pipeline.pkl'), ('NaiveBayes', 'nb_pipeline.pkl'), ('LogisticRegression', 'lr_pipeline.pkl')]:
+        with open(os.path.join(ARTIFACTS, filename), 'rb') as f:
+            with warnings.catch_warnings():
+                # Artifacts pickled by another scikit-learn version warn on load
+                warnings.simplefilter('ignore', UserWarning)
+                models[name] = pickle.load(f)
+    return models
+
+def test_ensemble_matches_pipelines():
+    models = load_pipelines()
+    engine = EnsembleEngine(models)
+    texts = pd.read_csv(os.path.join(BASE_DIR, 'test_reviews.csv'))['review'].astype(str).tolist()
+
+    print(f"\n--- Shared vectorizers: {len(engine.featurizers)} for {engine.names()} ---")
+    for text in texts:
+        for name, pipe in models.items():
+            scored = engine.predict(text, name)
+            expected_proba = pipe.predict_proba([text])[0]
+            assert np.allclose(list(scored['probs'].values()), expected_proba)
+            assert scored['prediction'] == pipe.predict([text])[0]
+            for other, other_pipe in models.items():
+                expected_vote = 'Real' if str(other_pipe.predict([text])[0]).upper() in ['0', 'OR', 'REAL'] else 'Fake'
+                assert scored['consensus'][other] == expected_vote
+        print(f"{text[:40]!r}: {engine.predict(text, 'SVM')['consensus']}")
+
+def test_predict_batch_matches_single():
+    engine = EnsembleEngine(load_pipelines())
+    texts = pd.read_csv(os.path.join(BASE_DIR, 'test_reviews.csv'))['review'].astype(str).tolist()
+
+    print("\n--- Batched vs single-text scoring ---")
+    for name in engine.names():
+        batch = engine.predict_batch(texts, name)
+        assert len(batch) == len(texts)
+        for text, res in zip(texts, batch):
+            single = engine.predict(text, name)
+            assert res['label'] == single['label']
+            assert np.isclose(res['trust_score'], single['trust_score'])
+        print(f"{name}: {[r['label'] for r in batch]}")
+
+def test_cascade_exits_early_when_first_model_is_confident():
+    engine = EnsembleEngine(load_pipelines())
+    text = "This is the best product I have ever bought! Highly recommend!"
+
+    # Band covering every probability: NaiveBayes is never confident, all models run
+    full = engine.predict(text, 'SVM', cascade=True, band=(0.0, 1.0))
+    assert set(full['models_evaluated']) == set(engine.names())
+    assert full['model_used'] == 'SVM' and full['probs'] == engine.predict(text, 'SVM')['probs']
+
+    # Empty band: NaiveBayes always decides alone and gives the main prediction
+    early = engine.predict(text, 'SVM', cascade=True, band=(2.0, 3.0))
+    assert early['models_evaluated'] == ['NaiveBayes'] and set(early['consensus']) == {'NaiveBayes'}
+    assert early['model_used'] == 'NaiveBayes'
+    assert early['probs'] == engine.predict(text, 'NaiveBayes')['probs']
+
+    only_nb = engine.predict(text, 'NaiveBayes', cascade=True, band=(2.0, 3.0))
+    assert only_nb['models_evaluated'] == ['NaiveBayes'] and only_nb['model_used'] == 'NaiveBayes'
+
+if __name__ == "__main__":
+    test_ensemble_matches_pipelines()
+    test_predict_batch_matches_single()
+    test_cascade_exits_early_when_first_model_is_confident()
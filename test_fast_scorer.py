@@ -0,0 +1,66 @@
+import os
+import pickle
+import warnings
+import numpy as np
+import pandas as pd
+from fast_scorer import CompiledFeaturizer, compile_classifier
+from ensemble import EnsembleEngine
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ARTIFACTS = os.path.join(BASE_DIR, 'model', 'artifacts')
+
+def load_test_reviews():
+    return pd.read_csv(os.path.join(BASE_DIR, 'test_reviews.csv'))['review'].astype(str).tolist()
+
+def assert_parity(pipe, texts):
+    featurizer = CompiledFeaturizer.from_vectorizer(pipe.named_steps['tfidf'])
+    head = compile_classifier(pipe.named_steps['clf'])
+    assert featurizer is not None and head is not None
+    rows = featurizer.transform(texts)
+    expected = pipe.predict_proba(texts)
+    assert np.allclose(head.predict_proba(rows), expected, atol=1e-10)
+    # Single-row (gather) and batched (sparse product) paths must agree
+    assert np.allclose(np.vstack([head.predict_proba([row]) for row in rows]), expected, atol=1e-10)
+    assert list(head.predict(rows)) == list(pipe.predict(texts))
+    return expected
+
+def test_compiled_artifacts_match_pipelines():
+    texts = load_test_reviews()
+    print("\n--- Compiled scorer parity on test_reviews.csv ---")
+    for filename in ['svm_pipeline.pkl', 'nb_pipeline.pkl', 'lr_pipeline.pkl']:
+        with open(os.path.join(ARTIFACTS, filename), 'rb') as f:
+            with warnings.catch_warnings():
+                # Artifacts pickled by another scikit-learn version warn on load
+                warnings.simplefilter('ignore', UserWarning)
+                pipe = pickle.load(f)
+        proba = assert_parity(pipe, texts)
+        print(f"{filename}: max P = {proba.max(axis=1).round(3).tolist()}")
+
+def test_compiled_vectorizer_options():
+    from sklearn.pipeline import Pipeline
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    texts = load_test_reviews() * 4
+    labels = ['CG', 'CG', 'OR', 'CG', 'OR'] * 4
+    for params in [{'ngram_range': (1, 3)}, {'stop_words': 'english', 'sublinear_tf': True}, {'binary': True, 'norm': 'l1'}]:
+        pipe = Pipeline([('tfidf', TfidfVectorizer(**params)), ('clf', LogisticRegression())]).fit(texts, labels)
+        assert_parity(pipe, texts + ["Unseen words only", ""])
+
+def test_engine_uses_compiled_scorers():
+    models = {}
+    for name, filename in [('SVM', 'svm_pipeline.pkl'), ('NaiveBayes', 'nb_pipeline.pkl'), ('LogisticRegression', 'lr_pipeline.pkl')]:
+        with open(os.path.join(ARTIFACTS, filename), 'rb') as f:
+            with warnings.catch_warnings():
+                # Artifacts pickled by another scikit-learn version warn on load
+                warnings.simplefilter('ignore', UserWarning)
+                models[name] = pickle.load(f)
+    engine = EnsembleEngine(models, compile=True)
+    assert engine.compiled == set(models)
+    for text in load_test_reviews():
+        for name, pipe in models.items():
+            assert np.allclose(list(engine.predict(text, name)['probs'].values()), pipe.predict_proba([text])[0])
+
+if __name__ == "__main__":
+    test_compiled_artifacts_match_pipelines()
+    test_compiled_vectorizer_options()
+    test_engine_uses_compiled_scorers()
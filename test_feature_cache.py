@@ -0,0 +1,76 @@
+import os
+import time
+import tempfile
+import numpy as np
+from feature_cache import FeatureCache, dataset_hash, feature_key
+
+def make_split(n=200):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    texts = [f"review number {i} says {'great' if i % 2 else 'bad'} product {i % 7}" for i in range(n)]
+    labels = np.array(['Fake' if i % 2 else 'Real' for i in range(n)], dtype=object)
+    vectorizer = TfidfVectorizer()
+    cut = int(n * 0.8)
+    return vectorizer, (vectorizer.fit_transform(texts[:cut]), labels[:cut], vectorizer.transform(texts[cut:]), labels[cut:])
+
+def test_round_trip():
+    cache = FeatureCache(tempfile.mkdtemp())
+    vectorizer, split = make_split()
+    assert cache.get('k1') is None
+    meta = cache.put('k1', vectorizer, split, {'dataset': 'reviews.csv'})
+    assert meta['train_rows'] == 160 and meta['dataset'] == 'reviews.csv'
+    cached_vectorizer, (X_train, y_train, X_test, y_test) = cache.get('k1')
+    assert (X_train != split[0]).nnz == 0 and X_train.dtype == split[0].dtype and (X_test != split[2]).nnz == 0
+    assert list(y_train) == list(split[1]) and y_test.dtype == object and isinstance(y_test[0], str)
+    assert cached_vectorizer.vocabulary_ == vectorizer.vocabulary_
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+def test_integer_labels():
+    cache = FeatureCache(tempfile.mkdtemp())
+    vectorizer, (X_train, _, X_test, _) = make_split()
+    cache.put('ints', vectorizer, (X_train, np.arange(160) % 2, X_test, np.arange(40) % 2))
+    _, (_, y_train, _, _) = cache.get('ints')
+    assert y_train.dtype.kind == 'i' and list(y_train[:4]) == [0, 1, 0, 1]
+
+def test_key_covers_data_columns_and_vectorizer():
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, 'reviews.csv')
+    with open(path, 'w') as f:
+        f.write("text,label\nnice,Real\n")
+    first = dataset_hash(path)
+    base = feature_key(first, 'text', 'label', TfidfVectorizer(), test_size=0.2)
+    assert base == feature_key(first, 'text', 'label', TfidfVectorizer(), test_size=0.2)
+    assert base != feature_key(first, 'review', 'label', TfidfVectorizer(), test_size=0.2)
+    assert base != feature_key(first, 'text', 'label', TfidfVectorizer(ngram_range=(1, 2)), test_size=0.2)
+    assert base != feature_key(first, 'text', 'label', TfidfVectorizer(), test_size=0.3)
+    time.sleep(0.01)
+    with open(path, 'a') as f:
+        f.write("awful,Fake\n")
+    assert dataset_hash(path) != first
+
+def test_lru_eviction_under_budget():
+    cache = FeatureCache(tempfile.mkdtemp())
+    vectorizer, split = make_split()
+    size = cache.put('a', vectorizer, split)['bytes']
+    cache.max_bytes = int(size * 2.5)
+    cache.put('b', vectorizer, split)
+    os.utime(os.path.join(cache.path('a'), 'meta.json'), (time.time() - 60, time.time() - 60))
+    os.utime(os.path.join(cache.path('b'), 'meta.json'), (time.time() - 30, time.time() - 30))
+    assert cache.get('a') is not None  # a is now the most recently used
+    cache.put('c', vectorizer, split)
+    assert sorted(meta['key'] for meta in cache.entries()) == ['a', 'c']
+
+def test_damaged_entry_is_dropped():
+    cache = FeatureCache(tempfile.mkdtemp())
+    vectorizer, split = make_split()
+    cache.put('k', vectorizer, split)
+    with open(os.path.join(cache.path('k'), 'train.npz'), 'wb') as f:
+        f.write(b'not a zip')
+    assert cache.get('k') is None and not os.path.exists(cache.path('k'))
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_integer_labels()
+    test_key_covers_data_columns_and_vectorizer()
+    test_lru_eviction_under_budget()
+    test_damaged_entry_is_dropped()
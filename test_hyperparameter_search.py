@@ -0,0 +1,68 @@
+import time
+import random
+import numpy as np
+from hyperparameter_search import (DEFAULT_CONFIG, build_models, sample_candidates, evaluate_config,
+                                   successive_halving, affordable_rows)
+
+def make_reviews(n=1500, seed=0):
+    rng = random.Random(seed)
+    fake = "amazing best perfect love buy now trust me incredible".split()
+    real = "battery okay screen decent delivery late works fine price".split()
+    texts, labels = [], []
+    for i in range(n):
+        label = 'Fake' if i % 2 else 'Real'
+        words = fake if label == 'Fake' else real
+        texts.append(' '.join(rng.choice(words if rng.random() < 0.6 else fake + real) for _ in range(12)))
+        labels.append(label)
+    return texts, labels
+
+def test_candidates_start_from_defaults():
+    candidates = sample_candidates(12)
+    assert candidates[0] == DEFAULT_CONFIG and len(candidates) == 12
+    assert len({tuple(sorted(c.items())) for c in candidates}) == 12
+    assert sample_candidates(12) == candidates  # seeded
+    vectorizer, classifiers = build_models()
+    assert vectorizer.get_params()['ngram_range'] == (1, 1) and vectorizer.get_params()['max_features'] is None
+    assert [name for name, _ in classifiers] == ['SVM', 'NaiveBayes', 'LogisticRegression']
+    # Configs that went through JSON
+    vectorizer, _ = build_models({'ngram_range': [1, 2], 'nb_alpha': 0.1})
+    assert vectorizer.get_params()['ngram_range'] == (1, 2)
+
+def test_failed_candidate_is_reported():
+    texts, labels = make_reviews(50)
+    split = (texts[:40], np.array(labels[:40]), texts[40:], np.array(labels[40:]))
+    ok = evaluate_config(DEFAULT_CONFIG, 40, split)
+    assert ok['accuracy'] is not None and ok['ms_per_1k_reviews'] > 0 and set(ok['models']) == {'SVM', 'NaiveBayes', 'LogisticRegression'}
+    bad = evaluate_config(dict(DEFAULT_CONFIG, min_df=100), 40, split)
+    assert bad['accuracy'] is None and 'error' in bad
+
+def test_successive_halving_within_budget():
+    texts, labels = make_reviews()
+    start = time.perf_counter()
+    search = successive_halving(texts, labels, budget_s=20, n_candidates=9, min_rows=100)
+    elapsed = time.perf_counter() - start
+    print(f"\nSearch: {search['rounds']} best {search['best']} in {elapsed:.2f}s")
+    assert elapsed < 25
+    assert [r['candidates'] for r in search['rounds']] == [9, 3][:len(search['rounds'])]
+    rows = [r['rows'] for r in search['rounds']]
+    assert rows == sorted(rows) and search['rows'] == rows[-1]
+    assert search['validation_accuracy'] > 0.8 and search['tradeoff'][0]['config'] == search['best']
+
+def test_tiny_budget_still_returns_a_config():
+    texts, labels = make_reviews(600)
+    search = successive_halving(texts, labels, budget_s=0.01, n_candidates=6, min_rows=100)
+    assert search['stopped_early'] and len(search['rounds']) == 1 and search['best'] == DEFAULT_CONFIG
+
+def test_affordable_rows():
+    search = {'fit_s': 2.0, 'rows': 1000, 'ms_per_1k_reviews': 1000.0}
+    # 3 ms per fitted row (with the margin), 1 s to score 1000 test reviews
+    assert affordable_rows(search, 31, 100000, 1000) == 10000
+    assert affordable_rows(search, 1000, 50000, 1000) == 50000
+    assert affordable_rows(search, 0.5, 50000, 1000) == 1000
+
+if __name__ == "__main__":
+    test_candidates_start_from_defaults()
+    test_failed_candidate_is_reported()
+    test_successive_halving_within_budget()
+    test_tiny_budget_still_returns_a_config()
+    test_affordable_rows()
@@ -0,0 +1,102 @@
+import os
+import time
+import random
+import tempfile
+import multiprocessing
+from incremental_training import IncrementalTrainer, to_class_code, trainer_lock, saved_version
+from ensemble import EnsembleEngine
+
+def make_reviews(n=600, seed=0):
+    rng = random.Random(seed)
+    fake = "amazing best perfect love buy now trust me incredible".split()
+    real = "battery okay screen decent delivery late works fine price".split()
+    texts, labels = [], []
+    for i in range(n):
+        label = 'CG' if i % 2 else 'OR'
+        words = fake if label == 'CG' else real
+        texts.append(' '.join(rng.choice(words if rng.random() < 0.7 else fake + real) for _ in range(12)))
+        labels.append(label)
+    return texts, labels
+
+def test_increments_keep_holdout_and_learn():
+    texts, labels = make_reviews()
+    trainer = IncrementalTrainer(n_features=2 ** 12)
+    first = trainer.partial_fit(texts[:200], labels[:200], source='a.csv')
+    holdout = list(trainer.holdout[0])
+    assert first['batch_rows'] == 160 and len(holdout) == 40 and trainer.classes == ['CG', 'OR']
+    second = trainer.partial_fit(texts[200:] + ['unknown label row'], labels[200:] + ['??'], source='b.csv')
+    print(f"\nIncrement 1: {first['timings']}, increment 2: {second['timings']}")
+    assert second['batch_rows'] == 400 and second['skipped_rows'] == 1 and trainer.samples_seen == 560
+    assert trainer.holdout[0] == holdout
+    assert set(second['metrics']) == {'SVM', 'NaiveBayes', 'LogisticRegression'}
+    for name, metrics in second['metrics'].items():
+        assert metrics['accuracy'] > 0.8, (name, metrics)
+
+def test_first_batch_needs_two_classes():
+    trainer = IncrementalTrainer(n_features=2 ** 10)
+    try:
+        trainer.partial_fit(['great', 'super'], ['CG', 'CG'])
+        assert False, 'single-class batch accepted'
+    except ValueError:
+        pass
+    assert trainer.models is None
+
+def test_snapshot_serves_and_survives_reload():
+    texts, labels = make_reviews(seed=1)
+    trainer = IncrementalTrainer(n_features=2 ** 12)
+    trainer.partial_fit(texts, labels)
+    models = trainer.pipelines()
+    before = models['SVM'].predict_proba(texts[:5])
+    trainer.partial_fit(texts[:50], ['OR'] * 50)
+    # Later increments leave a published snapshot unchanged
+    assert (models['SVM'].predict_proba(texts[:5]) == before).all()
+    engine = EnsembleEngine(models, compile=False)
+    assert sorted(engine.names()) == ['LogisticRegression', 'NaiveBayes', 'SVM']
+
+    path = os.path.join(tempfile.mkdtemp(), 'incremental', 'trainer.pkl')
+    trainer.save(path)
+    loaded = IncrementalTrainer.load(path)
+    assert loaded.samples_seen == trainer.samples_seen and len(loaded.history) == 2
+    assert (loaded.pipelines()['NaiveBayes'].predict(texts[:20]) == trainer.pipelines()['NaiveBayes'].predict(texts[:20])).all()
+    assert IncrementalTrainer.load(path + '.missing').models is None
+
+def hold_trainer_lock(path, held):
+    with trainer_lock(path):
+        held.set()
+        time.sleep(0.5)
+
+def test_trainer_lock_and_version_span_processes():
+    path = os.path.join(tempfile.mkdtemp(), 'incremental', 'trainer.pkl')
+    assert saved_version(path) is None
+    IncrementalTrainer(n_features=2 ** 10).save(path)
+    first = saved_version(path)
+    trainer = IncrementalTrainer(n_features=2 ** 10)
+    trainer.partial_fit(*make_reviews(100))
+    trainer.save(path)
+    # Another worker's save is visible as a new version
+    assert saved_version(path) not in (None, first)
+
+    held = multiprocessing.Event()
+    other = multiprocessing.Process(target=hold_trainer_lock, args=(path, held))
+    other.start()
+    assert held.wait(10)
+    start = time.perf_counter()
+    with trainer_lock(path):
+        waited = time.perf_counter() - start
+    other.join()
+    print(f"\nWaited {waited:.2f}s for the other process's trainer lock")
+    assert waited > 0.2
+
+def test_moderator_labels_map_to_classes():
+    assert to_class_code('Fake', ['CG', 'OR']) == 'CG'
+    assert to_class_code('Real', ['CG', 'OR']) == 'OR'
+    assert to_class_code('Real', ['Fake', 'Real']) == 'Real'
+    assert to_class_code('Fake', [0, 1]) == 1
+    assert to_class_code('Spam', ['CG', 'OR']) is None
+
+if __name__ == "__main__":
+    test_increments_keep_holdout_and_learn()
+    test_first_batch_needs_two_classes()
+    test_snapshot_serves_and_survives_reload()
+    test_trainer_lock_and_version_span_processes()
+    test_moderator_labels_map_to_classes()
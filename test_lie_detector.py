@@ -1,3 +1,5 @@
+import random
+import pandas as pd
 from lie_detector import LieDetector
 
 def test_lie_detector():
@@ -24,5 +26,33 @@ def test_lie_detector():
     print(f"Text: {promo_text}")
     print(res3)
 
+def test_analyze_batch_matches_analyze():
+    ld = LieDetector()
+    rng = random.Random(3)
+    vocab = ['trust', 'me', 'to', 'be', 'honest', 'i', 'swear', 'check', 'out', 'link', 'in', 'bio',
+             'buy', 'now', 'discount', 'best', 'amazing', 'the', 'and', 'it', 'good', 'phone', 'TRUST']
+    seps = [' ', ', ', '! ', '. ', '  ', '-']
+    texts = ['', None, '   ', 'Best!', 'good good good good good phone phone phone phone phone phone',
+             'Buy it now, trust me. Buy it now, trust me. Buy it now, trust me. Buy it now!']
+    for _ in range(300):
+        texts.append(''.join(rng.choice(vocab) + rng.choice(seps) for _ in range(rng.randint(0, 30))))
+    series = pd.Series(texts, index=range(100, 100 + len(texts)))
+
+    frame = ld.analyze_batch(series)
+    print(f"\n--- Batch: {len(frame)} reviews ---")
+    print(frame.describe().loc[['mean', 'max']])
+    assert list(frame.index) == list(series.index)
+    for text, row in zip(texts, frame.to_dict('records')):
+        ref = ld.analyze(text)
+        got = ld.batch_result(row)
+        for key in ['deception_score', 'exaggeration_score', 'emotional_intensity', 'repetition_score', 'promotional_score']:
+            assert ref[key] == got[key], (text, key, ref[key], got[key])
+        if ref['details']:
+            assert ref['details']['word_count'] == got['details']['word_count']
+            assert ref['details']['subjectivity'] == got['details']['subjectivity']
+            for key, value in got['details']['repetition'].items():
+                assert ref['details']['repetition'][key] == value, (text, key)
+
 if __name__ == "__main__":
     test_lie_detector()
+    test_analyze_batch_matches_analyze()
@@ -0,0 +1,67 @@
+import time
+import threading
+from micro_batcher import MicroBatcher
+
+def slow_upper(items):
+    time.sleep(0.02)
+    if 'boom' in items:
+        raise ValueError("bad item in batch")
+    return [item.upper() for item in items]
+
+def run_concurrently(batcher, items):
+    results, errors = {}, {}
+    def worker(item):
+        try:
+            results[item] = batcher.submit(item)
+        except Exception as e:
+            errors[item] = e
+    threads = [threading.Thread(target=worker, args=(item,)) for item in items]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+def test_idle_calls_are_scored_directly():
+    batcher = MicroBatcher(slow_upper)
+    assert batcher.submit('a') == 'A'
+    assert batcher.submit('b') == 'B'
+    stats = batcher.stats()
+    assert stats['direct_calls'] == 2 and stats['batches'] == 0
+
+def test_concurrent_calls_are_coalesced():
+    batcher = MicroBatcher(slow_upper, max_wait_ms=10, max_batch=16)
+    items = [f"review {i}" for i in range(40)]
+    results, errors = run_concurrently(batcher, items)
+    assert not errors
+    assert results == {item: item.upper() for item in items}
+    stats = batcher.stats()
+    print("\n--- Micro-batcher stats ---")
+    print(stats)
+    assert stats['direct_calls'] + stats['batched_items'] == len(items)
+    assert stats['batches'] < stats['batched_items']  # at least one real batch formed
+    assert stats['avg_batch_size'] > 1
+
+def test_failing_item_only_fails_itself():
+    batcher = MicroBatcher(slow_upper, max_wait_ms=20)
+    results, errors = run_concurrently(batcher, ['ok 1', 'boom', 'ok 2', 'ok 3'])
+    assert set(errors) == {'boom'}
+    assert results == {'ok 1': 'OK 1', 'ok 2': 'OK 2', 'ok 3': 'OK 3'}
+
+def drops_last_of_batch(items):
+    time.sleep(0.02)
+    return [item.upper() for item in items][:max(1, len(items) - 1)]
+
+def test_short_batch_fails_every_request():
+    batcher = MicroBatcher(drops_last_of_batch, max_wait_ms=20)
+    results, errors = run_concurrently(batcher, [f"item {i}" for i in range(6)])
+    # The first call is scored directly; the rest form one batch that comes back short
+    assert len(results) + len(errors) == 6 and len(errors) >= 2
+    assert all(isinstance(e, RuntimeError) for e in errors.values())
+    assert all(value == item.upper() for item, value in results.items())
+
+if __name__ == "__main__":
+    test_idle_calls_are_scored_directly()
+    test_concurrent_calls_are_coalesced()
+    test_failing_item_only_fails_itself()
+    test_short_batch_fails_every_request()
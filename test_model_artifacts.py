@@ -0,0 +1,80 @@
+import os
+import pickle
+import tempfile
+import warnings
+import numpy as np
+import pandas as pd
+from ensemble import EnsembleEngine
+from fast_scorer import CompiledFeaturizer, MappedVocabulary
+from model_artifacts import PIPELINE_FILES, FORMAT_VERSION, save_compiled, load_compiled, read_manifest, is_current, convert
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ARTIFACTS = os.path.join(BASE_DIR, 'model', 'artifacts')
+
+def load_pipelines():
+    models = {}
+    for name, filename in PIPELINE_FILES:
+        with open(os.path.join(ARTIFACTS, filename), 'rb') as f:
+            with warnings.catch_warnings():
+                # Artifacts pickled by another scikit-learn version warn on load
+                warnings.simplefilter('ignore', UserWarning)
+                models[name] = pickle.load(f)
+    return models
+
+def load_test_reviews():
+    return pd.read_csv(os.path.join(BASE_DIR, 'test_reviews.csv'))['review'].astype(str).tolist()
+
+def test_mapped_vocabulary_matches_dict():
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    texts = load_test_reviews() + ["Café naïve résumé — unicode terms", "ok"]
+    vectorizer = TfidfVectorizer(ngram_range=(1, 2)).fit(texts)
+    plain = CompiledFeaturizer.from_vectorizer(vectorizer)
+    mapped = CompiledFeaturizer.from_vectorizer(vectorizer)
+    mapped.vocabulary = MappedVocabulary.from_dict(vectorizer.vocabulary_)
+    for text in texts + ["", "unseen tokens only", "a" * 500]:
+        (i1, v1), (i2, v2) = plain.transform_one(text), mapped.transform_one(text)
+        order = np.argsort(i1)
+        assert list(i1[order]) == list(i2) and np.allclose(v1[order], v2)
+    assert list(mapped.get_feature_names_out()) == list(vectorizer.get_feature_names_out())
+
+def test_round_trip_matches_pipelines():
+    models = load_pipelines()
+    engine = EnsembleEngine(models, compile=True)
+    print("\n--- Binary artifact round trip ---")
+    with tempfile.TemporaryDirectory() as folder:
+        assert save_compiled(engine, folder, 'v1', {'svm_pipeline.pkl': 'x'})
+        featurizers, heads, manifest = load_compiled(folder)
+        assert manifest['format_version'] == FORMAT_VERSION and manifest['model_version'] == 'v1'
+        # Arrays stay zero-copy views of the read-only file mappings
+        for array in [heads['SVM'][1].weights, featurizers[0].idf, featurizers[0].vocabulary.sorted_terms]:
+            assert not array.flags.owndata and not array.flags.writeable
+        loaded = EnsembleEngine.from_compiled(featurizers, heads)
+        for text in load_test_reviews():
+            for name, pipe in models.items():
+                assert np.allclose(list(loaded.predict(text, name)['probs'].values()), pipe.predict_proba([text])[0], atol=1e-10)
+        names, coefs = loaded.feature_weights('SVM')
+        expected_names, expected_coefs = engine.feature_weights('SVM')
+        assert list(names) == list(expected_names) and np.allclose(coefs, expected_coefs)
+        print(f"Loaded {loaded.names()} from {sorted(os.listdir(folder))}")
+
+def test_manifest_guards():
+    with tempfile.TemporaryDirectory() as folder:
+        # Models that cannot be compiled leave no manifest behind
+        assert not save_compiled(EnsembleEngine(load_pipelines()), folder, 'v1')
+        assert load_compiled(folder) is None
+
+        out = convert(ARTIFACTS, os.path.join(folder, 'compiled'))
+        assert is_current(out, ARTIFACTS)
+        assert not is_current(out, folder)  # different (no) source pickles
+        manifest_path = os.path.join(out, 'manifest.json')
+        manifest = read_manifest(out)
+        manifest['format_version'] = FORMAT_VERSION + 1
+        with open(manifest_path, 'w') as f:
+            import json
+            json.dump(manifest, f)
+        assert read_manifest(out) is None
+
+if __name__ == "__main__":
+    test_mapped_vocabulary_matches_dict()
+    test_round_trip_matches_pipelines()
+    test_manifest_guards()
@@ -0,0 +1,68 @@
+import os
+import pickle
+import tempfile
+import threading
+import warnings
+import numpy as np
+from ensemble import EnsembleEngine
+from model_artifacts import PIPELINE_FILES
+from model_registry import ModelRegistry
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ARTIFACTS = os.path.join(BASE_DIR, 'model', 'artifacts')
+
+def load_pipelines():
+    models = {}
+    for name, filename in PIPELINE_FILES:
+        with open(os.path.join(ARTIFACTS, filename), 'rb') as f:
+            with warnings.catch_warnings():
+                # Artifacts pickled by another scikit-learn version warn on load
+                warnings.simplefilter('ignore', UserWarning)
+                models[name] = pickle.load(f)
+    return models
+
+def test_publish_activate_rollback():
+    models = load_pipelines()
+    with tempfile.TemporaryDirectory() as root:
+        registry = ModelRegistry(root, keep=3)
+        assert registry.current() is None and registry.versions() == []
+
+        v1 = registry.publish(models, EnsembleEngine(models, compile=True), {'metrics': {'SVM': {'accuracy': 0.9}}})
+        v2 = registry.publish(models)
+        assert (v1, v2) == (1, 2) and registry.current() == 2
+
+        # v1 was published with an engine, so it loads from memory-mapped binary artifacts
+        loaded_models, engine, meta = registry.load(1)
+        assert loaded_models == {} and engine.compiled == set(models)
+        assert meta['model_version'] == 'v1' and meta['metrics']['SVM']['accuracy'] == 0.9
+        text = "Great product, works exactly as described"
+        expected = models['SVM'].predict_proba([text])[0]
+        assert np.allclose(list(engine.predict(text, 'SVM')['probs'].values()), expected)
+        # v2 has no binary artifacts and falls back to the pickles
+        assert set(registry.load(2)[0]) == set(models)
+
+        assert registry.rollback() == 1 and registry.current() == 1
+        registry.activate(2)
+        print("\n" + str([(m['model_version'], m['current']) for m in registry.describe()]))
+
+        for _ in range(3):
+            registry.publish(models)
+        assert registry.versions() == [3, 4, 5]
+        assert not any(name.startswith('.') for name in os.listdir(root))
+
+def test_concurrent_publishers_get_distinct_versions():
+    models = {'NaiveBayes': load_pipelines()['NaiveBayes']}
+    with tempfile.TemporaryDirectory() as root:
+        registry = ModelRegistry(root, keep=0)
+        published = []
+        threads = [threading.Thread(target=lambda: published.append(registry.publish(models))) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert sorted(published) == [1, 2, 3, 4, 5, 6] == registry.versions()
+        assert registry.current() in published
+
+if __name__ == "__main__":
+    test_publish_activate_rollback()
+    test_concurrent_publishers_get_distinct_versions()
@@ -0,0 +1,75 @@
+import numpy as np
+from near_duplicates import MinHasher, NearDuplicateIndex, estimate_jaccard, lsh_params
+
+def random_reviews(n, seed=0):
+    rng = np.random.default_rng(seed)
+    letters = np.array(list('abcdefghijklmnopqrstuvwxyz'))
+    words = [''.join(rng.choice(letters, rng.integers(3, 9))) for _ in range(3000)]
+    return [' '.join(rng.choice(words, rng.integers(8, 30))) for _ in range(n)]
+
+def exact_jaccard(hasher, a, b):
+    sa, sb = set(hasher.shingles([a])[0].tolist()), set(hasher.shingles([b])[0].tolist())
+    return len(sa & sb) / len(sa | sb)
+
+def test_minhash_estimates_jaccard():
+    hasher = MinHasher(num_perm=256)
+    template = "Absolutely love this phone, the battery lasts two days and the camera is stunning. Highly recommend!"
+    variants = [template,
+                template.replace("two days", "three days"),
+                template.upper().replace(",", " ;"),
+                "Absolutely love this phone. Camera is stunning, would recommend to anyone!",
+                "Stopped charging after a week and the seller ignored my refund request."]
+    signatures = hasher.signatures(variants)
+    for text, signature in zip(variants, signatures):
+        exact = exact_jaccard(hasher, template, text)
+        estimate = estimate_jaccard(signatures[0], signature)
+        print(f"exact {exact:.3f} estimate {estimate:.3f}")
+        assert abs(exact - estimate) < 0.1
+    # Case, punctuation and spacing are normalized away
+    assert (signatures[2] == signatures[0]).all()
+    assert (hasher.signatures(['', '!!'])[:, 0] == np.iinfo(np.uint32).max).all()
+    bands, rows = lsh_params(0.6, 128)
+    assert bands * rows <= 128 and 0.45 < (1 / bands) ** (1 / rows) < 0.75
+
+def test_clusters_and_incremental_query():
+    reviews = random_reviews(2000)
+    templates = ["Best purchase I have made this year, works perfectly and arrived early. Five stars!",
+                 "Terrible quality, broke after two days and customer support never answered my emails."]
+    for t, template in enumerate(templates):
+        for i in range(6):
+            words = template.split()
+            words[i * 2] = f"edit{i}"  # one word edited per copy
+            reviews.append(' '.join(words))
+    index = NearDuplicateIndex(threshold=0.5)
+    index.add_many(list(range(len(reviews))), reviews)
+    groups = index.clusters()
+    print(f"\nClusters: {[len(g['rows']) for g in groups]}")
+    assert [len(g['rows']) for g in groups[:2]] == [6, 6]
+    assert sorted(row for g in groups for row in g['rows']) == list(range(2000, 2012))
+    assert all(g['min_jaccard'] >= 0.5 and len(g['jaccard']) == 6 for g in groups)
+
+    # New reviews are added to the existing tables and found by later queries
+    copy = templates[0].replace("early", "late")
+    index.add(5000, copy, {'label': 'new'})
+    matches = index.query(templates[0])
+    assert 5000 in [index.ids[row] for row, _ in matches]
+    assert [j for _, j in matches] == sorted((j for _, j in matches), reverse=True)
+    assert 5000 not in [index.ids[row] for row, _ in index.query(templates[0], exclude=(5000,))]
+    assert index.query(reviews[0]) == [(0, 1.0)]
+    assert index.clusters()[0]['rows'][-1] == len(index) - 1
+
+def test_indexed_ids_are_not_added_again():
+    reviews = random_reviews(20, seed=3)
+    index = NearDuplicateIndex(threshold=0.5)
+    assert index.add_many(list(range(1, 11)), reviews[:10]) == 10
+    # An overlapping refresh re-sends ids 6..10 with the new ones
+    assert index.add_many(list(range(6, 21)), reviews[5:]) == 10
+    assert index.ids == list(range(1, 21)) and index.last_id == 20
+    # Otherwise a review would match itself at Jaccard 1.0
+    assert index.query(reviews[7], exclude=(8,)) == []
+    assert index.clusters() == []
+
+if __name__ == "__main__":
+    test_minhash_estimates_jaccard()
+    test_clusters_and_incremental_query()
+    test_indexed_ids_are_not_added_again()
@@ -0,0 +1,52 @@
+import random
+from ngram_repetition import analyze_repetition, repetition_batch, MAX_N
+
+def brute_force(words):
+    """Reference: every n-gram compared as a tuple, every span length tried"""
+    def grams(n):
+        return [tuple(words[i:i + n]) for i in range(len(words) - n + 1)]
+    repeated = {n: sum(1 for g in set(grams(n)) if grams(n).count(g) > 1) for n in range(2, MAX_N + 1)}
+    longest = max([n for n in range(1, len(words)) if len(set(grams(n))) < len(grams(n))] or [0])
+    seen, covered = set(), set()
+    for i, g in enumerate(grams(3)):
+        if g in seen:
+            covered.update(range(i, i + 3))
+        seen.add(g)
+    return repeated, longest, round(len(covered) / len(words), 3) if words else 0.0
+
+def test_matches_brute_force():
+    rng = random.Random(5)
+    vocab = ['buy', 'this', 'now', 'great', 'phone', 'the', 'it', 'is']
+    reviews = [[rng.choice(vocab) for _ in range(rng.randint(0, 40))] for _ in range(500)]
+    # Generated loops and copy-pasted blocks, longer than MAX_N
+    reviews += [['love', 'it', 'so', 'much', 'best', 'phone', 'ever'] * 6, ['a'] * 30,
+                ['x%d' % i for i in range(40)] + ['x%d' % i for i in range(10, 30)]]
+    batch = repetition_batch(reviews)
+    for i, words in enumerate(reviews):
+        result = analyze_repetition(words)
+        repeated, longest, coverage = brute_force(words)
+        assert result['repeated_ngrams'] == repeated, words
+        assert result['longest_span'] == longest == batch['longest_span'][i], (words, result, longest)
+        assert result['coverage'] == coverage == batch['coverage'][i], (words, result, coverage)
+        assert result['phrase_score'] == batch['phrase_score'][i]
+        if longest:
+            span = result['longest_phrase'].split()
+            assert len(span) == longest and sum(words[j:j + longest] == span for j in range(len(words))) >= 2
+
+def test_loop_detection():
+    words = ("it is the best product ever " * 20).split()
+    result = analyze_repetition(words)
+    print(f"\nLoop: span {result['longest_span']}, coverage {result['coverage']}, score {result['phrase_score']}")
+    assert result['longest_span'] == len(words) - 6 and result['phrase_score'] == 100
+    honest = "The battery lasts two days and the camera is sharp, though the speaker is quiet at full volume.".lower().split()
+    assert analyze_repetition(honest)['phrase_score'] == 0
+    # Multi-thousand-word reviews stay linear in the number of words
+    rng = random.Random(1)
+    long_review = ['w%d' % rng.randrange(5000) for _ in range(6000)]
+    long_review += long_review[1000:1500]
+    result = analyze_repetition(long_review)
+    assert result['longest_span'] >= 500 and result['coverage'] > 0.07
+
+if __name__ == "__main__":
+    test_matches_brute_force()
+    test_loop_detection()
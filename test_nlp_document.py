@@ -0,0 +1,36 @@
+import os
+import pandas as pd
+from lie_detector import LieDetector
+from author_dna import AuthorDNA
+from nlp_document import AnalyzedDocument
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def load_texts():
+    texts = pd.read_csv(os.path.join(BASE_DIR, 'test_reviews.csv'))['review'].astype(str).tolist()
+    return texts + ["Trust me, this is the best best best best best product ever, honestly the best!!! Buy now."]
+
+def test_stages_match_nltk_and_textblob():
+    import nltk
+    from textblob import TextBlob
+    for text in load_texts():
+        doc = AnalyzedDocument(text)
+        assert doc.tokens == nltk.word_tokenize(text)
+        assert doc.sentences == nltk.sent_tokenize(text)
+        assert doc.pos_tags == nltk.pos_tag(nltk.word_tokenize(text))
+        assert (doc.polarity, doc.subjectivity) == tuple(TextBlob(text).sentiment)
+        assert set(doc.timings) >= {'sentences', 'tokens', 'pos_tags', 'sentiment'}
+
+def test_shared_document_gives_same_analysis():
+    lie, dna = LieDetector(), AuthorDNA()
+    print("\n--- Shared document vs separate analysis ---")
+    for text in load_texts():
+        doc = AnalyzedDocument(text)
+        assert lie.analyze(text, doc) == lie.analyze(text)
+        assert dna.analyze(text, doc) == dna.analyze(text)
+        # Each stage ran once even though both analyzers consumed it
+        print(f"{text[:40]!r}: {sorted(doc.timings)}")
+
+if __name__ == "__main__":
+    test_stages_match_nltk_and_textblob()
+    test_shared_document_gives_same_analysis()
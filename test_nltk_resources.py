@@ -0,0 +1,44 @@
+import os
+import sys
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def run_isolated(code, patch_download=True, **env):
+    """Run code in a fresh interpreter, by default one where any nltk.download() call fails loudly"""
+    script = code
+    if patch_download:
+        script = "import nltk\ndef no_network(*a, **k): raise AssertionError('nltk.download called')\nnltk.download = no_network\n" + code
+    result = subprocess.run([sys.executable, '-c', script], cwd=BASE_DIR, capture_output=True, text=True,
+                            env=dict(os.environ, **env))
+    print(result.stdout)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+def test_import_never_touches_network():
+    print("\n--- Importing analyzers with an empty bundle ---")
+    run_isolated(
+        "import sys\n"
+        "from lie_detector import LieDetector\n"
+        "from author_dna import AuthorDNA\n"
+        "lie, dna = LieDetector(), AuthorDNA()\n"
+        "assert dna._stop_words is None\n"
+        "assert 'textblob' not in sys.modules and 'nltk' not in sys.modules\n"
+        "print('imports ok')\n",
+        patch_download=False,
+        NLTK_BUNDLE_PATH=os.path.join(BASE_DIR, 'does_not_exist')
+    )
+
+def test_bundle_is_searched_first():
+    run_isolated(
+        "import nltk_resources, nltk\n"
+        "assert nltk.data.path[0] == nltk_resources.BUNDLE_PATH\n"
+        "assert nltk_resources.OFFLINE\n"
+        "nltk_resources.ensure_resources([('corpora/not_a_resource', 'not_a_resource')])\n"
+        "print('offline ok')\n",
+        NLTK_OFFLINE='1'
+    )
+
+if __name__ == "__main__":
+    test_import_never_touches_network()
+    test_bundle_is_searched_first()
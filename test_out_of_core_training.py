@@ -0,0 +1,94 @@
+import os
+import time
+import random
+import tempfile
+import numpy as np
+import pandas as pd
+import out_of_core_training
+from out_of_core_training import BoundedCounter, MemoryWatch, holdout_mask, train_out_of_core
+
+def write_csv(n=3000, seed=0):
+    rng = random.Random(seed)
+    fake = "amazing best perfect love buy now trust me incredible".split()
+    real = "battery okay screen decent delivery late works fine price".split()
+    texts, labels = [], []
+    for i in range(n):
+        label = 'CG' if rng.random() < 0.3 else 'OR'
+        words = fake if label == 'CG' else real
+        texts.append(' '.join(rng.choice(words if rng.random() < 0.7 else fake + real) for _ in range(12)))
+        labels.append(label)
+    path = os.path.join(tempfile.mkdtemp(), 'reviews.csv')
+    pd.DataFrame({'text': texts, 'label': labels}).to_csv(path, index=False)
+    return path, texts, labels
+
+def test_bounded_counter_keeps_frequent_terms():
+    counter = BoundedCounter(capacity=3)
+    counter.update(['a', 'b', 'c', 'd'], np.array([50, 40, 30, 1]))
+    counter.update(['e', 'f', 'g'], np.array([1, 1, 2]))
+    assert len(counter) == 3 and counter.floor == 2
+    assert counter.most_common(2) == [('a', 50), ('b', 40)]
+
+def test_holdout_is_stratified_across_chunks():
+    labels = ['CG'] * 30 + ['OR'] * 70
+    seen = {}
+    mask = np.concatenate([holdout_mask(labels[i:i + 7], seen, 5) for i in range(0, 100, 7)])
+    assert mask.sum() == 20 and mask[:30].sum() == 6 and mask[30:].sum() == 14
+    # The split does not depend on how the file is chunked
+    seen = {}
+    assert (np.concatenate([holdout_mask(labels[i:i + 13], seen, 5) for i in range(0, 100, 13)]) == mask).all()
+
+def test_streaming_matches_tfidf_and_learns():
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    path, texts, labels = write_csv()
+    # A tiny budget forces many chunks
+    models, metrics, report = train_out_of_core(path, memory_mb=1, epochs=2)
+    print(f"\nOut of core: {report}")
+    assert report['plan']['chunk_rows'] < 3000 and report['train_rows'] + report['holdout_rows'] == 3000
+    assert report['holdout_rows'] == report['holdout_scored'] == 600
+    held = holdout_mask(labels, {}, 5)
+    reference = TfidfVectorizer().fit([t for t, h in zip(texts, held) if not h])
+    vectorizer = models['SVM'].named_steps['tfidf']
+    assert vectorizer.vocabulary_ == reference.vocabulary_
+    assert np.allclose(vectorizer.idf_, reference.idf_)
+    for name, model_metrics in metrics.items():
+        assert model_metrics['accuracy'] > 0.8, (name, model_metrics)
+    assert set(models['NaiveBayes'].predict(texts[:10])) <= {'CG', 'OR'}
+    # The run's own peak is measured, not the process's lifetime peak
+    assert report['run_peak_mb'] < report['process_peak_rss_mb']
+    assert report['within_budget'] == (report['run_peak_mb'] <= 1)
+
+def test_memory_watch_measures_the_run():
+    ballast = np.ones(64 * 1024 * 1024 // 8)  # already resident: not part of the run
+    with MemoryWatch() as rss:
+        block = np.ones(32 * 1024 * 1024 // 8)
+        time.sleep(0.2)  # held for several sampling intervals, like a chunk being vectorized
+        del block
+    print(f"\nMemoryWatch ({rss.method}): {rss.run_peak_mb} MB")
+    assert 28 <= rss.run_peak_mb < 60
+    # Where /proc is missing, tracemalloc measures the allocations instead
+    current = out_of_core_training.current_rss_mb
+    out_of_core_training.current_rss_mb = lambda: None
+    try:
+        with MemoryWatch() as traced:
+            block = np.ones(32 * 1024 * 1024 // 8)
+            del block
+    finally:
+        out_of_core_training.current_rss_mb = current
+    assert traced.method == 'tracemalloc' and 30 <= traced.run_peak_mb < 40
+    del ballast
+
+def test_single_class_rejected():
+    path = os.path.join(tempfile.mkdtemp(), 'one.csv')
+    pd.DataFrame({'text': ['great stuff'] * 20, 'label': ['CG'] * 20}).to_csv(path, index=False)
+    try:
+        train_out_of_core(path)
+        assert False, 'single-class dataset accepted'
+    except ValueError:
+        pass
+
+if __name__ == "__main__":
+    test_bounded_counter_keeps_frequent_terms()
+    test_holdout_is_stratified_across_chunks()
+    test_streaming_matches_tfidf_and_learns()
+    test_memory_watch_measures_the_run()
+    test_single_class_rejected()
@@ -0,0 +1,50 @@
+import random
+import numpy as np
+from parallel_training import train_parallel
+
+def make_split(n=600, seed=0):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    rng = random.Random(seed)
+    fake = "amazing best perfect love buy now trust me incredible".split()
+    real = "battery okay screen decent delivery late works fine price".split()
+    texts, labels = [], []
+    for i in range(n):
+        label = 'Fake' if i % 2 else 'Real'
+        words = fake if label == 'Fake' else real
+        texts.append(' '.join(rng.choice(words if rng.random() < 0.7 else fake + real) for _ in range(12)))
+        labels.append(label)
+    vectorizer = TfidfVectorizer()
+    X_train, X_test = vectorizer.fit_transform(texts[:480]), vectorizer.transform(texts[480:])
+    return X_train, np.array(labels[:480]), X_test, np.array(labels[480:])
+
+def classifiers():
+    from sklearn.svm import LinearSVC
+    from sklearn.naive_bayes import MultinomialNB
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.calibration import CalibratedClassifierCV
+    return [('SVM', CalibratedClassifierCV(LinearSVC())), ('NaiveBayes', MultinomialNB()),
+            ('LogisticRegression', LogisticRegression())]
+
+def test_parallel_matches_sequential():
+    split = make_split()
+    seq_models, seq_metrics, seq_timings = train_parallel(classifiers(), split, workers=1)
+    par_models, par_metrics, par_timings = train_parallel(classifiers(), split, workers=3)
+    print(f"\nSequential: {seq_timings}\nParallel:   {par_timings}")
+    assert seq_timings['executor'] == 'sequential' and par_timings['executor'] in ('process', 'thread')
+    assert set(par_timings['models']) == {'SVM', 'NaiveBayes', 'LogisticRegression'}
+    if par_timings['executor'] == 'process':
+        assert len({t['pid'] for t in par_timings['models'].values()}) > 1
+    assert seq_metrics == par_metrics
+    X_test = split[2]
+    for name in seq_models:
+        assert (seq_models[name].predict_proba(X_test) == par_models[name].predict_proba(X_test)).all(), name
+
+def test_collapsed_svm_in_pool():
+    split = make_split(seed=1)
+    models, metrics, timings = train_parallel(classifiers()[:1], split, workers=3, collapse_svm=True)
+    assert timings['workers'] == 1  # never more workers than classifiers
+    assert type(models['SVM']).__name__ == 'CalibratedLinearModel' and 'calibration_drift' in metrics['SVM']
+
+if __name__ == "__main__":
+    test_parallel_matches_sequential()
+    test_collapsed_svm_in_pool()
@@ -0,0 +1,58 @@
+import os
+import re
+import random
+import tempfile
+from phrase_matcher import PhraseMatcher
+from lie_detector import LieDetector
+
+def regex_hits(phrases, text):
+    """Reference semantics: the per-pattern re.search loop LieDetector used to run"""
+    return {p for p in phrases if re.search(r'\b(' + re.escape(p) + r')\b', text)}
+
+def test_matches_regex_semantics():
+    rng = random.Random(7)
+    vocab = ['trust', 'me', 'buy', 'now', 'use', 'code', 'best', '50', 'off', 'i', 'swear', 'recheck', 'outlet']
+    seps = [' ', ' ', ' ', '  ', ', ', '% ', '-']
+    phrases = {'trust me', 'buy now', 'use code', '50% off', 'i swear', 'best', 'check out', 'now use', 'code-best'}
+    matcher = PhraseMatcher({'family': phrases})
+    for _ in range(2000):
+        words = [rng.choice(vocab) for _ in range(rng.randint(0, 12))]
+        text = ''.join(w + rng.choice(seps) for w in words).strip()
+        hits = matcher.scan(text)['family']
+        assert hits['phrases'] == regex_hits(phrases, text), text
+        assert hits['count'] == sum(len(re.findall(r'(?=\b' + re.escape(p) + r'\b)', text)) for p in phrases), text
+        for start, end, phrase in hits['spans']:
+            assert text[start:end] == phrase
+
+def test_lexicon_file_and_spans():
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False, encoding='utf-8') as f:
+        f.write("# trust team additions\n[promotional]\nDM me for details\nfree gift  # inline comment\n\n[deceptive]\nno joke\n")
+        path = f.name
+    try:
+        detector = LieDetector(lexicon_path=path)
+        text = "No joke, DM me for details and get a free gift. Best deal, trust me!"
+        result = detector.analyze(text)
+        print("\n" + str(result['details']['matches']))
+        assert result['promotional_score'] == 100 and result['deception_score'] == 40
+        spans = result['details']['matches']['promotional']
+        assert [text.lower()[s:e] for s, e, _ in spans] == ['dm me for details', 'free gift']
+        assert detector.matcher.n_phrases == len(detector.deceptive_phrases) + len(detector.promotional_phrases) + len(detector.exaggeration_words) + 3
+    finally:
+        os.remove(path)
+
+def test_rejects_phrase_without_family():
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+        f.write("orphan phrase\n")
+        path = f.name
+    try:
+        PhraseMatcher.from_file(path)
+        assert False, "expected ValueError"
+    except ValueError as e:
+        assert ':1:' in str(e)
+    finally:
+        os.remove(path)
+
+if __name__ == "__main__":
+    test_matches_regex_semantics()
+    test_lexicon_file_and_spans()
+    test_rejects_phrase_without_family()
@@ -0,0 +1,62 @@
+import os
+import time
+import tempfile
+from prediction_cache import PredictionCache, make_key
+
+def test_key_depends_on_text_model_and_version():
+    base = make_key("Great product!", "SVM", "v1")
+    assert base == make_key("Great product!", "SVM", "v1")
+    assert base != make_key("Great product!!", "SVM", "v1")
+    assert base != make_key("Great product!", "NaiveBayes", "v1")
+    assert base != make_key("Great product!", "SVM", "v2")
+    # NFC and NFD spellings of the same text share an entry
+    assert make_key("café", "SVM", "v1") == make_key("café", "SVM", "v1")
+
+def test_lru_eviction_and_counters():
+    cache = PredictionCache(max_entries=2)
+    cache.set('a', {'label': 'Fake'})
+    cache.set('b', {'label': 'Real'})
+    assert cache.get('a') == {'label': 'Fake'}   # 'a' becomes most recently used
+    cache.set('c', {'label': 'Real'})             # evicts 'b'
+    assert cache.get('b') is None
+    stats = cache.stats()
+    print("\n--- LRU stats ---")
+    print(stats)
+    assert stats['entries'] == 2 and stats['evictions'] == 1
+    assert stats['hits'] == 1 and stats['misses'] == 1
+
+def test_memory_bound_and_ttl():
+    cache = PredictionCache(max_entries=100, max_bytes=60)
+    cache.set('a', {'text': 'x' * 20})
+    cache.set('b', {'text': 'y' * 20})
+    assert cache.get('a') is None and cache.get('b') is not None
+    assert cache.stats()['bytes'] <= 60
+
+    cache = PredictionCache(ttl=0.05)
+    cache.set('a', {'label': 'Fake'})
+    time.sleep(0.1)
+    assert cache.get('a') is None
+
+def test_hits_return_copies():
+    cache = PredictionCache()
+    cache.set('a', {'label': 'Fake'})
+    cache.get('a')['label'] = 'Real'
+    assert cache.get('a') == {'label': 'Fake'}
+
+def test_shared_tier_between_processes():
+    path = os.path.join(tempfile.mkdtemp(), 'cache.db')
+    worker_1 = PredictionCache(shared_db_path=path)
+    worker_2 = PredictionCache(shared_db_path=path)
+    worker_1.set('a', {'label': 'Fake'})
+    assert worker_2.get('a') == {'label': 'Fake'}
+    assert worker_2.stats()['shared_hits'] == 1
+    # Promoted into the local tier after the first shared hit
+    assert worker_2.get('a') == {'label': 'Fake'}
+    assert worker_2.stats()['hits'] == 1
+
+if __name__ == "__main__":
+    test_key_depends_on_text_model_and_version()
+    test_lru_eviction_and_counters()
+    test_memory_bound_and_ttl()
+    test_hits_return_copies()
+    test_shared_tier_between_processes()
@@ -0,0 +1,53 @@
+import os
+import random
+import tempfile
+import numpy as np
+from textblob import TextBlob
+from sentiment_engine import LexiconSentiment, get_engine, build_lexicon
+
+TOLERANCE = 1e-9
+
+def close(a, b):
+    return abs(a.polarity - b.polarity) <= TOLERANCE and abs(a.subjectivity - b.subjectivity) <= TOLERANCE
+
+def test_matches_textblob_rules():
+    engine = get_engine()
+    cases = [
+        "This phone is good.", "This phone is not good.", "This phone is not bad at all",
+        "Very good, really very good!", "It is terribly slow and not very reliable",
+        "I don't like it, never again.", "Great product!!! Works perfectly :)", "Oh sure, it works great (!)",
+        "Love it <3 but the box was damaged :-(", "Mr. Smith said it's ok. U.S. version etc. is fine...",
+        "“Amazing” quality\n\nterrible support", "", "12345", "Meh."
+    ]
+    for text in cases:
+        ref, got = TextBlob(text).sentiment, engine.analyze(text)
+        print(f"{text[:40]!r:44} textblob=({ref.polarity:.3f}, {ref.subjectivity:.3f}) engine=({got.polarity:.3f}, {got.subjectivity:.3f})")
+        assert close(ref, got), (text, ref, got)
+
+def test_matches_textblob_random():
+    engine = get_engine()
+    rng = random.Random(1)
+    atoms = ['not', 'very', 'good', 'bad', "isn't", "don't", 'never', 'really', 'terribly', 'great', '!', '(!)',
+             '( ! )', ':)', ': )', ':-(', '<3', 'XD', 'Mr.', 'U.S.', '...', '"', "'", "it's", "I'd", 'the', 'a',
+             '\n\n', 'happy', 'awful', '?', ';)', 'no', 'wonderful', 'Amazing!!!']
+    for _ in range(3000):
+        text = ''.join(rng.choice(atoms) + rng.choice([' ', '', ', ', '. ']) for _ in range(rng.randint(0, 25)))
+        assert close(TextBlob(text).sentiment, engine.analyze(text)), repr(text)
+
+def test_batch_and_lexicon_build():
+    engine = get_engine()
+    texts = ["good", "not good", "good", "", "awful service!"]
+    polarity, subjectivity = engine.analyze_batch(texts)
+    assert polarity.shape == (5,) and polarity[0] == polarity[2]
+    assert np.allclose(polarity, [TextBlob(t).sentiment.polarity for t in texts], atol=TOLERANCE)
+    assert np.allclose(subjectivity, [TextBlob(t).sentiment.subjectivity for t in texts], atol=TOLERANCE)
+
+    # The committed lexicon is what the installed TextBlob compiles to
+    with tempfile.TemporaryDirectory() as folder:
+        rebuilt = LexiconSentiment.load(build_lexicon(os.path.join(folder, 'lexicon.npz')))
+    assert rebuilt.index == engine.index and rebuilt.polarity == engine.polarity and rebuilt.modifier == engine.modifier
+
+if __name__ == "__main__":
+    test_matches_textblob_rules()
+    test_matches_textblob_random()
+    test_batch_and_lexicon_build()
@@ -0,0 +1,28 @@
+import sys
+from startup_profiler import StartupProfiler
+
+def test_records_imports_and_steps():
+    profiler = StartupProfiler(enabled=True)
+    profiler.install()
+    try:
+        sys.modules.pop('colorsys', None)
+        import colorsys  # small stdlib module, unlikely to be imported already
+        with profiler.step('work'):
+            sum(range(10000))
+    finally:
+        profiler.uninstall()
+    report = profiler.report()
+    print("\n" + profiler.format_report())
+    assert [row['name'] for row in report['imports']] == ['colorsys']
+    assert [row['name'] for row in report['steps']] == ['work']
+
+def test_disabled_is_a_no_op():
+    profiler = StartupProfiler(enabled=False)
+    with profiler.step('ignored'):
+        pass
+    profiler.uninstall()
+    assert profiler.report()['steps'] == [] and not profiler.report()['enabled']
+
+if __name__ == "__main__":
+    test_records_imports_and_steps()
+    test_disabled_is_a_no_op()
@@ -0,0 +1,81 @@
+import numpy as np
+from style_index import StyleIndex
+from author_dna import FEATURES
+
+def make_index(n=500, seed=0, rebuild_every=100):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, len(FEATURES))) * [8, .2, .1, .1, .1, .1, 2, 1] + [15, .7, .4, .3, .2, .1, 1, .5]
+    index = StyleIndex(rebuild_every=rebuild_every)
+    for i, v in enumerate(vectors):
+        index.add(i + 1, v, author=f"author_{i}", product='A' if i % 2 else 'B')
+    return index, vectors
+
+def brute_force(index, vectors, q, rows=None):
+    rows = np.arange(len(vectors)) if rows is None else rows
+    X = (vectors[rows] - index._mean) / index._scale
+    d = np.sqrt((((X - (q - index._mean) / index._scale)) ** 2).sum(axis=1))
+    return [int(rows[j]) for j in np.argsort(d, kind='stable')]
+
+def test_query_matches_brute_force():
+    index, vectors = make_index()
+    index.query(vectors[0])
+    # Rows added after the tree was built are searched too
+    rng = np.random.default_rng(1)
+    for i in range(30):
+        vectors = np.vstack([vectors, vectors[i] + rng.normal(scale=1e-3, size=len(FEATURES))])
+        index.add(1000 + i, vectors[-1], author=f"late_{i}", product='A')
+    assert index.stats()['pending'] == 30
+    for q in vectors[::37]:
+        got = [row for row, _ in index.query(q, k=5)]
+        assert got == brute_force(index, vectors, q)[:5], (got, brute_force(index, vectors, q)[:5])
+        product_rows = np.array([i for i, m in enumerate(index.meta) if m['product'] == 'A'])
+        got = [row for row, _ in index.query(q, k=5, product='A')]
+        assert got == brute_force(index, vectors, q, product_rows)[:5]
+
+def test_radius_exclude_and_clusters():
+    index, vectors = make_index()
+    # Plant one author writing under five names in a near-identical style
+    base = vectors[10]
+    for i in range(5):
+        index.add(2000 + i, base + 1e-4 * i, author=f"sock_{i}", product='A')
+    matches = index.query(base, k=10, radius=0.05, exclude=(2000,))
+    ids = [index.ids[row] for row, _ in matches]
+    print(f"\nNear-identical to author_10: {[index.meta[row]['author'] for row, _ in matches]}")
+    assert 2000 not in ids and set(ids) >= {2001, 2002, 2003, 2004}
+    assert all(d <= 0.05 for _, d in matches)
+
+    groups = index.clusters(radius=0.05)
+    authors = sorted(index.meta[row]['author'] for row in groups[0])
+    print(f"Largest style cluster: {authors}")
+    assert authors == sorted(['author_10'] + [f"sock_{i}" for i in range(5)])
+    assert index.clusters(radius=0.05, product='B') == []
+
+def test_ids_already_indexed_are_skipped():
+    index, vectors = make_index(n=50)
+    # A second refresh that read the same last_id re-sends rows the index holds
+    assert not index.add(10, vectors[9]) and not index.add(50, vectors[49])
+    assert index.add(51, vectors[0])
+    assert len(index) == 51 and index.last_id == 51
+    top = [index.ids[row] for row, _ in index.query(vectors[5], k=3)]
+    assert top[0] == 6 and len(set(top)) == 3, top
+
+def test_scaling_refit_as_index_grows():
+    index, vectors = make_index(n=1, rebuild_every=256)
+    index.query(vectors[0])
+    rest = make_index(n=199, seed=2)[1]
+    for i, v in enumerate(rest[1:]):
+        index.add(i + 2, v, author=f"author_{i + 1}", product='A')
+    vectors = np.vstack([vectors, rest[1:]])
+    # Statistics fitted on the first row alone would rank by raw sentence length
+    fresh, _ = make_index(n=0)
+    for i, v in enumerate(vectors):
+        fresh.add(i + 1, v)
+    for q in vectors[::23]:
+        assert [r for r, _ in index.query(q, k=5)] == [r for r, _ in fresh.query(q, k=5)]
+    assert np.allclose(index._scale, vectors.std(axis=0))
+
+if __name__ == "__main__":
+    test_query_matches_brute_force()
+    test_radius_exclude_and_clusters()
+    test_ids_already_indexed_are_skipped()
+    test_scaling_refit_as_index_grows()
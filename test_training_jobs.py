@@ -0,0 +1,104 @@
+import os
+import time
+import tempfile
+from datetime import datetime, timedelta
+from flask import Flask
+from models import db, TrainingJob
+from training_jobs import TrainingJobQueue
+
+def make_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'jobs.db')
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    return app
+
+def quick_run(params, reporter):
+    reporter.stage('fitting', models=['SVM', 'NaiveBayes'])
+    for name in ['SVM', 'NaiveBayes']:
+        reporter.model_done(name, {'accuracy': 0.9}, {'fit_s': 0.01})
+    reporter.stage('publishing')
+    return {'message': 'Training complete', 'metrics': {'SVM': {'accuracy': 0.9}}, 'model_version': 'v1',
+            'rows': params['rows']}
+
+def slow_run(params, reporter):
+    # Checks for cancellation at every step, like run_training does at stage and model boundaries
+    for step in range(400):
+        reporter.stage('fitting', step=step)
+        time.sleep(0.05)
+    return {'model_version': 'v1'}
+
+def wait_for(app, job_id, statuses, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with app.app_context():
+            job = db.session.get(TrainingJob, job_id)
+            if job.status in statuses:
+                return job.to_dict()
+        time.sleep(0.05)
+    raise AssertionError(f'job {job_id} never reached {statuses}')
+
+def test_job_reports_progress_and_result():
+    app = make_app()
+    queue = TrainingJobQueue(app, quick_run)
+    with app.app_context():
+        job, deduplicated = queue.submit('train.csv', 'hash-a', {'rows': 100})
+        job_id = job.id
+    assert not deduplicated
+    done = wait_for(app, job_id, ['succeeded', 'failed'])
+    print(f"\nExecutor: {queue.executor}, job: {done}")
+    assert done['status'] == 'succeeded', done
+    assert done['model_version'] == 'v1' and done['metrics'] == {'SVM': {'accuracy': 0.9}}
+    assert [s['stage'] for s in done['progress']['stages']] == ['fitting', 'publishing']
+    assert set(done['progress']['models']) == {'SVM', 'NaiveBayes'}
+    with app.app_context():
+        assert db.session.get(TrainingJob, job_id).active_key is None
+
+def test_one_active_job_per_dataset_and_cancel():
+    app = make_app()
+    queue = TrainingJobQueue(app, slow_run)
+    with app.app_context():
+        first, _ = queue.submit('train.csv', 'hash-a', {})
+        again, deduplicated = queue.submit('train.csv', 'hash-a', {})
+        assert deduplicated and again.id == first.id
+        # Another dataset queues behind it (one worker)
+        other, deduplicated = queue.submit('other.csv', 'hash-b', {})
+        assert not deduplicated and other.id != first.id
+        first_id, other_id = first.id, other.id
+    wait_for(app, first_id, ['running'])
+
+    with app.app_context():
+        assert queue.cancel(other_id).status == 'cancelled'
+        assert queue.cancel(first_id).cancel_requested
+        assert queue.cancel('missing') is None
+    cancelled = wait_for(app, first_id, ['cancelled', 'succeeded', 'failed'])
+    assert cancelled['status'] == 'cancelled' and cancelled['metrics'] is None, cancelled
+
+    with app.app_context():
+        # The dataset can be trained again once nothing is active
+        job, deduplicated = queue.submit('train.csv', 'hash-a', {})
+        assert not deduplicated and job.id != first_id
+        queue.cancel(job.id)
+        assert db.session.get(TrainingJob, other_id).status == 'cancelled'
+
+def test_stale_job_is_reaped():
+    app = make_app()
+    queue = TrainingJobQueue(app, quick_run, stale_s=60)
+    with app.app_context():
+        # A job whose worker died mid-run keeps the dataset locked until its heartbeat goes stale
+        dead = TrainingJob(id='dead', dataset='train.csv', dataset_hash='hash-a', active_key='hash-a', status='running',
+                           heartbeat_at=datetime.utcnow() - timedelta(seconds=120))
+        db.session.add(dead)
+        db.session.commit()
+        job, deduplicated = queue.submit('train.csv', 'hash-a', {'rows': 5})
+        assert not deduplicated and job.id != 'dead'
+        assert db.session.get(TrainingJob, 'dead').status == 'failed'
+        job_id = job.id
+    assert wait_for(app, job_id, ['succeeded', 'failed'])['status'] == 'succeeded'
+
+if __name__ == "__main__":
+    test_job_reports_progress_and_result()
+    test_one_active_job_per_dataset_and_cancel()
+    test_stale_job_is_reaped()
+    print("All training job tests passed")
@@ -0,0 +1,239 @@
+import json
+import uuid
+import time
+import threading
+import traceback
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from models import db, TrainingJob
+from parallel_training import process_context
+
+ACTIVE = ['queued', 'running']
+# The queue a pool worker serves. Set by the pool initializer.
+_QUEUE = None
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job at its next checkpoint after a cancel request"""
+
+
+def _load_queue(run, app_settings, heartbeat_s, stale_s):
+    """
+    Pool initializer. Workers do not fork the web process (see process_context()):
+    unpickling run re-imports its module, the app, and the worker opens its own
+    connections to the same database through an app of its own.
+    """
+    global _QUEUE
+    from flask import Flask
+    app = Flask(app_settings['import_name'], root_path=app_settings['root_path'],
+                instance_path=app_settings['instance_path'])
+    app.config.update(app_settings['config'])
+    db.init_app(app)
+    _QUEUE = TrainingJobQueue(app, run, heartbeat_s=heartbeat_s, stale_s=stale_s)
+
+
+def _execute(job_id):
+    _QUEUE.execute(job_id)
+
+
+def _touch(job_ids):
+    from sqlalchemy import update
+    db.session.execute(update(TrainingJob).where(TrainingJob.id.in_(job_ids)).values(heartbeat_at=datetime.utcnow()))
+    db.session.commit()
+
+
+class JobReporter:
+    """
+    Progress of one running job, written to its TrainingJob row: the stages it went
+    through and each model's result as it finishes. Every update is also a
+    cancellation checkpoint.
+    """
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.progress = {'stages': [], 'models': {}}
+
+    def _save(self, **fields):
+        job = db.session.get(TrainingJob, self.job_id)
+        db.session.refresh(job)
+        for name, value in fields.items():
+            setattr(job, name, value)
+        job.progress = json.dumps(self.progress)
+        job.heartbeat_at = datetime.utcnow()
+        db.session.commit()
+        if job.cancel_requested:
+            raise JobCancelled()
+
+    def stage(self, name, **info):
+        """Enter a stage (vectorizing, searching, fitting, publishing, ...)"""
+        self.progress['stages'].append(dict(info, stage=name, started=round(time.time(), 3)))
+        self._save(stage=name)
+
+    def model_done(self, model_name, metrics, timings):
+        self.progress['models'][model_name] = {'accuracy': metrics['accuracy'], 'fit_s': timings['fit_s']}
+        self._save()
+
+
+class TrainingJobQueue:
+    """
+    Background /api/train runs, executed in a local process pool and tracked in the
+    TrainingJob table so any web worker can report on them.
+
+    run(params, reporter) does the training inside a pool worker and returns the
+    /api/train response; it must be a module-level function, which workers import
+    by name. At most one job per dataset is queued or running: a
+    unique index on active_key (the dataset hash while the job is active) makes a
+    second submission fail, and it is answered with the job already active.
+    Queued jobs are kept alive by this process and running ones by their worker,
+    through heartbeat_at; an active job whose heartbeat is older than stale_s
+    (its process died) is marked failed so the dataset can be trained again.
+    Cancelling a queued job drops it; a running job stops at its next progress
+    checkpoint and never publishes models.
+    """
+
+    def __init__(self, app, run, workers=1, heartbeat_s=10, stale_s=120):
+        self.app = app
+        self.run = run
+        self.workers = workers
+        self.heartbeat_s = heartbeat_s
+        self.stale_s = stale_s
+        self.executor = None
+        self._pool = None
+        self._queued = set()
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        global _QUEUE
+        with self._lock:
+            if self._pool is None:
+                # Where a relative sqlite URI points depends on the app's paths, so the worker's app copies them
+                app_settings = {'import_name': self.app.import_name, 'root_path': self.app.root_path,
+                                'instance_path': self.app.instance_path,
+                                'config': {k: v for k, v in self.app.config.items() if k.startswith('SQLALCHEMY_')}}
+                try:
+                    self._pool = ProcessPoolExecutor(self.workers, mp_context=process_context(), initializer=_load_queue,
+                                                     initargs=(self.run, app_settings, self.heartbeat_s, self.stale_s))
+                    self.executor = 'process'
+                except (ValueError, OSError, NotImplementedError) as e:
+                    print(f"Process pool unavailable ({e}), running training jobs in threads")
+                    _QUEUE = self
+                    self._pool = ThreadPoolExecutor(self.workers)
+                    self.executor = 'thread'
+                threading.Thread(target=self._beat_queued, daemon=True).start()
+            return self._pool
+
+    def _beat_queued(self):
+        """Keep the heartbeat of jobs waiting in this process's pool fresh"""
+        while True:
+            time.sleep(self.heartbeat_s)
+            with self._lock:
+                job_ids = list(self._queued)
+            if not job_ids:
+                continue
+            with self.app.app_context():
+                try:
+                    _touch(job_ids)
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Training job heartbeat failed: {e}")
+
+    def reap_stale(self):
+        """Mark active jobs whose process stopped beating as failed"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.stale_s)
+        for job in TrainingJob.query.filter(TrainingJob.status.in_(ACTIVE), TrainingJob.heartbeat_at < cutoff).all():
+            job.status, job.error = 'failed', 'Training worker stopped responding'
+            job.finished_at, job.active_key = datetime.utcnow(), None
+        db.session.commit()
+
+    def submit(self, dataset, dataset_hash, params):
+        """(job, deduplicated): a new queued job, or the job already queued or running for this dataset"""
+        from sqlalchemy.exc import IntegrityError
+        self.reap_stale()
+        job = TrainingJob(id=uuid.uuid4().hex, dataset=dataset, dataset_hash=dataset_hash, active_key=dataset_hash,
+                          status='queued', params=json.dumps(params), heartbeat_at=datetime.utcnow())
+        db.session.add(job)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            active = TrainingJob.query.filter_by(active_key=dataset_hash).first()
+            if active is None:
+                raise
+            return active, True
+        # The done callback runs on the pool's thread, outside this session
+        job_id = job.id
+        with self._lock:
+            self._queued.add(job_id)
+        try:
+            future = self._get_pool().submit(_execute, job_id)
+        except Exception as e:
+            with self._lock:
+                self._queued.discard(job_id)
+            self._finish(job_id, status='failed', error=f'Could not start training: {e}')
+            raise
+        future.add_done_callback(lambda _: self._forget(job_id))
+        return job, False
+
+    def _forget(self, job_id):
+        with self._lock:
+            self._queued.discard(job_id)
+
+    def cancel(self, job_id):
+        """Cancel a job: a queued one at once, a running one at its next checkpoint. None if unknown."""
+        job = db.session.get(TrainingJob, job_id)
+        if job is None or job.status not in ACTIVE:
+            return job
+        if job.status == 'queued':
+            job.status, job.stage = 'cancelled', 'cancelled'
+            job.finished_at, job.active_key = datetime.utcnow(), None
+        job.cancel_requested = True
+        db.session.commit()
+        return job
+
+    def _finish(self, job_id, **fields):
+        job = db.session.get(TrainingJob, job_id)
+        db.session.refresh(job)
+        for name, value in fields.items():
+            setattr(job, name, value)
+        job.finished_at, job.active_key = datetime.utcnow(), None
+        db.session.commit()
+
+    def execute(self, job_id):
+        """Run one job (inside a pool worker) and record its outcome"""
+        with self.app.app_context():
+            job = db.session.get(TrainingJob, job_id)
+            # Cancelled while it was waiting
+            if job is None or job.status != 'queued':
+                return
+            job.status, job.started_at, job.heartbeat_at = 'running', datetime.utcnow(), datetime.utcnow()
+            db.session.commit()
+            params = json.loads(job.params)
+
+            stop = threading.Event()
+            threading.Thread(target=self._beat_running, args=(job_id, stop), daemon=True).start()
+            try:
+                result = self.run(params, JobReporter(job_id))
+                fields = {'status': 'succeeded', 'stage': 'done', 'model_version': result.get('model_version'),
+                          'result': json.dumps(result, default=str)}
+            except JobCancelled:
+                db.session.rollback()
+                fields = {'status': 'cancelled', 'stage': 'cancelled'}
+            except Exception as e:
+                # A bad request (missing columns, one class) is reported in the job; anything else is logged in full
+                if not isinstance(e, ValueError):
+                    traceback.print_exc()
+                db.session.rollback()
+                fields = {'status': 'failed', 'error': str(e)}
+            finally:
+                stop.set()
+            self._finish(job_id, **fields)
+            print(f"Training job {job_id} {fields['status']}")
+
+    def _beat_running(self, job_id, stop):
+        with self.app.app_context():
+            while not stop.wait(self.heartbeat_s):
+                try:
+                    _touch([job_id])
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Training job heartbeat failed: {e}")